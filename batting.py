@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+타격 기록 분류
+설명: 타석 결과(ACK의 result)와 그 직후 카운트로 타자 기록 항목을 정한다.
+      로그 통계 도구(log_stats.py)와 서버의 실시간 기록(StatIndex)이 같은 규칙을 쓴다.
+
+  1B/2B/3B/HR  -> 타수(AB), 안타(H), 장타 항목
+  OUT, ERROR   -> 타수
+  STRIKE       -> 직후 스트라이크가 0이면 삼진 (타수, K)
+  BALL, WILD_PITCH -> 직후 볼이 0이면 볼넷 (BB)
+  SAC_FLY/SAC_BUNT -> SF/SH (타수 아님)
+"""
+
+STATS = ("PA", "AB", "H", "2B", "3B", "HR", "BB", "K", "SF", "SH")
+STAT_BITS = {name: 1 << i for i, name in enumerate(STATS)}
+
+_HIT_STATS = {
+    "1B": ("PA", "AB", "H"),
+    "2B": ("PA", "AB", "H", "2B"),
+    "3B": ("PA", "AB", "H", "3B"),
+    "HR": ("PA", "AB", "H", "HR"),
+    "OUT": ("PA", "AB"),
+    "ERROR": ("PA", "AB"),
+    "SAC_FLY": ("PA", "SF"),
+    "SAC_BUNT": ("PA", "SH"),
+}
+_STRIKEOUT = ("PA", "AB", "K")
+_WALK = ("PA", "BB")
+_NONE = ()
+
+def classify(result: str, balls_after: int, strikes_after: int):
+    """타석 결과 -> 올릴 기록 항목 tuple (타석이 끝나지 않았으면 빈 tuple)"""
+    stats = _HIT_STATS.get(result)
+    if stats is not None:
+        return stats
+    if result == "STRIKE":
+        return _STRIKEOUT if strikes_after == 0 else _NONE
+    if result in ("BALL", "WILD_PITCH"):
+        return _WALK if balls_after == 0 else _NONE
+    return _NONE
+
+def stat_mask(stats) -> int:
+    mask = 0
+    for name in stats:
+        mask |= STAT_BITS[name]
+    return mask
+
+def stats_from_mask(mask: int):
+    return tuple(name for name, bit in STAT_BITS.items() if mask & bit)
+
+def new_line() -> dict:
+    return dict.fromkeys(STATS, 0)
+
+def add(line: dict, stats):
+    for name in stats:
+        line[name] += 1
+
+def merge_lines(into: dict, other: dict):
+    for key, line in other.items():
+        target = into.get(key)
+        if target is None:
+            into[key] = dict(line)
+        else:
+            for name, value in line.items():
+                target[name] += value
+    return into
+
+class StatIndex:
+    """한 게임 방의 타자별/팀별 누적 기록 (RESET에도 유지, AB마다 O(1) 갱신)
+
+    팀은 그 타석의 초/말("AWAY"/"HOME")로 정한다. 라인업이 있으면 next_batter()가
+    그 팀 라인업에서 타자를 고르므로 away_lineup/home_lineup 소속과 같다.
+    경기를 끝낸 타석(끝내기 홈런/밀어내기 등)은 END에 실린 타자와 결과로 log_stats.py와 똑같이 넣는다.
+    """
+
+    def __init__(self):
+        self.batters = {}   # (팀, 타자) -> 기록 dict
+        self.teams = {"AWAY": new_line(), "HOME": new_line()}
+
+    def record(self, team: str, batter: str, result: str, balls_after: int, strikes_after: int):
+        stats = classify(result, balls_after, strikes_after)
+        if stats:
+            key = (team, batter)
+            line = self.batters.get(key)
+            if line is None:
+                line = self.batters[key] = new_line()
+            add(line, stats)
+            add(self.teams[team], stats)
+        return stats
+
+    def query(self, batter=None, team=None) -> dict:
+        """STATS 응답 본문 (batter/team으로 거를 수 있음)"""
+        if batter is not None and team is not None:
+            line = self.batters.get((team, batter))
+            keys = [(team, batter)] if line is not None else []
+        else:
+            keys = [k for k in self.batters if (team is None or k[0] == team) and (batter is None or k[1] == batter)]
+        return {
+            "batters": [{"team": k[0], "batter": k[1], **self.batters[k], "AVG": average(self.batters[k])} for k in keys],
+            "teams": {t: {**line, "AVG": average(line)} for t, line in self.teams.items() if team is None or t == team},
+        }
+
+    def dump(self) -> dict:
+        """스냅샷용 (기록은 STATS 순서의 숫자 목록으로 저장)"""
+        return {
+            "batters": [[team, batter, list(line.values())] for (team, batter), line in self.batters.items()],
+            "teams": {t: list(line.values()) for t, line in self.teams.items()},
+        }
+
+    def load(self, data: dict):
+        self.batters = {(team, batter): dict(zip(STATS, values)) for team, batter, values in data.get("batters", [])}
+        self.teams = {t: dict(zip(STATS, data["teams"][t])) if t in data.get("teams", {}) else new_line()
+                      for t in ("AWAY", "HOME")}
+
+def average(line: dict) -> float:
+    return round(line["H"] / line["AB"], 3) if line["AB"] else 0.0
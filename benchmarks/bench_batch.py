@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+묶음 입력(BATCH) 벤치마크
+사용법: python benchmarks/bench_batch.py [--pitches 300] [--viewers 50] [--rounds 5]
+설명: 한 경기 분량의 투구(AB) pitches개를 관중(DELTA) N명이 보는 게임에
+        - 한 개씩: AB 전송 -> ACK/END 수신을 반복 (지금의 기록원)
+        - 묶음: BATCH 프레임 하나 -> ACK 하나
+      로 넣고, 걸린 시간(중앙값), 관중 한 명이 받은 프레임 수, 로그 기록 배치 수를 비교한다.
+      두 방식의 최종 상태/누적 기록/로그 내용(timestamp 제외)이 같은지,
+      이벤트 스트림으로 복구한 상태와 순번이 서버와 같은지, 경기 종료 뒤의 AB가 섞인 BATCH는
+      통째로 거절되는지도 확인한다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from bench_stats import MAX_INNINGS, WEIGHTS
+from common import quiet, running_server
+import server_websocket
+import websockets
+from event_store import EventStore, recover
+from fast_engine import RESULTS
+from game_room import GameRoom, RoomRegistry
+
+def pitches(count, seed):
+    """한 경기 안에서 끝나는 AB 목록 (경기가 끝나거나 MAX_INNINGS를 넘으면 거기까지)"""
+    rng = random.Random(seed)
+    room = GameRoom("plan")
+    events = []
+    while len(events) < count and not room.state["game_over"] and room.state["inning"] <= MAX_INNINGS:
+        event = {"type": "AB", "batter": "", "result": rng.choices(RESULTS, WEIGHTS)[0]}
+        room.apply(event)
+        events.append(event)
+    return events
+
+async def viewer(uri, counts, ready):
+    async with websockets.connect(uri + "?proto=delta") as ws:
+        await ws.recv()
+        ready.release()
+        async for _ in ws:
+            counts[0] += 1
+
+async def ingest(args, events, batched, directory):
+    """-> (걸린 시간, 관중 한 명당 프레임, 로그 배치 수, 로그 데이터, 최종 상태, 누적 기록, 순번)"""
+    async with running_server() as base:
+        uri = f"{base}/batch"
+        store = server_websocket.event_store = await EventStore(directory, snapshot_every=10**12).start(RoomRegistry())
+        counts, ready = [0], asyncio.Semaphore(0)
+        viewers = [asyncio.create_task(viewer(uri, counts, ready)) for _ in range(args.viewers)]
+        for _ in viewers:
+            await ready.acquire()
+        async with websockets.connect(uri) as ws:
+            await ws.recv()
+            start = time.perf_counter()
+            if batched:
+                await ws.send(json.dumps({"type": "BATCH", "events": events}))
+                reply = json.loads(await ws.recv())
+                assert reply["type"] == "ACK" and len(reply["results"]) == len(events), reply
+            else:
+                for event in events:
+                    await ws.send(json.dumps(event))
+                    while json.loads(await ws.recv())["type"] not in ("ACK", "END", "ERROR"):
+                        pass
+            elapsed = time.perf_counter() - start
+        room = server_websocket.rooms.get("batch")
+        await asyncio.sleep(0.2)
+        for task in viewers:
+            task.cancel()
+        await asyncio.gather(*viewers, return_exceptions=True)
+        writer = server_websocket.log_writer
+        await writer.close()
+        with open(writer.path, "rb") as f:
+            logged = [json.loads(line)["data"] for line in f]
+        await store.close(server_websocket.rooms)
+        server_websocket.event_store = None
+        result = (elapsed, counts[0] / args.viewers, writer.batches_written, logged,
+                  room.snapshot(), room.stats.dump(), room.seq)
+
+    recovered = RoomRegistry()
+    recover(directory, recovered, use_snapshot=False)
+    again = recovered.get("batch")
+    assert (again.snapshot(), again.seq) == (result[4], result[6]), "이벤트 스트림 복구 결과가 서버와 다름"
+    return result
+
+async def rejected():
+    """말 공격 홈런 뒤 아웃만 계속 -> 9회 초에 경기가 끝나고 남은 AB 때문에 BATCH 전체가 ERROR, 상태와 순번은 그대로"""
+    out, hr = {"type": "AB", "result": "OUT"}, {"type": "AB", "result": "HR"}
+    async with running_server() as base:
+        async with websockets.connect(f"{base}/reject") as ws:
+            await ws.recv()
+            room = server_websocket.rooms.get("reject")
+            before = (room.snapshot(), room.seq)
+            await ws.send(json.dumps({"type": "BATCH", "events": [out] * 3 + [hr] + [out] * 60}))
+            reply = json.loads(await ws.recv())
+            return reply, before == (room.snapshot(), room.seq)
+
+def main():
+    parser = argparse.ArgumentParser(description="한 개씩 vs BATCH 입력")
+    parser.add_argument("--pitches", type=int, default=300)
+    parser.add_argument("--viewers", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    events = pitches(args.pitches, args.seed)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, quiet():
+        for i in range(args.rounds):
+            for name, batched in (("한 개씩", False), ("묶음", True)):
+                directory = os.path.join(tmp, f"{name}{i}")
+                results.setdefault(name, []).append(asyncio.run(ingest(args, events, batched, directory)))
+    single, batch = results["한 개씩"][0], results["묶음"][0]
+    assert single[4] == batch[4], "최종 상태가 다름"
+    assert single[5] == batch[5], "누적 기록이 다름"
+    assert single[3] == batch[3], "로그 내용이 다름"
+
+    print(f"투구 {len(events)}개, 관중 {args.viewers}명")
+    base = statistics.median(r[0] for r in results["한 개씩"])
+    for name, runs in results.items():
+        elapsed = statistics.median(r[0] for r in runs)
+        print(f"{name}: {elapsed * 1e3:,.1f}ms ({len(events) / elapsed:,.0f} 투구/s, {base / elapsed:.1f}x)  "
+              f"관중당 프레임 {runs[0][1]:.0f}개  로그 배치 {runs[0][2]}번")
+
+    with quiet():
+        reply, unchanged = asyncio.run(rejected())
+    assert reply["type"] == "ERROR" and unchanged, f"종료 뒤 AB가 섞인 BATCH가 반영됨: {reply}"
+    print(f"검사 통과: 최종 상태/누적 기록/로그 내용 동일, 복구 상태와 순번 일치, "
+          f"경기 종료 뒤 AB가 섞인 BATCH는 거절 (index {reply['index']})")
+
+if __name__ == "__main__":
+    main()
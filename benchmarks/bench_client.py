@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+터미널 클라이언트 수신 벤치마크 (STATE마다 그리기 vs 묶어 그리기 vs 기록 전용)
+사용법: python benchmarks/bench_client.py [--pitches 20000] [--proto state|delta]
+설명: 경기 여러 개(사이에 RESET)의 투구 pitches개로 만든 STATE(또는 DELTA) 메시지를 가짜 웹소켓이 쉬지 않고 넘겨 주면
+      (관중이 잠깐 멈췄다가 밀린 메시지를 한꺼번에 받는 상황) client_websocket.receive_messages()가
+        - 매번: --refresh 0 (STATE마다 점수판을 그림, 이전 동작)
+        - 묶기: --refresh 10 (초당 최대 10번, 마지막 상태만)
+        - 기록 전용: --tap (그리지 않고 로그에만)
+      으로 처리하는 초당 메시지 수를 잰다 (출력은 /dev/null, 로그 기록기를 닫을 때까지 포함).
+      로그 줄 수와 내용이 받은 메시지와 같은지, 마지막으로 그린 점수판이 마지막 상태인지도 확인한다.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import time
+
+from bench_batch import pitches
+import client_websocket
+from game_room import GameRoom, state_changes
+from log_writer import LogWriter
+
+MODES = [
+    ("매번", 0.0, False),
+    ("묶기 10Hz", client_websocket.REFRESH_HZ, False),
+    ("기록 전용", 0.0, True),
+]
+
+def season(count, seed):
+    """경기를 RESET으로 이어 붙인 투구 count개"""
+    events = []
+    while len(events) < count:
+        events += pitches(count - len(events), seed)
+        events.append({"type": "RESET"})
+        seed += 1
+    return events[:count]
+
+def messages(events, proto):
+    """투구마다 서버가 보냈을 STATE/DELTA (JSON 텍스트)"""
+    room = GameRoom("bench")
+    out = [json.dumps(room.snapshot(delta=proto == "delta"), ensure_ascii=False)]
+    for event in events:
+        prev = room.last_snapshot
+        room.apply(event)
+        room.seq += 1
+        room.last_snapshot = room.state_payload()
+        if proto == "delta":
+            message = {"type": "DELTA", "seq": room.seq, "changes": state_changes(prev, room.last_snapshot)}
+        else:
+            message = room.last_snapshot
+        out.append(json.dumps(message, ensure_ascii=False))
+    return out, room.snapshot()
+
+class FakeSocket:
+    """받은 메시지를 쉬지 않고 돌려주는 웹소켓"""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield message
+            await asyncio.sleep(0)
+
+    async def send(self, data):
+        raise AssertionError("순번 공백이 없는데 RESYNC를 보냄")
+
+async def run(stream, refresh, tap, path):
+    renderer = client_websocket.Renderer(refresh, quiet=tap)
+    board = client_websocket.Scoreboard()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        async with LogWriter(path) as client_websocket.log_writer:
+            await client_websocket.receive_messages(FakeSocket(stream), [False], board, renderer)
+        elapsed = time.perf_counter() - start
+    return elapsed, renderer, board
+
+def main():
+    parser = argparse.ArgumentParser(description="터미널 클라이언트 수신 처리량")
+    parser.add_argument("--pitches", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--proto", choices=("state", "delta"), default="state")
+    args = parser.parse_args()
+    stream, final = messages(season(args.pitches, args.seed), args.proto)
+
+    print(f"{args.proto.upper()} 메시지 {len(stream):,}개")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, refresh, tap in MODES:
+            path = os.path.join(tmp, f"{name}.jsonl")
+            elapsed, renderer, board = asyncio.run(run(stream, refresh, tap, path))
+            print(f"{name:<6}: {len(stream) / elapsed:10,.0f} msgs/s  ({elapsed:.2f}s, 점수판 {renderer.rendered:,}번)")
+            with open(path, encoding="utf-8") as f:
+                logged = [json.loads(line)["data"] for line in f]
+            assert logged == [json.loads(m) for m in stream], f"{name}: 로그가 받은 메시지와 다름"
+            assert renderer.messages == len(stream) and renderer.pending is None
+            state = {k: v for k, v in board.state.items() if k != "seq"}
+            assert state == {k: v for k, v in final.items() if k != "seq"}, f"{name}: 마지막 상태가 다름"
+            if not tap:
+                assert renderer.rendered == len(stream) if not refresh else renderer.rendered <= elapsed * refresh + 2
+    print("검사 통과: 로그 = 받은 메시지 전부, 마지막 상태까지 반영, 묶기는 초당 최대 refresh번만 그림")
+
+if __name__ == "__main__":
+    main()
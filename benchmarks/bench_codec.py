@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+메시지 코덱 벤치마크 + 왕복 검사
+사용법: python benchmarks/bench_codec.py [--abs 2000] [--seed 1]
+설명: 게임 방에 무작위 AB를 적용하며 실제 서버가 보내는 STATE/DELTA/ACK/STATS 메시지를 모으고,
+      1) 모든 메시지가 각 코덱으로 인코딩 -> 디코딩 후 원래 값과 같은지 확인하고
+      2) 종류별로 메시지 하나당 인코딩/디코딩 시간(us)과 평균 프레임 크기(bytes)를
+         표준 json(이전 방식), JSON 코덱(orjson이 있으면 orjson), 바이너리 코덱으로 비교한다.
+"""
+
+import argparse
+import json
+import random
+import time
+
+import common  # noqa: F401 (저장소 루트를 import 경로에 추가)
+import codec
+from fast_engine import RESULTS
+from game_room import GameRoom, state_changes
+
+WEIGHTS = [20, 25, 20, 10, 8, 3, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+MAX_INNINGS = 15    # 원정 팀이 앞선 경기는 끝나지 않으므로 여기서 끊음
+
+class StdlibJson:
+    """이전 방식 (json.dumps(ensure_ascii=False) + UTF-8)"""
+    name = "stdlib json"
+
+    @staticmethod
+    def encode(message) -> bytes:
+        return json.dumps(message, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def decode(data):
+        return json.loads(data)
+
+def collect(abs_count, seed):
+    """종류별 메시지 목록 (서버가 보내는 것과 같은 모양)"""
+    rng = random.Random(seed)
+    room = GameRoom("codec")
+    room.apply({"type": "SET_LINEUP", "away_lineup": [f"원정{i}" for i in range(1, 10)],
+                "home_lineup": [f"홈{i}" for i in range(1, 10)]})
+    messages = {"STATE": [], "DELTA": [], "ACK": [], "STATS": []}
+    for _ in range(abs_count):
+        res = room.apply({"type": "AB", "batter": "", "result": rng.choices(RESULTS, WEIGHTS)[0]})
+        if room.state["game_over"] or room.state["inning"] > MAX_INNINGS:
+            room.apply({"type": "RESET"})
+            room.publish_state()
+            continue
+        messages["ACK"].append(res)
+        prev = room.last_snapshot
+        snapshot = room.publish_state()
+        messages["STATE"].append(snapshot)
+        messages["DELTA"].append({"type": "DELTA", "seq": room.seq, "changes": state_changes(prev, snapshot)})
+    messages["STATS"].append(room.stats_message())
+    messages["STATS"].append(room.stats_message(team="HOME"))
+    return messages
+
+def check_roundtrip(messages, codecs):
+    count = 0
+    for using in codecs:
+        for items in messages.values():
+            for message in items:
+                decoded = using.decode(using.encode(message))
+                assert decoded == message, f"{using.name}: {message} -> {decoded}"
+                count += 1
+    return count
+
+def timed(fn, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (repeat * len(items)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="메시지 코덱 비교")
+    parser.add_argument("--abs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    messages = collect(args.abs, args.seed)
+    codecs = [StdlibJson(), codec.JSON, codec.BINARY]
+    print(f"왕복 검사 통과: {check_roundtrip(messages, codecs):,}개 메시지 "
+          f"(JSON 코덱: {'orjson' if codec.orjson is not None else '표준 json'})")
+
+    for kind, items in messages.items():
+        repeat = max(1, 20000 // len(items))
+        print(f"\n{kind} ({len(items)}개)")
+        base = None
+        for using in codecs:
+            frames = [using.encode(m) for m in items]
+            size = sum(len(f) for f in frames) / len(frames)
+            enc = timed(using.encode, items, repeat)
+            dec = timed(using.decode, frames, repeat)
+            base = base or size
+            print(f"  {using.name:<12} 인코딩 {enc:6.2f}us  디코딩 {dec:6.2f}us  "
+                  f"{size:7.1f} bytes ({size / base:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+동시 명령 스트레스 테스트 (방마다 처리 태스크 하나)
+사용법: python benchmarks/bench_commands.py [--games 2] [--scorers 20] [--readers 20] [--abs 200]
+설명: 게임마다 기록원 여러 명이 동시에 AB(가끔 SET_RUNNERS/잘못된 SET_RUNNERS)를 보내고,
+      관중(DELTA 프로토콜)은 그동안 SCORE를 반복 요청한다.
+      - 기록원: AB 전송 -> 자신의 ACK/END 수신까지 지연 p50/p99
+      - 관중: SCORE 전송 -> STATE 수신까지 지연 p50/p99 (처리 태스크를 기다리지 않아야 함)
+      끝나면 방의 순번이 상태를 바꾼 명령 수와 같은지, 관중이 받은 DELTA 순번에 빠짐이 없는지,
+      잘못된 SET_RUNNERS가 모두 ERROR로 거절됐는지 확인한다 (명령 검사 자체는 tests/test_commands.py).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from common import AB_CYCLE, quiet, running_server
+import server_websocket
+import websockets
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+async def scorer(uri, abs_count, seed, out):
+    rng = random.Random(seed)
+    async with websockets.connect(uri) as ws:
+        await ws.recv()  # 접속 시 STATE
+        for i in range(abs_count):
+            r = rng.random()
+            if r < 0.05:
+                # 잘못된 주자 -> 처리 큐에 들어가지 않고 바로 ERROR
+                await ws.send(json.dumps({"type": "SET_RUNNERS", "runners": ["4B"]}))
+                expect = ("ERROR",)
+                out["rejected"] += 1
+            elif r < 0.10:
+                await ws.send(json.dumps({"type": "SET_RUNNERS", "runners": rng.sample(["1B", "2B", "3B"], 2)}))
+                out["runner_sets"] += 1
+                continue
+            else:
+                await ws.send(json.dumps({"type": "AB", "batter": "", "result": AB_CYCLE[(seed + i) % len(AB_CYCLE)]},
+                                         ensure_ascii=False))
+                expect = ("ACK", "END", "ERROR")
+                out["abs"] += 1
+            t0 = time.perf_counter()
+            while True:
+                msg = json.loads(await ws.recv())
+                if msg["type"] in expect:
+                    break
+            out["write"].append(time.perf_counter() - t0)
+            if msg["type"] == "ERROR" and expect == ("ERROR",):
+                out["errors"] += 1
+
+async def reader(uri, stop, out):
+    async with websockets.connect(uri + "?proto=delta") as ws:
+        first = json.loads(await ws.recv())
+        last_seq = first["seq"]
+        while not stop.is_set():
+            await ws.send('{"type": "SCORE"}')
+            t0 = time.perf_counter()
+            while True:
+                msg = json.loads(await ws.recv())
+                if msg["type"] == "DELTA":
+                    if msg["seq"] != last_seq + 1:
+                        out["gaps"] += 1
+                    last_seq = msg["seq"]
+                elif msg["type"] == "STATE":
+                    break
+            out["read"].append(time.perf_counter() - t0)
+
+async def run(args):
+    out = {"write": [], "read": [], "abs": 0, "runner_sets": 0, "rejected": 0, "errors": 0, "gaps": 0}
+    async with running_server() as base:
+        stop = asyncio.Event()
+        uris = [f"{base}/stress{g}" for g in range(args.games)]
+        readers = [asyncio.create_task(reader(uris[i % args.games], stop, out)) for i in range(args.readers)]
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        await asyncio.gather(*(scorer(uris[i % args.games], args.abs, i, out) for i in range(args.scorers)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*readers)
+        await asyncio.gather(*(room.stop() for room in server_websocket.rooms))
+        seqs = sum(room.seq for room in server_websocket.rooms)
+    return out, elapsed, seqs
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 명령 스트레스 테스트")
+    parser.add_argument("--games", type=int, default=2)
+    parser.add_argument("--scorers", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--abs", type=int, default=200, help="기록원마다 보낼 명령 수")
+    args = parser.parse_args()
+
+    with quiet():
+        out, elapsed, seqs = asyncio.run(run(args))
+    commands = out["abs"] + out["runner_sets"]
+    print(f"게임 {args.games}개, 기록원 {args.scorers}명, 관중 {args.readers}명: "
+          f"명령 {commands + out['rejected']}개 {elapsed:.2f}s ({(commands + out['rejected']) / elapsed:,.0f}/s)")
+    print(f"기록원 ACK 지연: p50={percentile(out['write'], 50) * 1e3:.2f}ms  p99={percentile(out['write'], 99) * 1e3:.2f}ms")
+    print(f"관중 SCORE 지연: p50={percentile(out['read'], 50) * 1e3:.2f}ms  p99={percentile(out['read'], 99) * 1e3:.2f}ms "
+          f"({len(out['read'])}회)")
+    assert seqs == commands, f"STATE 순번 합 {seqs} != 상태 변경 명령 수 {commands}"
+    assert out["gaps"] == 0, f"DELTA 순번 공백 {out['gaps']}회"
+    assert out["errors"] == out["rejected"], "잘못된 SET_RUNNERS가 거절되지 않음"
+    print(f"검사 통과: 순번 {seqs}개 연속, 잘못된 명령 {out['rejected']}개 거절")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로그 압축/색인 벤치마크
+사용법: python benchmarks/bench_compact.py [--files 2] [--games 200] [--lookups 2000]
+설명: bench_stats.py와 같은 방식으로 서버 형식 로그를 만든 뒤 log_compact.py로 압축하고
+      1) 디스크 사용량 (원래 로그 vs games.jsonl + index.bin + segments.json)
+      2) "게임 X의 경기 N, 7회 말 시작 후 k번째 플레이" 조회 지연: 색인(mmap + 이분 탐색) vs 원래 로그 처음부터 읽기
+      를 출력한다. expand 결과가 원래 로그의 데이터와 같은지, 색인 조회 결과가 원래 로그의 STATE와 같은지도 확인한다.
+      RESET 줄을 뺀 로그(서버를 복구 없이 다시 띄운 것처럼 경기가 RESET 없이 이어짐)로도 같은 검사를 한다.
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from bench_stats import timed, write_archive
+import log_compact
+from game_engine import current_state, init_state
+
+def original_segments(paths):
+    """원래 로그 -> {(게임, 경기 번호): [데이터, ...]} (압축과 같은 경계: RESET 또는 되돌아간 상태)"""
+    segments, resets, replays = {}, {}, {}
+    for path in paths:
+        for rec in (json.loads(line) for line in open(path, "rb")):
+            game, data = rec.get("game", log_compact.DEFAULT_GAME), rec["data"]
+            if game not in resets or data.get("msg") == "RESET" or log_compact.goes_back(replays[game].state, data):
+                resets[game] = resets.get(game, -1) + 1
+                replays[game] = log_compact.Replay()
+            replays[game].feed(data)
+            segments.setdefault((game, resets[game]), []).append(data)
+    return segments
+
+def without_resets(path, out):
+    """RESET 줄을 뺀 로그 사본 (경기가 RESET 없이 이어짐)"""
+    with open(path, "rb") as f, open(out, "wb") as w:
+        w.writelines(line for line in f if json.loads(line)["data"].get("msg") != "RESET")
+    return out
+
+def verify(paths, out, lookups, rng):
+    """압축 결과 검사: expand = 원래 데이터, 구간 색인이 정렬됨, 색인 조회 = 원래 STATE -> (조회 목록, 확인 건수, 조회 시간)"""
+    original = original_segments(paths)
+    with log_compact.CompactLog(out) as log:
+        for i, seg in enumerate(log.segments):
+            expanded = [rec["data"] for rec in log.expand(i)]
+            assert expanded == original[seg["game"], seg["reset"]], f"expand 불일치: {seg['game']}#{seg['reset']}"
+            keys = [log.entry(j)[1:3] for j in range(seg["index"], seg["index"] + seg["entries"])]
+            assert keys == sorted(keys), f"색인이 정렬되지 않음: {seg['game']}#{seg['reset']}"
+
+        queries = []
+        for _ in range(lookups):
+            seg = rng.choice(log.segments)
+            states = [d for d in original[seg["game"], seg["reset"]] if d.get("type") == "STATE"]
+            last_inning = int(states[-1]["inning"].split("회")[0]) if states else 1
+            queries.append((seg["game"], seg["reset"], rng.randint(1, last_inning), rng.randint(0, 1),
+                            rng.randint(0, 5), states))
+        start = time.perf_counter()
+        results = [log.state_at(game, inning, half, reset, plays) for game, reset, inning, half, plays, _ in queries]
+        indexed = (time.perf_counter() - start) / len(queries)
+        checked = 0
+        for (game, reset, inning, half, plays, states), got in zip(queries, results):
+            want = expected_state(states, inning, half, plays)
+            if want is not None:
+                assert got == want, f"{game}#{reset} {inning}/{half}+{plays}: {got} != {want}"
+                checked += 1
+        return queries, checked, indexed, len(log.segments)
+
+def scan_state(paths, game, reset, inning, half, plays):
+    """색인 없이: 원래 로그를 처음부터 읽어 그 경기의 STATE 줄로 찾음"""
+    label = f"{inning}회 {'초' if half == 0 else '말'}"
+    n, found = -1, None
+    for path in paths:
+        with open(path, "rb") as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec.get("game", log_compact.DEFAULT_GAME) != game:
+                    continue
+                data = rec["data"]
+                if n < 0 or data.get("msg") == "RESET":
+                    n += 1
+                if n != reset or data.get("type") != "STATE":
+                    continue
+                if found is None and data["inning"] == label:
+                    found = 0
+                if found is not None:
+                    if found == plays:
+                        return data
+                    found += 1
+    return None
+
+def expected_state(states, inning, half, plays):
+    """경기의 STATE 목록에서 (이닝, 초/말) 시작 후 plays번째 (1회 초 시작은 초기 상태)"""
+    label = f"{inning}회 {'초' if half == 0 else '말'}"
+    if (inning, half) == (1, 0):
+        states = [current_state(init_state())] + states
+    for i, s in enumerate(states):
+        if s["inning"] == label:
+            return states[i + plays] if i + plays < len(states) else None
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="로그 압축/색인")
+    parser.add_argument("--files", type=int, default=2)
+    parser.add_argument("--games", type=int, default=200, help="파일당 완료 경기 수")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=10, help="색인 없이 찾는 비교 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, _ = write_archive(tmp, args.files, args.games, args.seed)
+        before = sum(os.path.getsize(p) for p in paths)
+        out = os.path.join(tmp, "compact")
+        summary, elapsed = timed(log_compact.compact, paths, out)
+        after = sum(os.path.getsize(os.path.join(out, name))
+                    for name in (log_compact.DATA_FILE, log_compact.INDEX_FILE, log_compact.META_FILE))
+        print(f"압축: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB ({after / before * 100:.1f}%), {elapsed:.2f}s  "
+              f"구간 {summary['segments']}개, STATE {summary['dropped_states']}줄 버림 / {summary['kept_states']}줄 남김")
+
+        queries, checked, indexed, segments = verify(paths, out, args.lookups, rng)
+        start = time.perf_counter()
+        for game, reset, inning, half, plays, _ in queries[:args.scans]:
+            scan_state(paths, game, reset, inning, half, plays)
+        scanned = (time.perf_counter() - start) / args.scans
+
+        print(f"조회 (색인): {indexed * 1e6:,.1f}us/건  ({len(queries)}건)")
+        print(f"조회 (처음부터 읽기): {scanned * 1e3:,.1f}ms/건  ({args.scans}건, {scanned / indexed:,.0f}x)")
+
+        # RESET 없이 이어진 로그도 경기를 나눠 색인이 되돌아가지 않음
+        restarted = [without_resets(paths[0], os.path.join(tmp, "restarted.jsonl"))]
+        log_compact.compact(restarted, os.path.join(tmp, "restarted"))
+        _, restarted_checked, _, restarted_segments = verify(restarted, os.path.join(tmp, "restarted"),
+                                                             args.lookups, rng)
+        print(f"검사 통과: expand = 원래 로그 (구간 {segments}개), 조회 {checked}건 = 원래 STATE, "
+              f"RESET 없는 로그도 구간 {restarted_segments}개로 나눠 조회 {restarted_checked}건 일치")
+
+if __name__ == "__main__":
+    main()
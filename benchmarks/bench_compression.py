@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+압축 정책 벤치마크 (접속 수 x 정책)
+사용법: python benchmarks/bench_compression.py [--connections 50 200 500] [--pitches 100] [--proto state|delta]
+설명: 정책마다 server_websocket.py를 따로 띄우고(서버 CPU/RSS만 따로 재기 위해), 관중(STATE 또는 DELTA 프로토콜) N명이
+      같은 게임을 보는 동안 기록원이 AB pitches개를 하나씩 보낸다. 정책:
+        - 끔: --compression off (클라이언트가 요청해도 압축하지 않음)
+        - 라이브러리: 모두 압축, 창 12비트, memLevel 5 (websockets 기본 동작과 같음)
+        - 기본: 32 bytes 이상만 압축, 창 10비트, memLevel 2
+        - 128B 이상: 기본 + --compression-min-size 128 (작은 DELTA/ACK는 그대로)
+        - 작은 창: 기본 + 창 9비트, memLevel 1
+      관중이 소켓에서 받은 바이트(관중당 메시지당), 방송 동안의 서버 CPU 시간, 관중이 모두 붙은 뒤의
+      서버 RSS 증가분(접속당), 서버가 METRICS로 알려준 압축률과 압축 CPU 시간을 출력한다.
+      모든 정책에서 관중이 따라간 마지막 상태가 방의 STATE와 같은지 확인한다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_batch import pitches
+from common import ROOT
+from loadgen import raise_fd_limit, rss_kb, wait_server
+import websockets
+from websockets.asyncio.client import ClientConnection
+
+POLICIES = [
+    ("끔", ["--compression", "off"]),
+    ("라이브러리", ["--compression-min-size", "0", "--compression-window", "12", "--compression-memory", "5"]),
+    ("기본", []),
+    ("128B 이상", ["--compression-min-size", "128"]),
+    ("작은 창", ["--compression-window", "9", "--compression-memory", "1"]),
+]
+CONNECT_CONCURRENCY = 100
+
+received_bytes = [0]
+
+class CountingConnection(ClientConnection):
+    """소켓에서 읽은 바이트(압축된 그대로)를 센다"""
+
+    def data_received(self, data):
+        received_bytes[0] += len(data)
+        super().data_received(data)
+
+def cpu_seconds(pid) -> float:
+    """프로세스가 쓴 CPU 시간 (user + system)"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+class Viewer:
+    """받은 STATE/DELTA로 경기 상태를 따라감"""
+
+    def __init__(self):
+        self.state = None
+        self.ready = asyncio.Event()
+
+    async def watch(self, uri, gate):
+        async with gate:
+            ws = await websockets.connect(uri, create_connection=CountingConnection, open_timeout=60)
+        async with ws:
+            async for message in ws:
+                message = json.loads(message)
+                if message["type"] == "STATE":
+                    message.pop("seq", None)
+                    self.state = message
+                elif message["type"] == "DELTA":
+                    self.state.update(message["changes"])
+                self.ready.set()
+
+async def measure(uri, pid, connections, events, proto):
+    gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    rss_base = rss_kb(pid)
+    viewers = [Viewer() for _ in range(connections)]
+    tasks = [asyncio.create_task(v.watch(f"{uri}/bench?proto={proto}", gate)) for v in viewers]
+    for v in viewers:
+        await v.ready.wait()
+    await asyncio.sleep(0.5)
+    rss_connected = rss_kb(pid)
+
+    async with websockets.connect(f"{uri}/bench") as scorer:
+        await scorer.recv()
+        cpu_start, bytes_start = cpu_seconds(pid), received_bytes[0]
+        start = time.perf_counter()
+        for event in events:
+            await scorer.send(json.dumps(event))
+            while json.loads(await scorer.recv())["type"] not in ("ACK", "END", "ERROR"):
+                pass
+        # 방의 마지막 STATE (RESYNC 응답은 앞서 보낸 STATE들 뒤에 옴)
+        await scorer.send(json.dumps({"type": "RESYNC"}))
+        while (last_state := json.loads(await scorer.recv()))["type"] != "STATE":
+            pass
+        # 관중이 모두 마지막 상태까지 받을 때까지
+        while any(v.state != last_state for v in viewers):
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        cpu = cpu_seconds(pid) - cpu_start
+        wire = received_bytes[0] - bytes_start
+        await scorer.send(json.dumps({"type": "METRICS"}))
+        while (message := json.loads(await scorer.recv()))["type"] != "METRICS":
+            pass
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {"wire": wire, "cpu": cpu, "elapsed": elapsed, "rss_base": rss_base, "rss_connected": rss_connected,
+            "compression": message["compression"], "state": last_state}
+
+async def run(policy, connections, events, port, proto):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server_websocket.py"), "--port", str(port),
+             "--log", os.path.join(tmp, "log.jsonl"), "--events", os.path.join(tmp, "events"), *policy],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        uri = f"ws://127.0.0.1:{port}"
+        try:
+            await wait_server(uri)
+            return await measure(uri, server.pid, connections, events, proto)
+        finally:
+            server.send_signal(2)
+            server.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description="압축 정책별 대역폭/CPU/RSS")
+    parser.add_argument("--connections", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--pitches", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--proto", choices=("state", "delta"), default="state", help="관중 프로토콜")
+    parser.add_argument("--port", type=int, default=5091)
+    args = parser.parse_args()
+    raise_fd_limit()
+    events = pitches(args.pitches, args.seed)
+
+    print(f"투구 {len(events)}개, 관중({args.proto.upper()}) 메시지 = 투구 수 x 접속 수")
+    print(f"{'정책':<8} {'접속':>5} {'관중당 메시지당':>14} {'서버 CPU':>9} {'메시지당 CPU':>11} "
+          f"{'RSS 증가/접속':>12} {'압축률':>6} {'압축 CPU':>8} {'건너뜀':>7}")
+    states = []
+    for connections in args.connections:
+        for name, policy in POLICIES:
+            r = asyncio.run(run(policy, connections, events, args.port, args.proto))
+            messages = len(events) * connections
+            c = r["compression"]
+            per_conn = (r["rss_connected"] - r["rss_base"]) * 1024 / connections
+            ratio = f"{c['ratio']:.2f}" if c.get("ratio") else "-"
+            print(f"{name:<8} {connections:5d} {r['wire'] / messages:12,.0f} B {r['cpu']:8.2f}s "
+                  f"{r['cpu'] / messages * 1e6:9.1f}µs {per_conn / 1024:10,.1f}KB {ratio:>6} "
+                  f"{c.get('seconds', 0):7.2f}s {c.get('skipped', 0):7,d}")
+            states.append(r["state"])
+    assert all(state == states[0] for state in states), "정책에 따라 관중의 마지막 상태가 다름"
+    print("검사 통과: 모든 정책/접속 수에서 관중의 마지막 상태 = 방의 STATE")
+
+if __name__ == "__main__":
+    main()
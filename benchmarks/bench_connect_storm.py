@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+접속 폭주 벤치마크 (경기 시작 직후 관중이 한꺼번에 들어오는 상황)
+사용법: python benchmarks/bench_connect_storm.py [--clients 2000] [--delta-ratio 0.5]
+설명: 진행 중인 게임 하나에 관중 N명이 동시에 접속하고, 접속 시작부터 첫 STATE를 받을 때까지의
+      시간(time-to-first-state) p50/p99/최대와 전체 소요 시간을 출력한다.
+      인코딩해 둔 STATE를 재사용하는 현재 방식과, 접속마다 current_state() + json.dumps를 하던
+      이전 방식(캐시 없음)을 같은 조건에서 비교하고, 캐시를 쓸 때 실제 인코딩 횟수도 보여준다.
+      (클라이언트도 같은 프로세스에서 돌기 때문에 전체 시간은 핸드셰이크 비용이 대부분이므로
+       접속 한 번당 서버의 STATE 준비 비용도 따로 출력한다)
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from common import AB_CYCLE, quiet, running_server
+import codec
+import server_websocket
+import websockets
+from game_room import GameRoom
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def uncached_frame(room, delta=False, using=codec.JSON):
+    """이전 방식: 요청마다 상태 계산 + 직렬화"""
+    room.state_encodes += 1
+    snapshot = room.state_payload()
+    if delta:
+        snapshot["seq"] = room.seq
+    return json.dumps(snapshot, ensure_ascii=False).encode("utf-8")
+
+async def viewer(uri, times):
+    t0 = time.perf_counter()
+    async with websockets.connect(uri, open_timeout=120) as ws:
+        await ws.recv()
+        times.append(time.perf_counter() - t0)
+
+async def storm(args):
+    async with running_server() as base:
+        room = server_websocket.rooms.get("storm")
+        room.apply({"type": "SET_LINEUP", "away_lineup": [f"원정{i}" for i in range(1, 10)],
+                    "home_lineup": [f"홈{i}" for i in range(1, 10)]})
+        for result in AB_CYCLE[:7]:
+            room.apply({"type": "AB", "batter": "", "result": result})
+            room.publish_state()
+        encodes = room.state_encodes
+        n_delta = int(args.clients * args.delta_ratio)
+        uris = [f"{base}/storm?proto=delta"] * n_delta + [f"{base}/storm"] * (args.clients - n_delta)
+        times = []
+        start = time.perf_counter()
+        await asyncio.gather(*(viewer(uri, times) for uri in uris))
+        return times, time.perf_counter() - start, room.state_encodes - encodes
+
+def frame_cost(n=20000):
+    """접속 한 번에 서버가 STATE 프레임을 준비하는 비용 (us)"""
+    room = GameRoom("cost")
+    for result in AB_CYCLE[:7]:
+        room.apply({"type": "AB", "batter": "", "result": result})
+        room.publish_state()
+    costs = {}
+    for name, fn in (("캐시 없음", uncached_frame), ("캐시 사용", GameRoom.snapshot_frame)):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(room, i % 2 == 0)
+        costs[name] = (time.perf_counter() - start) / n * 1e6
+    return costs
+
+def main():
+    parser = argparse.ArgumentParser(description="접속 폭주 time-to-first-state")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--delta-ratio", type=float, default=0.5, help="DELTA 프로토콜로 접속하는 비율")
+    args = parser.parse_args()
+
+    costs = frame_cost()
+    print("접속당 STATE 준비: " + ", ".join(f"{k} {v:.2f}us" for k, v in costs.items()))
+    cached = GameRoom.snapshot_frame
+    for name, frame_fn in (("캐시 없음", uncached_frame), ("캐시 사용", cached)):
+        GameRoom.snapshot_frame = frame_fn
+        try:
+            with quiet():
+                times, elapsed, encodes = asyncio.run(storm(args))
+        finally:
+            GameRoom.snapshot_frame = cached
+        print(f"{name}: 접속 {len(times)}개 {elapsed:.2f}s ({len(times) / elapsed:,.0f}/s)  "
+              f"첫 STATE p50={percentile(times, 50) * 1e3:.0f}ms p99={percentile(times, 99) * 1e3:.0f}ms "
+              f"max={max(times) * 1e3:.0f}ms  STATE 인코딩 {encodes}회")
+
+if __name__ == "__main__":
+    main()
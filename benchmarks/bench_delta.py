@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+전체 STATE vs DELTA 대역폭 비교
+사용법: python benchmarks/bench_delta.py [--log game_log_websocket.jsonl] [--viewers 1000]
+설명: 로그에 기록된 STATE를 순서대로 재생하며, 매번 전체 STATE를 보낼 때와
+      바뀐 필드만 DELTA로 보낼 때의 프레임 크기와 JSON 인코딩 시간을 비교한다.
+      (팬아웃은 메시지당 한 번 인코딩하므로 인코딩 비용은 관중 수와 무관하고,
+       전송 바이트는 관중 수에 비례한다)
+"""
+
+import argparse
+import json
+import os
+import time
+
+from common import ROOT
+from game_room import state_changes
+
+def replay_states(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            data = json.loads(line).get("data", {})
+            if data.get("type") == "STATE":
+                yield data
+
+def encode(obj):
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+def run(path, viewers, repeat):
+    states = list(replay_states(path))
+    full_bytes = delta_bytes = 0
+    full_time = delta_time = 0.0
+    for _ in range(repeat):
+        prev = None
+        for seq, snapshot in enumerate(states, 1):
+            t0 = time.perf_counter()
+            full = encode(snapshot)
+            t1 = time.perf_counter()
+            if prev is None:
+                delta = encode({**snapshot, "seq": seq})
+            else:
+                delta = encode({"type": "DELTA", "seq": seq, "changes": state_changes(prev, snapshot)})
+            t2 = time.perf_counter()
+            full_time += t1 - t0
+            delta_time += t2 - t1
+            full_bytes += len(full)
+            delta_bytes += len(delta)
+            prev = snapshot
+    n = len(states) * repeat
+    print(f"STATE {len(states)}개 x {repeat}회 재생, 관중 {viewers}명")
+    print(f"  전체 STATE : 평균 {full_bytes / n:6.1f} B/프레임, 전송 {full_bytes * viewers / repeat / 1e6:8.2f} MB, 인코딩 {full_time / n * 1e6:.2f} us/프레임")
+    print(f"  DELTA      : 평균 {delta_bytes / n:6.1f} B/프레임, 전송 {delta_bytes * viewers / repeat / 1e6:8.2f} MB, 인코딩 {delta_time / n * 1e6:.2f} us/프레임")
+    print(f"  절감률     : {100 * (1 - delta_bytes / full_bytes):.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 STATE vs DELTA 대역폭 비교")
+    parser.add_argument("--log", default=os.path.join(ROOT, "game_log_websocket.jsonl"))
+    parser.add_argument("--viewers", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20, help="인코딩 시간 측정을 위한 반복 횟수")
+    args = parser.parse_args()
+    run(args.log, args.viewers, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+규칙 엔진 처리량 벤치마크
+사용법: python benchmarks/bench_engine.py [--transitions 1000000]
+설명: 두 엔진의 apply_ab와 fast_engine.step의 transitions/sec를 출력한다.
+      두 엔진의 출력이 바이트 단위로 같은지는 tests/test_engine.py가 확인한다 (python -m pytest tests).
+"""
+
+import argparse
+import random
+import time
+
+import common  # noqa: F401  (저장소 루트를 import 경로에 추가)
+import fast_engine
+import game_engine
+
+def sequence(n, seed):
+    rng = random.Random(seed)
+    weights = [20, 25, 20, 10, 8, 3, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+    return rng.choices(fast_engine.RESULTS, weights=weights, k=n)
+
+def bench_ref(results):
+    state = game_engine.init_state()
+    start = time.perf_counter()
+    for r in results:
+        game_engine.apply_ab(state, "", r)
+        if state["game_over"]:
+            state = game_engine.init_state()
+    return time.perf_counter() - start
+
+def bench_fast(results):
+    gs = fast_engine.GameState()
+    start = time.perf_counter()
+    for r in results:
+        fast_engine.apply_ab(gs, "", r)
+        if gs.game_over:
+            gs = fast_engine.GameState()
+    return time.perf_counter() - start
+
+def bench_step(results):
+    codes = [fast_engine.CODES[r] for r in results]
+    gs = fast_engine.GameState()
+    step = fast_engine.step
+    start = time.perf_counter()
+    for code in codes:
+        if step(gs, code):
+            gs = fast_engine.GameState()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="규칙 엔진 처리량")
+    parser.add_argument("--transitions", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = sequence(args.transitions, args.seed)
+    for name, fn in (("game_engine.apply_ab", bench_ref), ("fast_engine.apply_ab", bench_fast),
+                     ("fast_engine.step", bench_step)):
+        elapsed = fn(results)
+        print(f"{name:22s}: {args.transitions / elapsed:12.0f} transitions/sec")
+
+if __name__ == "__main__":
+    main()
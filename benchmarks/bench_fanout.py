@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+팬아웃 부하 테스트 (가짜 로컬 클라이언트 5천 개)
+사용법: python benchmarks/bench_fanout.py [--clients 5000] [--messages 200] [--slow 0.02]
+설명: 기존 gather 방식 broadcast와 fanout 엔진을 같은 관중 구성으로 비교한다.
+      관중 일부(--slow 비율)는 프레임마다 --slow-delay초씩 늦게 받는다.
+      게시자(AB 처리 쪽) 지연, 빠른 관중 전달 완료 시간, 버린 프레임 수를 출력한다.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from common import AB_CYCLE
+import fanout
+from game_engine import apply_ab, current_state, init_state
+
+class FakeClient:
+    """송신만 흉내 내는 가짜 websocket"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.received = 0
+        self.remote_address = ("127.0.0.1", 0)
+
+    async def send(self, message, text=None):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+def make_clients(count, slow_ratio, slow_delay):
+    slow_every = int(1 / slow_ratio) if slow_ratio else 0
+    return [FakeClient(slow_delay if slow_every and i % slow_every == 0 else 0.0) for i in range(count)]
+
+def states(count):
+    state = init_state()
+    for i in range(count):
+        apply_ab(state, "타자", AB_CYCLE[i % len(AB_CYCLE)])
+        if state["game_over"]:
+            state = init_state()
+        yield current_state(state)
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+async def wait_fast(clients, messages):
+    fast = [c for c in clients if not c.delay]
+    while any(c.received < messages for c in fast):
+        await asyncio.sleep(0.001)
+
+async def run_gather(clients, messages):
+    """기존 방식: 메시지마다 json.dumps 후 모든 send를 gather"""
+    publish = []
+    start = time.perf_counter()
+    for snapshot in states(messages):
+        t0 = time.perf_counter()
+        message = json.dumps(snapshot, ensure_ascii=False)
+        await asyncio.gather(*[c.send(message) for c in clients], return_exceptions=True)
+        publish.append(time.perf_counter() - t0)
+    await wait_fast(clients, messages)
+    return publish, time.perf_counter() - start, {}
+
+async def run_fanout(clients, messages, policy, queue_size):
+    subs = [fanout.Subscriber(c, queue_size, policy) for c in clients]
+    publish = []
+    peak = 0
+    start = time.perf_counter()
+    for snapshot in states(messages):
+        t0 = time.perf_counter()
+        fanout.broadcast(subs, snapshot)
+        publish.append(time.perf_counter() - t0)
+        peak = max(peak, fanout.queue_metrics(subs)["queue_depth_max"])
+        await asyncio.sleep(0)  # 실제 서버처럼 다음 AB 전에 루프에 양보
+    await wait_fast(clients, messages)
+    elapsed = time.perf_counter() - start
+    metrics = fanout.queue_metrics(subs)
+    metrics["queue_depth_peak"] = peak
+    metrics.update(fanout.stats)
+    for sub in subs:
+        sub.close()
+    return publish, elapsed, metrics
+
+def report(name, publish, elapsed, metrics):
+    print(f"[{name}]")
+    print(f"  게시 지연 p50={percentile(publish, 50) * 1000:.3f}ms  p99={percentile(publish, 99) * 1000:.3f}ms")
+    print(f"  빠른 관중 전달 완료: {elapsed:.3f}s")
+    if metrics:
+        print(f"  지표: {json.dumps(metrics)}")
+
+async def run(args):
+    clients = make_clients(args.clients, args.slow, args.slow_delay)
+    report("gather", *(await run_gather(clients, args.messages)))
+    clients = make_clients(args.clients, args.slow, args.slow_delay)
+    report(f"fanout/{args.policy}", *(await run_fanout(clients, args.messages, args.policy, args.queue)))
+
+def main():
+    parser = argparse.ArgumentParser(description="팬아웃 부하 테스트")
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--slow", type=float, default=0.02, help="느린 관중 비율")
+    parser.add_argument("--slow-delay", type=float, default=0.02, help="느린 관중의 프레임당 지연(초)")
+    parser.add_argument("--policy", default="latest", choices=fanout.POLICIES)
+    parser.add_argument("--queue", type=int, default=fanout.DEFAULT_QUEUE_SIZE)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
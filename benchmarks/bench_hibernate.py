@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+게임 휴면 벤치마크 (메모리에 모두 두기 vs 쉬는 게임을 디스크로)
+사용법: python benchmarks/bench_hibernate.py [--games 100000] [--resident 10000] [--max-resident 1000]
+설명: 라인업과 300구 안팎의 기록이 있는 지난 경기(서로 다른 경기 variants개를 돌려 씀)를
+        - 모두 메모리: 휴면 없는 RoomRegistry에 resident개 (게임 하나당 메모리를 재고 games개로 늘려 어림)
+        - 휴면: 휴면 파일과 --max-resident 상한이 있는 RoomRegistry에 games개
+      로 올려 놓고, 각각 새 프로세스에서 RSS 증가분(게임당)과 휴면 파일 크기를 잰다.
+      휴면 게임을 무작위로 되살리는 시간(p50/p99)과, 서버(프로세스 안)에서 휴면 게임에
+      접속해 첫 STATE를 받기까지/AB 응답까지의 시간을 메모리에 있는 게임과 비교한다.
+      되살린 게임의 STATE/순번/누적 기록이 내리기 전과 같은지,
+      관중이 나간 뒤 쉰 게임이 sweep()으로 내려가는지도 확인한다.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from bench_batch import pitches
+from common import quiet, running_server
+import hibernate
+import server_websocket
+import websockets
+from game_room import GameRoom, RoomRegistry
+from loadgen import rss_kb
+
+LINEUP = [f"타자{i}" for i in range(1, 10)]
+
+def historical(variants, seed):
+    """지난 경기 dump() variants개"""
+    games = []
+    for k in range(variants):
+        room = GameRoom("plan")
+        room.apply({"type": "SET_LINEUP", "away_lineup": [f"원정{b}" for b in LINEUP],
+                    "home_lineup": [f"홈{b}" for b in LINEUP]})
+        events = pitches(300, seed + k)
+        for event in events:
+            room.apply(event)
+        room.seq = len(events)
+        games.append(room.dump())
+    return games
+
+def load(rooms, count, games):
+    for i in range(count):
+        rooms.get(f"hist{i}").restore(games[i % len(games)])
+
+def measure_proc(count, max_resident, games, directory, out):
+    """새 프로세스에서 게임 count개를 올린 뒤 (RSS 증가 KB, 메모리의 방 수, 휴면 수, 휴면 파일 bytes)"""
+    gc.collect()
+    base = rss_kb(os.getpid())
+    rooms = RoomRegistry()
+    cold = None
+    if max_resident is not None:
+        cold = hibernate.ColdStore(os.path.join(directory, hibernate.COLD_FILE))
+        rooms.hibernate(cold, max_resident=max_resident)
+    load(rooms, count, games)
+    gc.collect()
+    out.put((rss_kb(os.getpid()) - base, len(rooms), len(cold) if cold else 0, cold.size if cold else 0))
+
+def measure(count, max_resident, games, directory):
+    out = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=measure_proc, args=(count, max_resident, games, directory, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    return result
+
+def restore_latency(games, count, directory, samples, seed):
+    """휴면 게임을 무작위로 되살리는 시간 (ms 목록), 되살린 게임이 원래와 같은지"""
+    rooms = RoomRegistry()
+    rooms.hibernate(hibernate.ColdStore(os.path.join(directory, "latency.bin")), max_resident=samples + 1)
+    load(rooms, count, games)
+    rng = random.Random(seed)
+    times, same = [], True
+    for game in rng.sample(range(count - samples - 1), samples):
+        start = time.perf_counter()
+        room = rooms.get(f"hist{game}")
+        times.append((time.perf_counter() - start) * 1e3)
+        same = same and room.dump() == games[game % len(games)]
+    rooms.cold.close()
+    return times, same
+
+async def first_state(uri):
+    start = time.perf_counter()
+    async with websockets.connect(uri) as ws:
+        state = json.loads(await ws.recv())
+        joined = time.perf_counter() - start
+        await ws.send(json.dumps({"type": "SET_RUNNERS", "runners": ["1B"], "id": 1}))
+        while "id" not in (reply := json.loads(await ws.recv())):
+            pass
+        assert reply["type"] == "ACK", reply
+        return joined * 1e3, (time.perf_counter() - start) * 1e3, state
+
+async def server_checks(games, count, directory, samples):
+    """서버 안에서: 휴면 게임 접속 -> 첫 STATE, SET_RUNNERS 응답 시간 / 메모리 게임과 비교, sweep 확인"""
+    async with running_server() as base:
+        rooms = server_websocket.rooms
+        rooms.hibernate(hibernate.ColdStore(os.path.join(directory, "server.bin")), idle_seconds=0.2,
+                        max_resident=samples * 2)
+        load(rooms, count, games)
+        expected = RoomRegistry()
+        cold_ids = [f"hist{i}" for i in range(samples)]           # 앞쪽은 상한 때문에 휴면 중
+        warm_ids = [f"hist{count - 1 - i}" for i in range(samples)]
+        assert all(g in rooms.cold for g in cold_ids) and all(g in rooms.rooms for g in warm_ids)
+        results = {}
+        for name, ids in (("휴면", cold_ids), ("메모리", warm_ids)):
+            joins, acks = [], []
+            for game_id in ids:
+                joined, acked, state = await first_state(f"{base}/{game_id}")
+                joins.append(joined)
+                acks.append(acked)
+                room = expected.get(game_id)
+                room.restore(games[int(game_id[4:]) % len(games)])
+                assert state == room.snapshot(), f"{game_id}: 되살린 STATE가 다름"
+            results[name] = (joins, acks)
+        # 관중이 나간 뒤 idle_seconds가 지나면 sweep()이 내림
+        await asyncio.sleep(0.3)
+        rooms.sweep(time.monotonic())
+        swept = all(g in rooms.cold for g in cold_ids)
+        room = expected.get(cold_ids[0])
+        room.apply({"type": "SET_RUNNERS", "runners": ["1B"]})
+        room.refresh()
+        return results, swept and rooms.get(cold_ids[0]).snapshot() == room.snapshot()
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def main():
+    parser = argparse.ArgumentParser(description="쉬는 게임 휴면: 메모리/되살리기 시간")
+    parser.add_argument("--games", type=int, default=100000, help="지난 경기 수")
+    parser.add_argument("--resident", type=int, default=10000, help="모두 메모리에 둘 때 잴 게임 수")
+    parser.add_argument("--max-resident", type=int, default=1000, help="휴면 때 메모리에 둘 최대 게임 수")
+    parser.add_argument("--variants", type=int, default=50, help="서로 다른 경기 수")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    games = historical(args.variants, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kb, resident, _, _ = measure(args.resident, None, games, tmp)
+        per_game = kb * 1024 / resident
+        print(f"모두 메모리: 게임 {resident:,}개 RSS +{kb / 1024:,.1f}MB -> 게임당 {per_game / 1024:,.1f}KB "
+              f"(게임 {args.games:,}개면 약 {per_game * args.games / 2**20:,.0f}MB)")
+
+        start = time.perf_counter()
+        kb, resident, cold, size = measure(args.games, args.max_resident, games, tmp)
+        elapsed = time.perf_counter() - start
+        print(f"휴면: 게임 {args.games:,}개 (메모리 {resident:,}개, 휴면 {cold:,}개) RSS +{kb / 1024:,.1f}MB "
+              f"-> 게임당 {kb * 1024 / args.games:,.0f}B, 휴면 파일 {size / 2**20:,.1f}MB "
+              f"(게임당 {size / cold:,.0f}B), 올리는 데 {elapsed:.1f}s")
+
+        times, same = restore_latency(games, min(args.games, 20000), tmp, args.samples, args.seed)
+        print(f"되살리기 (get): p50 {statistics.median(times):.3f}ms  p99 {pct(times, 0.99):.3f}ms")
+        assert same, "되살린 게임의 상태/순번/누적 기록이 다름"
+
+        with quiet():
+            results, swept = asyncio.run(server_checks(games, min(args.games, 20000), tmp, args.samples // 4))
+        for name, (joins, acks) in results.items():
+            print(f"서버 {name} 게임: 접속 -> 첫 STATE p50 {statistics.median(joins):.2f}ms "
+                  f"p99 {pct(joins, 0.99):.2f}ms,  SET_RUNNERS 응답까지 p50 {statistics.median(acks):.2f}ms")
+        assert swept, "관중이 나간 뒤 쉰 게임이 내려가지 않음 (또는 다시 되살린 상태가 다름)"
+    print("검사 통과: 되살린 STATE/순번/누적 기록 동일, 쉰 게임은 sweep()으로 휴면")
+
+if __name__ == "__main__":
+    main()
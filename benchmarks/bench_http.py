@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 점수판 벤치마크 (ETag 304 vs 전체 응답)
+사용법: python benchmarks/bench_http.py [--games 100] [--connections 20] [--duration 3]
+설명: 서버(프로세스 안)에 게임 N개를 만들고 scoreboard_http의 경로를 임의 포트로 띄운 뒤,
+      keep-alive 연결 C개가 무작위 게임의 /games/<id>를
+        - 304: 마지막으로 받은 ETag를 If-None-Match로 보냄 (바뀌지 않은 폴링)
+        - 전체: 조건 없이 요청 (200 + STATE 본문)
+      으로 duration초 동안 반복해 초당 요청 수를 비교한다. /games 요약도 같은 방식으로 잰다.
+      본문이 방의 마지막 STATE와 같은지, AB 뒤에는 ETag가 바뀌어 200이 오는지,
+      SSE(/games/<id>/events)가 접속 시 STATE와 AB 뒤의 새 STATE를 보내는지도 확인한다.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from common import AB_CYCLE, quiet, running_server
+import http_api
+import server_websocket
+import websockets
+from scoreboard_http import Scoreboard
+
+async def get(reader, writer, path, etag=None):
+    """GET 하나 -> (상태 코드, 헤더 dict, 본문)"""
+    head = f"GET {path} HTTP/1.1\r\nHost: bench\r\n"
+    if etag:
+        head += f"If-None-Match: {etag}\r\n"
+    writer.write((head + "\r\n").encode("ascii"))
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+async def poller(port, paths, conditional, stop, counts, size, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {}
+    try:
+        while not stop.is_set():
+            path = rng.choice(paths)
+            status, headers, body = await get(reader, writer, path, etags.get(path) if conditional else None)
+            counts[status] = counts.get(status, 0) + 1
+            size[0] += len(body)
+            etags[path] = headers.get("etag")
+    finally:
+        writer.close()
+
+async def rate(port, paths, conditional, args):
+    stop, counts, size = asyncio.Event(), {}, [0]
+    tasks = [asyncio.create_task(poller(port, paths, conditional, stop, counts, size, i))
+             for i in range(args.connections)]
+    start = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    total = sum(counts.values())
+    return total / (time.perf_counter() - start), size[0] / total, counts
+
+async def checks(port, base):
+    """본문 = 마지막 STATE, AB 뒤 ETag 변경, SSE"""
+    room = server_websocket.rooms.get("g0")
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    status, headers, body = await get(reader, writer, "/games/g0")
+    assert status == 200 and json.loads(body) == room.snapshot(), "본문이 마지막 STATE와 다름"
+    etag = headers["etag"]
+    assert (await get(reader, writer, "/games/g0", etag))[0] == 304, "같은 ETag인데 304가 아님"
+    assert (await get(reader, writer, "/games/nope"))[0] == 404, "없는 게임인데 404가 아님"
+    status, _, body = await get(reader, writer, "/games")
+    summary = {g["game"]: g for g in json.loads(body)["games"]}
+    assert summary["g0"]["seq"] == room.seq and summary["g0"]["away"] == room.snapshot()["away"], "요약이 다름"
+
+    sse_reader, sse_writer = await asyncio.open_connection("127.0.0.1", port)
+    sse_writer.write(b"GET /games/g0/events HTTP/1.1\r\nHost: bench\r\n\r\n")
+    while (await sse_reader.readline()) not in (b"\r\n", b""):
+        pass
+
+    async def event():
+        line = await asyncio.wait_for(sse_reader.readline(), 5)
+        await sse_reader.readline()
+        assert line.startswith(b"data: "), line
+        return json.loads(line[6:])
+
+    assert await event() == room.snapshot(), "SSE 첫 STATE가 다름"
+    async with websockets.connect(f"{base}/g0") as ws:
+        await ws.recv()
+        await ws.send(json.dumps({"type": "AB", "batter": "", "result": "HR"}))
+        await ws.recv()
+    assert await event() == room.snapshot(), "SSE가 AB 뒤 STATE를 보내지 않음"
+    status, headers, _ = await get(reader, writer, "/games/g0", etag)
+    assert status == 200 and headers["etag"] != etag, "AB 뒤에도 ETag가 같음"
+    sse_writer.close()
+    writer.close()
+
+async def run(args):
+    async with running_server() as base:
+        for g in range(args.games):
+            room = server_websocket.rooms.get(f"g{g}")
+            for i in range(g % 40):
+                room.apply({"type": "AB", "batter": "", "result": AB_CYCLE[i % len(AB_CYCLE)]})
+                room.publish_state()
+        server = await http_api.serve("127.0.0.1", 0, Scoreboard(server_websocket.rooms).routes())
+        port = next(iter(server.sockets)).getsockname()[1]
+        try:
+            await checks(port, base)
+            games = [f"/games/g{g}" for g in range(args.games)]
+            return [(name, await rate(port, paths, conditional, args))
+                    for name, paths, conditional in (("게임 304", games, True), ("게임 전체", games, False),
+                                                     ("요약 304", ["/games"], True), ("요약 전체", ["/games"], False))]
+        finally:
+            server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 점수판 304 vs 전체 응답")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with quiet():
+        results = asyncio.run(run(args))
+    print(f"게임 {args.games}개, keep-alive 연결 {args.connections}개")
+    for name, (per_sec, size, counts) in results:
+        print(f"{name}: {per_sec:8,.0f} req/s  본문 평균 {size:7,.0f} bytes  {dict(sorted(counts.items()))}")
+    print("검사 통과: 본문 = 마지막 STATE, 같은 ETag는 304, AB 뒤 ETag 변경, SSE가 STATE를 보냄")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로그 기록기 마이크로 벤치마크
+사용법: python benchmarks/bench_log_writer.py [--abs 20000] [--fsync none]
+설명: AB 하나마다 ACK와 STATE 두 줄을 기록하는 서버 경로를
+      기존 방식(매번 open/append/close)과 LogWriter로 각각 돌려 AB/sec를 비교한다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from common import AB_CYCLE
+from game_engine import apply_ab, current_state, init_state
+from log_writer import LogWriter
+
+def old_log_event(path, data):
+    """기존 서버의 log_event (이벤트마다 파일 열기)"""
+    with open(path, "a", encoding="utf-8") as f:
+        line = json.dumps({"timestamp": datetime.now().isoformat(), "data": data}, ensure_ascii=False)
+        f.write(line + "\n")
+
+async def run_old(path, abs_count):
+    state = init_state()
+    start = time.perf_counter()
+    for i in range(abs_count):
+        res = apply_ab(state, "타자", AB_CYCLE[i % len(AB_CYCLE)])
+        old_log_event(path, res)
+        old_log_event(path, current_state(state))
+        if state["game_over"]:
+            state = init_state()
+        if i % 64 == 0:
+            await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+async def run_new(path, abs_count, fsync):
+    state = init_state()
+    start = time.perf_counter()
+    async with LogWriter(path, fsync=fsync) as writer:
+        for i in range(abs_count):
+            res = apply_ab(state, "타자", AB_CYCLE[i % len(AB_CYCLE)])
+            await writer.write(res, game="bench")
+            await writer.write(current_state(state), game="bench")
+            if state["game_over"]:
+                state = init_state()
+            if i % 64 == 0:
+                await asyncio.sleep(0)
+    return time.perf_counter() - start, writer.metrics()
+
+async def run(abs_count, fsync):
+    with tempfile.TemporaryDirectory() as tmp:
+        old = await run_old(os.path.join(tmp, "old.jsonl"), abs_count)
+        new, metrics = await run_new(os.path.join(tmp, "new.jsonl"), abs_count, fsync)
+    print(f"기존 log_event : {abs_count / old:10.0f} AB/sec")
+    print(f"LogWriter      : {abs_count / new:10.0f} AB/sec  (fsync={fsync})")
+    print(f"지표: {json.dumps(metrics)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="로그 기록 방식별 AB 처리량")
+    parser.add_argument("--abs", type=int, default=20000)
+    parser.add_argument("--fsync", default="none", choices=["none", "batch", "interval"])
+    args = parser.parse_args()
+    asyncio.run(run(args.abs, args.fsync))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지표 기록 오버헤드 벤치마크
+사용법: python benchmarks/bench_metrics.py [--games 4] [--viewers 50] [--abs 500] [--rounds 3]
+설명: 같은 서버(프로세스 안)에서 metrics.enabled를 켜고/끄며 번갈아 AB 처리량을 재고,
+      중앙값 기준 처리량 차이(%)를 출력한다. 켠 상태에서는 프로파일러를 돌린 경우도 잰다.
+      기록 함수 한 번의 비용(us)과 METRICS 응답 크기도 함께 보여준다.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from common import AB_CYCLE, quiet, running_server
+import metrics
+import server_websocket
+import websockets
+
+async def scorer(uri, abs_count):
+    async with websockets.connect(uri) as ws:
+        await ws.recv()
+        for i in range(abs_count):
+            await ws.send(json.dumps({"type": "AB", "batter": "", "result": AB_CYCLE[i % len(AB_CYCLE)]}))
+            while json.loads(await ws.recv())["type"] not in ("ACK", "END", "ERROR"):
+                pass
+
+async def viewer(uri, stop):
+    async with websockets.connect(uri + "?proto=delta") as ws:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(ws.recv(), 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+async def round_trip(args, enabled, profile=False):
+    """AB/s 한 번 측정"""
+    metrics.enabled = enabled
+    async with running_server() as base:
+        stop = asyncio.Event()
+        uris = [f"{base}/metrics{g}" for g in range(args.games)]
+        viewers = [asyncio.create_task(viewer(uris[i % args.games], stop)) for i in range(args.viewers)]
+        lag = asyncio.create_task(metrics.sample_loop_lag())
+        await asyncio.sleep(0.2)
+        if profile:
+            metrics.profiler.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(scorer(uri, args.abs) for uri in uris))
+        elapsed = time.perf_counter() - start
+        if profile:
+            metrics.profiler.stop()
+        stop.set()
+        lag.cancel()
+        await asyncio.gather(*viewers)
+        size = len(json.dumps(server_websocket.metrics_snapshot()))
+    metrics.enabled = True
+    return args.games * args.abs / elapsed, size
+
+def record_cost(n=200000):
+    start = time.perf_counter()
+    for i in range(n):
+        metrics.observe_command("AB", i * 1e-7)
+    return (time.perf_counter() - start) / n * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="지표 기록 오버헤드")
+    parser.add_argument("--games", type=int, default=4)
+    parser.add_argument("--viewers", type=int, default=50)
+    parser.add_argument("--abs", type=int, default=500, help="게임마다 보낼 AB 수")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"observe_command 1회: {record_cost():.3f}us")
+    rates = {"끔": [], "켬": [], "켬+프로파일러": []}
+    with quiet():
+        for _ in range(args.rounds):
+            rates["끔"].append(asyncio.run(round_trip(args, False))[0])
+            rate, size = asyncio.run(round_trip(args, True))
+            rates["켬"].append(rate)
+            rates["켬+프로파일러"].append(asyncio.run(round_trip(args, True, profile=True))[0])
+    base = statistics.median(rates["끔"])
+    for name, values in rates.items():
+        median = statistics.median(values)
+        print(f"지표 {name}: AB {median:,.0f}/s ({(median - base) / base * 100:+.1f}%)  "
+              f"[{', '.join(f'{v:,.0f}' for v in values)}]")
+    print(f"METRICS 응답 크기: {size:,} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이벤트 스트림 복구 벤치마크
+사용법: python benchmarks/bench_recovery.py [--games 10000] [--events 60] [--snapshot-at 0.9]
+설명: 게임 N개의 입력 명령을 EventStore로 기록하고(--snapshot-at 지점에서 스냅샷 1회),
+      전체 재생 복구와 스냅샷+꼬리 재생 복구에 걸리는 시간을 비교한다.
+      두 방식 모두 기록할 때의 게임 상태와 같은지도 확인한다.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from common import AB_CYCLE
+from event_store import EventStore, recover
+from game_room import RoomRegistry
+
+def commands(games, events):
+    """게임들을 번갈아 가며 (게임 ID, 명령)을 생성"""
+    for game in range(games):
+        yield f"game{game}", {"type": "SET_LINEUP", "away_lineup": ["A1", "A2", "A3"], "home_lineup": ["H1", "H2", "H3"]}
+    for i in range(events):
+        for game in range(games):
+            result = AB_CYCLE[(i + game) % len(AB_CYCLE)]
+            yield f"game{game}", {"type": "AB", "batter": "", "result": result}
+
+async def record(directory, games, events, snapshot_at):
+    rooms = RoomRegistry()
+    store = await EventStore(directory, snapshot_every=10**12).start(rooms)
+    total = games * (events + 1)
+    snapshot_n = int(total * snapshot_at)
+    start = time.perf_counter()
+    for i, (game_id, event) in enumerate(commands(games, events), 1):
+        room = rooms.get(game_id)
+        room.apply(event)
+        if event["type"] != "SET_LINEUP":
+            room.seq += 1
+        await store.append(rooms, game_id, event)
+        if i == snapshot_n:
+            await store.snapshot(rooms)
+    await store.writer.close()  # 마지막 스냅샷 없이 종료 (꼬리가 남도록)
+    print(f"기록: 게임 {games}개, 이벤트 {total}개, {time.perf_counter() - start:.2f}s")
+    return rooms
+
+def check(expected, actual):
+    for room in expected:
+        other = actual.get(room.game_id)
+        assert other.dump() == room.dump(), room.game_id
+
+def main():
+    parser = argparse.ArgumentParser(description="이벤트 스트림 복구 시간")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=60, help="게임마다 AB 수")
+    parser.add_argument("--snapshot-at", type=float, default=0.9, help="스냅샷을 찍을 위치 (0~1)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        expected = asyncio.run(record(tmp, args.games, args.events, args.snapshot_at))
+        size = os.path.getsize(os.path.join(tmp, "events.jsonl"))
+        print(f"스트림 크기: {size / 1e6:.1f} MB")
+
+        for name, use_snapshot in (("전체 재생", False), ("스냅샷+꼬리", True)):
+            rooms = RoomRegistry()
+            start = time.perf_counter()
+            last_n = recover(tmp, rooms, use_snapshot=use_snapshot)
+            elapsed = time.perf_counter() - start
+            check(expected, rooms)
+            print(f"{name:8s}: {elapsed:6.2f}s  (게임 {len(rooms)}개, 마지막 이벤트 {last_n})")
+
+if __name__ == "__main__":
+    main()
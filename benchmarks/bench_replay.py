@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지난 경기 재방송 벤치마크
+사용법: python benchmarks/bench_replay.py [--replays 8] [--games 20] [--viewers 4]
+설명: bench_stats.py와 같은 방식으로 서버 형식 로그를 replays개 만들고, 한 서버(프로세스 안)에서
+      최대 속도(speed=0)로 동시에 재방송한다. 재방송 방마다 DELTA 관중을 붙여 두고
+      초당 내보낸 메시지 수와 RSS(시작 / 최대)를 출력한다. 로그를 4배로 늘려 한 번 더 돌려
+      RSS가 로그 크기를 따라 늘지 않는지 비교한다.
+      마지막 STATE가 로그와 같은지, 재방송 방이 입력 명령을 거절하는지,
+      배속 재생이 timestamp 간격(긴 공백은 max_gap)을 지키는지도 확인한다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_stats import write_archive
+from common import quiet, running_server
+import log_replay
+import server_websocket
+import websockets
+from loadgen import rss_kb
+
+async def viewer(uri, counts):
+    async with websockets.connect(uri + "?proto=delta") as ws:
+        async for _ in ws:
+            counts[0] += 1
+
+async def sample_rss(peak):
+    while True:
+        peak[0] = max(peak[0], rss_kb(os.getpid()) or 0)
+        await asyncio.sleep(0.05)
+
+def last_states(path, prefix):
+    """로그에서 게임마다 마지막 STATE"""
+    last = {}
+    for rec in log_replay.read_records(path):
+        if rec["data"].get("type") == "STATE":
+            last[log_replay.room_id(prefix, rec)] = rec["data"]
+    return last
+
+async def fast_run(paths, viewers):
+    """최대 속도 동시 재방송 -> (메시지 수, 걸린 시간, 관중이 받은 프레임 수, 시작 RSS, 최대 RSS)"""
+    async with running_server() as base:
+        counts = [0]
+        tasks = [asyncio.create_task(viewer(f"{base}/replay{i}-g{v % 4}", counts))
+                 for i in range(len(paths)) for v in range(viewers)]
+        await asyncio.sleep(0.5)
+        start_rss = rss_kb(os.getpid()) or 0
+        peak = [start_rss]
+        sampler = asyncio.create_task(sample_rss(peak))
+        start = time.perf_counter()
+        sent = await asyncio.gather(*(log_replay.replay_log(server_websocket.rooms, path, f"replay{i}-", speed=0)
+                                      for i, path in enumerate(paths)))
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+        await asyncio.sleep(0.2)
+
+        for i, path in enumerate(paths):
+            for game_id, state in last_states(path, f"replay{i}-").items():
+                assert server_websocket.rooms.get(game_id).last_snapshot == state, f"{game_id}: 마지막 STATE 불일치"
+        async with websockets.connect(f"{base}/replay0-g0") as ws:
+            await ws.recv()
+            await ws.send(json.dumps({"type": "AB", "batter": "", "result": "HR"}))
+            reply = json.loads(await ws.recv())
+            assert reply["type"] == "ERROR", f"재방송 방이 명령을 받음: {reply}"
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return sum(sent), elapsed, counts[0], start_rss, peak[0]
+
+async def paced_run(directory, records=50, interval=1.0, speed=50.0, max_gap=0.5):
+    """interval초 간격 로그(중간에 1시간 공백 하나)를 speed배속으로 -> 걸린 시간과 기대 시간"""
+    path = os.path.join(directory, "paced.jsonl")
+    t = datetime(2024, 1, 1)
+    with open(path, "w", encoding="utf-8") as out:
+        for i in range(records):
+            t += timedelta(hours=1) if i == records // 2 else timedelta(seconds=interval)
+            out.write(json.dumps({"timestamp": t.isoformat(), "game": "paced",
+                                  "data": {"type": "ACK", "msg": str(i)}}) + "\n")
+    async with running_server():
+        start = time.perf_counter()
+        await log_replay.replay_log(server_websocket.rooms, path, speed=speed, max_gap=max_gap)
+        elapsed = time.perf_counter() - start
+    expected = (records - 2) * interval / speed + max_gap
+    return elapsed, expected
+
+def main():
+    parser = argparse.ArgumentParser(description="지난 경기 재방송")
+    parser.add_argument("--replays", type=int, default=8, help="동시에 재방송할 로그 수")
+    parser.add_argument("--games", type=int, default=20, help="로그마다 완료 경기 수")
+    parser.add_argument("--viewers", type=int, default=4, help="재방송마다 DELTA 관중 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+        for scale in (1, 4):
+            directory = os.path.join(tmp, f"x{scale}")
+            os.mkdir(directory)
+            paths, _ = write_archive(directory, args.replays, args.games * scale, args.seed)
+            size = sum(os.path.getsize(p) for p in paths)
+            with quiet():
+                sent, elapsed, frames, start_rss, peak = asyncio.run(fast_run(paths, args.viewers))
+            results.append(peak - start_rss)
+            print(f"로그 {args.replays}개 x {size / args.replays / 1e6:.1f} MB: 메시지 {sent:,}개 {elapsed:.2f}s "
+                  f"-> {sent / elapsed:,.0f} msgs/s  관중 프레임 {frames:,}개  "
+                  f"RSS {start_rss / 1024:.1f} -> 최대 {peak / 1024:.1f} MB")
+        print(f"RSS 증가: 1x {results[0] / 1024:.1f} MB, 4x {results[1] / 1024:.1f} MB")
+
+        with quiet():
+            elapsed, expected = asyncio.run(paced_run(tmp))
+        assert expected * 0.9 <= elapsed <= expected + 0.5, f"배속 재생 {elapsed:.2f}s (기대 {expected:.2f}s)"
+        print(f"배속 재생: {elapsed:.2f}s (기대 {expected:.2f}s)")
+    print("검사 통과: 마지막 STATE = 로그, 재방송 방은 읽기 전용, 배속 간격 유지")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+재접속 폭주 벤치마크 (순번부터 이어 받기 vs 새로 접속)
+사용법: python benchmarks/bench_resume.py [--viewers 500] [--gaps 1 10 100 400]
+설명: DELTA 관중 N명이 한 게임을 보다가 모두 끊기고(경기장 네트워크 순단), 그동안 AB가 gap개 진행된 뒤
+      한꺼번에 다시 접속하는 상황을 만든다.
+        - 이어 받기: ?since=<마지막 순번>으로 접속 -> 놓친 DELTA만 REPLAY 프레임 하나로
+                     (재생 버퍼보다 오래되면 전체 STATE)
+        - 새로 접속: ?proto=delta로 접속 -> 전체 STATE (그 사이 플레이는 잃음)
+      재접속 폭주가 끝날 때까지 걸린 시간과 관중 한 명이 받은 프레임/바이트를 비교하고,
+      이어 받은 관중의 점수판이 서버의 마지막 STATE와 같은지 확인한다.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from common import AB_CYCLE, quiet, running_server
+import server_websocket
+import websockets
+from client_websocket import Scoreboard
+from game_room import REPLAY_SIZE
+
+async def catch_up(uri, board, target_seq, out):
+    """접속해서 target_seq까지 따라잡을 때까지 받은 프레임/바이트"""
+    frames = size = 0
+    async with websockets.connect(uri, open_timeout=120) as ws:
+        while board.seq != target_seq:
+            message = await ws.recv()
+            frames += 1
+            size += len(message)
+            if board.apply(json.loads(message)) is None:
+                raise AssertionError("순번 공백")
+    out.append((frames, size, dict(board.state)))
+
+async def storm(args, gap, resume):
+    async with running_server() as base:
+        uri = f"{base}/resume"
+        room = server_websocket.rooms.get("resume")
+        for i in range(20):
+            room.apply({"type": "AB", "batter": "", "result": AB_CYCLE[i % len(AB_CYCLE)]})
+            room.publish_state()
+        # 끊기기 직전 관중의 점수판
+        boards = []
+        for _ in range(args.viewers):
+            board = Scoreboard()
+            board.apply(room.snapshot(True))
+            boards.append(board)
+        async with websockets.connect(uri) as scorer:
+            await scorer.recv()
+            for i in range(gap):
+                await scorer.send(json.dumps({"type": "AB", "batter": "", "result": AB_CYCLE[i % len(AB_CYCLE)]}))
+                while json.loads(await scorer.recv())["type"] not in ("ACK", "END", "ERROR"):
+                    pass
+        out = []
+        start = time.perf_counter()
+        await asyncio.gather(*(catch_up(f"{uri}?since={b.seq}" if resume else f"{uri}?proto=delta",
+                                        b, room.seq, out) for b in boards))
+        elapsed = time.perf_counter() - start
+        expected = room.snapshot()
+    for _, _, state in out:
+        # 순번은 Scoreboard.seq로 이미 맞췄고, 점수판 dict의 "seq"는 처음 STATE의 값 그대로다
+        assert {k: v for k, v in state.items() if k != "seq"} == expected, "점수판이 서버 상태와 다름"
+    frames = sum(o[0] for o in out) / len(out)
+    size = sum(o[1] for o in out) / len(out)
+    return elapsed, frames, size
+
+def main():
+    parser = argparse.ArgumentParser(description="재접속 폭주: 이어 받기 vs 새로 접속")
+    parser.add_argument("--viewers", type=int, default=500)
+    parser.add_argument("--gaps", type=int, nargs="+", default=[1, 10, 100, REPLAY_SIZE + 100])
+    args = parser.parse_args()
+
+    print(f"관중 {args.viewers}명, 재생 버퍼 {REPLAY_SIZE}개")
+    for gap in args.gaps:
+        for name, resume in (("이어 받기", True), ("새로 접속", False)):
+            with quiet():
+                elapsed, frames, size = asyncio.run(storm(args, gap, resume))
+            print(f"놓친 AB {gap:4d}개  {name}: {elapsed:.2f}s  관중당 프레임 {frames:.1f}개 {size:,.0f} bytes"
+                  + ("  (플레이 유지)" if resume and gap <= REPLAY_SIZE else ""))
+    print("검사 통과: 재접속한 모든 점수판이 서버 상태와 같음")
+
+if __name__ == "__main__":
+    main()
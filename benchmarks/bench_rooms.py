@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+여러 게임 동시 기록 벤치마크
+사용법: python benchmarks/bench_rooms.py [--rooms 1 10 50] [--events 500]
+설명: 게임(방)마다 기록원 연결 하나가 AB를 연속 전송하고,
+      방 개수에 따른 전체 처리량(events/sec)을 출력한다.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import websockets
+
+from common import AB_CYCLE, quiet, running_server
+
+async def scorer(uri, game_id, events):
+    """AB 전송 -> ACK와 STATE 수신을 events번 반복"""
+    async with websockets.connect(f"{uri}/{game_id}") as ws:
+        await ws.recv()  # 접속 시 STATE
+        for i in range(events):
+            await ws.send(json.dumps({"type": "AB", "batter": f"{game_id}-타자", "result": AB_CYCLE[i % len(AB_CYCLE)]}))
+            await ws.recv()  # ACK (또는 END/ERROR)
+            state = json.loads(await ws.recv())
+            if state.get("game_over"):
+                await ws.send(json.dumps({"type": "RESET"}))
+                await ws.recv()  # ACK RESET
+                await ws.recv()  # 초기 STATE
+
+async def run(room_counts, events):
+    for n in room_counts:
+        with quiet():
+            async with running_server() as uri:
+                start = time.perf_counter()
+                await asyncio.gather(*[scorer(uri, f"game{i}", events) for i in range(n)])
+                elapsed = time.perf_counter() - start
+        total = n * events
+        print(f"rooms={n:4d}  events={total:7d}  {total / elapsed:10.0f} events/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description="방 개수별 AB 처리량")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--events", type=int, default=500, help="방마다 보낼 AB 수")
+    args = parser.parse_args()
+    asyncio.run(run(args.rooms, args.events))
+
+if __name__ == "__main__":
+    main()
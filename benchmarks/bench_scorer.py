@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+헤드리스 기록원 벤치마크 (하나씩 vs 요청 ID + 창)
+사용법: python benchmarks/bench_scorer.py [--games 4] [--viewers 20] [--windows 1 4 16 48]
+설명: 투구 단위 스크립트(경기 games개, 사이에 R)를 client_websocket.py --script와 같은 경로(run_script)로
+      서버(프로세스 안)에 보낸다. 관중(DELTA) N명이 같은 게임을 본다.
+        - 창 1: 응답을 받아야 다음 명령을 보냄 (지금의 대화형 기록원과 같은 하나씩 흐름)
+        - 창 W: 응답을 기다리지 않고 W개까지 보냄
+      창마다 초당 명령 수와 응답 지연 p50/p99를 출력하고, 서버의 최종 상태가 스크립트를 한 번씩만
+      적용한 상태와 같은지 확인한다. 마지막으로 서버가 명령을 일정 개수 실행할 때마다 응답을 보내기 전에
+      기록원 연결을 강제로 끊어도 (응답을 못 받은 명령을 같은 ID로 다시 보냄) 명령이 두 번 실행되지 않는지 확인한다.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+from bench_batch import pitches
+from common import quiet, running_server
+import client_websocket
+import server_websocket
+import websockets
+from game_room import GameRoom
+from log_writer import LogWriter
+from server_websocket import process_command
+
+def write_script(path, games, seed):
+    """AB 단축키 스크립트와 그 스크립트를 한 번씩 적용한 최종 STATE"""
+    room = GameRoom("expected")
+    with open(path, "w", encoding="utf-8") as f:
+        for g in range(games):
+            if g:
+                f.write("R\n")
+                room.apply({"type": "RESET"})
+            for event in pitches(300, seed + g):
+                f.write(f"AB {event['result']}\n")
+                room.apply(event)
+    room.refresh()
+    return room.snapshot()
+
+async def viewer(uri):
+    async with websockets.connect(uri + "?proto=delta") as ws:
+        async for _ in ws:
+            pass
+
+def cutting(game, every, times):
+    """게임 game의 명령을 every개 실행할 때마다(times번까지) 그 응답을 보내기 전에 기록원 접속을 끊는
+    process_command (네트워크 단절처럼 닫기 핸드셰이크 없이, 실행 속도와 상관없이 항상 끊김)"""
+    process = server_websocket.process_command
+    count = [0]
+
+    async def process_and_cut(room, client, event):
+        await process(room, client, event)
+        if room.game_id != game:
+            return
+        count[0] += 1
+        if count[0] % every == 0 and count[0] // every <= times:
+            for sub in list(room.clients):
+                sub.websocket.transport.abort()
+
+    return process_and_cut
+
+async def run(args, script, window, game, viewers=0, cuts=0):
+    if cuts:
+        with open(script, encoding="utf-8") as f:
+            commands = sum(1 for line in f if line.strip())
+        server_websocket.process_command = cutting(game, max(1, commands // (cuts + 1)), cuts)
+    try:
+        return await run_server(script, window, game, viewers)
+    finally:
+        server_websocket.process_command = process_command
+
+async def run_server(script, window, game, viewers):
+    async with running_server() as base:
+        port = base.rsplit(":", 1)[1]
+        watchers = [asyncio.create_task(viewer(f"{base}/{game}")) for _ in range(viewers)]
+        await asyncio.sleep(0.2)
+        cli = client_websocket.parse_args(["127.0.0.1", "--port", port, "--game", game, "--script", script,
+                                           "--window", str(window), "--timeout", "2"])
+        summary = await client_websocket.run_script(cli)
+        for task in watchers:
+            task.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
+        return summary, server_websocket.rooms.get(game).snapshot()
+
+async def main_async(args, tmp):
+    script = os.path.join(tmp, "script.txt")
+    expected = write_script(script, args.games, args.seed)
+    async with LogWriter(os.path.join(tmp, "client_log.jsonl")) as client_websocket.log_writer:
+        results = []
+        for window in args.windows:
+            with quiet():
+                summary, state = await run(args, script, window, f"w{window}", args.viewers)
+            assert state == expected, f"창 {window}: 최종 상태가 스크립트와 다름"
+            assert summary["acked"] == summary["sent"], f"창 {window}: 응답 누락 {summary}"
+            results.append((window, summary))
+        with quiet():
+            dropped, state = await run(args, script, 32, "cut", cuts=3)
+    return results, dropped, state == expected, expected
+
+def main():
+    parser = argparse.ArgumentParser(description="헤드리스 기록원: 하나씩 vs 창")
+    parser.add_argument("--games", type=int, default=4, help="스크립트의 경기 수 (경기마다 최대 300구)")
+    parser.add_argument("--viewers", type=int, default=20)
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 4, 16, 48])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results, dropped, same, _ = asyncio.run(main_async(args, tmp))
+    base = results[0][1]["rate"]
+    print(f"명령 {results[0][1]['sent']}개, 관중 {args.viewers}명")
+    for window, r in results:
+        print(f"창 {window:4d}: {r['rate']:8,.0f} 명령/s ({r['rate'] / base:4.1f}x)  "
+              f"응답 지연 p50 {r['p50_ms']:6.1f}ms  p99 {r['p99_ms']:6.1f}ms")
+    print(f"연결 3번 끊기: 다시 보냄 {dropped['retried']}번, {dropped['elapsed']:.2f}s")
+    assert same and dropped["retried"] > 0, "다시 보낸 명령이 두 번 실행됨 (또는 끊기지 않음)"
+    print("검사 통과: 모든 창에서 최종 상태 = 스크립트 1회 적용, 끊긴 뒤 다시 보내도 중복 실행 없음")
+
+if __name__ == "__main__":
+    main()
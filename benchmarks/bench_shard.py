@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+샤드 서버 브로드캐스트 처리량 벤치마크
+사용법: python benchmarks/bench_shard.py [--workers 1 2 4] [--games 8] [--viewers 2000] [--duration 5]
+설명: shard.py를 워커 수별로 띄우고, 게임마다 기록원 하나가 AB를 쉬지 않고 보내는 동안
+      관중 N명(클라이언트 프로세스 여러 개에 나눠 접속, SO_REUSEPORT로 워커에 흩어짐)이
+      --duration초 동안 받은 STATE/DELTA 프레임 수로 초당 전달 프레임과 AB 처리량을 비교한다.
+      서버와 부하 발생기가 같은 머신을 쓰므로 코어 수(os.cpu_count())보다 많은 워커는 효과가 없다.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import AB_CYCLE, ROOT
+import websockets
+
+async def _viewers(uri, games, count, start, end):
+    received = 0
+
+    async def one(i):
+        nonlocal received
+        async with websockets.connect(f"{uri}/bench{i % games}?proto=delta", open_timeout=60) as ws:
+            while True:
+                timeout = end - time.time()
+                if timeout <= 0:
+                    return
+                try:
+                    await asyncio.wait_for(ws.recv(), timeout)
+                except asyncio.TimeoutError:
+                    return
+                if time.time() >= start:
+                    received += 1
+
+    await asyncio.gather(*(one(i) for i in range(count)), return_exceptions=True)
+    return received
+
+def viewer_proc(uri, games, count, start, end, out):
+    out.put(asyncio.run(_viewers(uri, games, count, start, end)))
+
+async def _scorers(uri, games, start, end):
+    abs_sent = 0
+
+    async def one(g):
+        nonlocal abs_sent
+        async with websockets.connect(f"{uri}/bench{g}", open_timeout=60) as ws:
+            await ws.recv()
+            i = 0
+            while time.time() < end:
+                await ws.send(json.dumps({"type": "AB", "batter": "", "result": AB_CYCLE[i % len(AB_CYCLE)]}))
+                i += 1
+                while True:
+                    msg = json.loads(await ws.recv())
+                    if msg["type"] in ("ACK", "END", "ERROR"):
+                        break
+                if msg["type"] == "END":
+                    await ws.send('{"type": "RESET"}')
+                if time.time() >= start:
+                    abs_sent += 1
+
+    await asyncio.gather(*(one(g) for g in range(games)))
+    return abs_sent
+
+def scorer_proc(uri, games, start, end, out):
+    out.put(asyncio.run(_scorers(uri, games, start, end)))
+
+def wait_port(port, timeout=20):
+    async def probe():
+        async with websockets.connect(f"ws://127.0.0.1:{port}/probe"):
+            pass
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("샤드 서버가 뜨지 않았습니다")
+
+def run(workers, args, port):
+    with tempfile.TemporaryDirectory() as tmp:
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "shard.py"), "--workers", str(workers), "--port", str(port),
+             "--log", os.path.join(tmp, "log.jsonl"), "--events", os.path.join(tmp, "events")],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_port(port)
+            uri = f"ws://127.0.0.1:{port}"
+            start = time.time() + 3 + args.viewers / 1000
+            end = start + args.duration
+            out = multiprocessing.Queue()
+            per_proc = -(-args.viewers // args.client_procs)
+            procs = [multiprocessing.Process(target=viewer_proc,
+                                             args=(uri, args.games, min(per_proc, args.viewers - i * per_proc),
+                                                   start, end, out))
+                     for i in range(args.client_procs) if args.viewers - i * per_proc > 0]
+            scorer_out = multiprocessing.Queue()
+            scorer = multiprocessing.Process(target=scorer_proc, args=(uri, args.games, start, end, scorer_out))
+            for p in procs + [scorer]:
+                p.start()
+            frames = sum(out.get() for _ in procs)
+            abs_done = scorer_out.get()
+            for p in procs + [scorer]:
+                p.join()
+        finally:
+            server.send_signal(2)
+            server.wait(timeout=20)
+    return frames / args.duration, abs_done / args.duration
+
+def main():
+    parser = argparse.ArgumentParser(description="샤드 서버 브로드캐스트 처리량")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--games", type=int, default=8)
+    parser.add_argument("--viewers", type=int, default=2000)
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=5090)
+    args = parser.parse_args()
+
+    print(f"CPU {os.cpu_count()}개, 게임 {args.games}개, 관중 {args.viewers}명")
+    base = None
+    for workers in args.workers:
+        frames, abs_rate = run(workers, args, args.port)
+        base = base or frames
+        print(f"워커 {workers}개: 전달 {frames:,.0f} 프레임/s ({frames / base:.2f}x), AB {abs_rate:,.0f}/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+타자별 누적 기록(StatIndex) 검사 + STATS 조회 지연 벤치마크
+사용법: python benchmarks/bench_stat_index.py [--games 20] [--abs 20000] [--queries 5000]
+설명: 1) 게임 방 여러 개에 무작위 AB/RESET/SET_LINEUP을 적용하며 서버 형식 로그를 쓰고,
+         방마다 누적된 기록이 log_stats.py로 로그를 처음부터 다시 집계한 결과와 같은지 확인한다.
+         스냅샷(dump -> JSON -> restore) 후에도 같은지 확인한다.
+      2) stats_message() 조회(타자 한 명 / 전체)와 실제 서버의 STATS 왕복 지연 p50/p99를 출력한다.
+      1)은 이 실행의 데이터를 확인하는 것이고, 같은 검사는 tests/test_stat_index.py에도 있다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from common import quiet, running_server
+import batting
+import log_stats
+import server_websocket
+import websockets
+from fast_engine import RESULTS
+from game_room import GameRoom
+from log_writer import LogWriter
+
+WEIGHTS = [20, 25, 20, 10, 8, 3, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def lineup_event(rng):
+    away, home = rng.sample(range(10), 2)
+    return {"type": "SET_LINEUP",
+            "away_lineup": [f"T{away}-{i}" for i in range(1, 10)],
+            "home_lineup": [f"T{home}-{i}" for i in range(1, 10)]}
+
+def play(rooms, path, abs_count, seed):
+    """서버와 같은 순서로 로그를 쓰며 명령 적용"""
+    rng = random.Random(seed)
+    encode = LogWriter.encode
+    with open(path, "w", encoding="utf-8") as out:
+        def log(room, data):
+            out.write(encode(None, data, game=room.game_id))
+        for room in rooms:
+            log(room, room.apply(lineup_event(rng)))
+        for _ in range(abs_count):
+            room = rng.choice(rooms)
+            # 대타(라인업 밖 이름)도 가끔 섞음
+            batter = "대타" if rng.random() < 0.02 else ""
+            log(room, room.apply({"type": "AB", "batter": batter, "result": rng.choices(RESULTS, WEIGHTS)[0]}))
+            log(room, room.state_payload())
+            if room.state["game_over"] or room.state["inning"] > 15:
+                log(room, room.apply({"type": "RESET"}))
+                log(room, room.apply(lineup_event(rng)))
+
+def check(rooms, path):
+    """누적 기록 == 로그 전체 재집계"""
+    expected = log_stats.file_stats(path).batters
+    actual = {}
+    for room in rooms:
+        batting.merge_lines(actual, room.stats.batters)
+        for team, line in room.stats.teams.items():
+            total = batting.new_line()
+            for (t, _), bl in room.stats.batters.items():
+                if t == team:
+                    for name in batting.STATS:
+                        total[name] += bl[name]
+            assert total == line, f"{room.game_id} {team}: 팀 합계 불일치"
+    assert actual == expected, "누적 기록과 로그 재집계 결과가 다름"
+    return sum(line["PA"] for line in actual.values())
+
+def check_snapshot(rooms):
+    start = time.perf_counter()
+    data = json.dumps([room.dump() for room in rooms])
+    dumped = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = []
+    for room, d in zip(rooms, json.loads(data)):
+        r = GameRoom(room.game_id)
+        r.restore(d)
+        restored.append(r)
+    loaded = time.perf_counter() - start
+    for a, b in zip(rooms, restored):
+        assert a.stats.batters == b.stats.batters and a.stats.teams == b.stats.teams, f"{a.game_id}: 스냅샷 복원 불일치"
+    print(f"스냅샷: 방 {len(rooms)}개 {len(data) / 1e3:.0f} KB, dump {dumped * 1e3:.1f}ms, restore {loaded * 1e3:.1f}ms")
+
+def local_queries(room, n):
+    keys = list(room.stats.batters)
+    one, full = [], []
+    for i in range(n):
+        team, batter = keys[i % len(keys)]
+        t0 = time.perf_counter()
+        room.stats_message(batter, team)
+        t1 = time.perf_counter()
+        room.stats_message()
+        full.append(time.perf_counter() - t1)
+        one.append(t1 - t0)
+    return one, full
+
+async def remote_queries(room, n):
+    """실제 서버에 같은 방을 넣고 STATS 왕복 시간 측정"""
+    async with running_server() as uri:
+        server_websocket.rooms.rooms[room.game_id] = room
+        async with websockets.connect(f"{uri}/{room.game_id}") as ws:
+            await ws.recv()  # 접속 시 STATE
+            times = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                await ws.send('{"type": "STATS"}')
+                reply = json.loads(await ws.recv())
+                times.append(time.perf_counter() - t0)
+            assert reply["type"] == "STATS" and len(reply["batters"]) == len(room.stats.batters)
+            return times
+
+def main():
+    parser = argparse.ArgumentParser(description="StatIndex 검사 + STATS 조회 지연")
+    parser.add_argument("--games", type=int, default=20, help="게임 방 수")
+    parser.add_argument("--abs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rooms = [GameRoom(f"game{i}") for i in range(args.games)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "log.jsonl")
+        start = time.perf_counter()
+        play(rooms, path, args.abs, args.seed)
+        print(f"기록: AB {args.abs}개, {time.perf_counter() - start:.2f}s")
+        pa = check(rooms, path)
+    print(f"검사 통과: 타석 {pa}개가 로그 재집계와 일치")
+    check_snapshot(rooms)
+
+    room = rooms[0]
+    one, full = local_queries(room, args.queries)
+    print(f"stats_message 타자 1명: p50={percentile(one, 50) * 1e6:.1f}us p99={percentile(one, 99) * 1e6:.1f}us")
+    print(f"stats_message 전체({len(room.stats.batters)}명): p50={percentile(full, 50) * 1e6:.1f}us "
+          f"p99={percentile(full, 99) * 1e6:.1f}us")
+    with quiet():
+        times = asyncio.run(remote_queries(room, args.queries))
+    print(f"STATS 왕복(서버): p50={percentile(times, 50) * 1e6:.0f}us p99={percentile(times, 99) * 1e6:.0f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로그 통계 처리량 벤치마크
+사용법: python benchmarks/bench_stats.py [--files 8] [--games 300] [--workers 4]
+설명: game_room으로 경기를 끝까지 진행하며 서버와 같은 형식(ACK + STATE, RESET)의 로그 파일 여러 개를 만들고
+      1) log_stats.stats를 워커 1개/N개로 돌린 처리량(MB/s, 줄/s)과
+         파일마다 바이트 구간 여러 개로 나눠 워커 N개가 파싱한 처리량
+      2) 열 단위 변환(convert) 시간과 변환 후 query 시간
+      을 출력한다. 워커 수/구간 나눔과 상관없이, 그리고 열 단위 query와 결과가 같은지,
+      박스 스코어 득점 합이 실제 최종 점수와 같은지도 확인한다.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import common  # noqa: F401  (저장소 루트를 import 경로에 추가)
+import log_stats
+from fast_engine import RESULTS
+from game_room import GameRoom
+from log_writer import LogWriter
+
+WEIGHTS = [20, 25, 20, 10, 8, 3, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+MAX_INNINGS = 15    # 원정 팀이 앞선 경기는 규칙상 끝나지 않으므로 simulate.py처럼 여기서 끊음
+
+def lineup_event(f, room, game):
+    """경기마다 다른 팀 (팀 하나가 여러 경기에 나오도록 8팀을 돌려 씀)"""
+    away, home = (f + room + game) % 8, (f + room + game + 3) % 8
+    return {"type": "SET_LINEUP",
+            "away_lineup": [f"T{away}-{i}" for i in range(1, 10)],
+            "home_lineup": [f"T{home}-{i}" for i in range(1, 10)]}
+
+def write_archive(directory, files, games, seed):
+    """로그 파일들을 만들고 {게임 키: (원정, 홈) 최종 점수} 반환"""
+    rng = random.Random(seed)
+    encode = LogWriter.encode
+    finals = {}
+    paths = []
+    for f in range(files):
+        path = os.path.join(directory, f"log_{f:03d}.jsonl")
+        rooms = [GameRoom(f"g{r}") for r in range(4)]
+        resets = [0] * len(rooms)
+        with open(path, "w", encoding="utf-8") as out:
+            for i, room in enumerate(rooms):
+                out.write(encode(None, room.apply(lineup_event(f, i, 0)), game=room.game_id))
+            done = 0
+            while done < games:
+                i = rng.randrange(len(rooms))
+                room = rooms[i]
+                res = room.apply({"type": "AB", "batter": "", "result": rng.choices(RESULTS, WEIGHTS)[0]})
+                out.write(encode(None, res, game=room.game_id))
+                out.write(encode(None, room.state_payload(), game=room.game_id))
+                if room.state["game_over"] or room.state["inning"] > MAX_INNINGS:
+                    finals[f"{os.path.basename(path)}:{room.game_id}#{resets[i]}"] = (room.state["away"], room.state["home"])
+                    out.write(encode(None, room.apply({"type": "RESET"}), game=room.game_id))
+                    resets[i] += 1
+                    out.write(encode(None, room.apply(lineup_event(f, i, resets[i])), game=room.game_id))
+                    done += 1
+        paths.append(path)
+    return paths, finals
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
+
+def check(agg, finals):
+    for key, (away, home) in finals.items():
+        box = agg.games[key]
+        assert box["R"] == [away, home], f"{key}: 박스 스코어 {box['R']} != 최종 점수 {[away, home]}"
+        for half in (0, 1):
+            assert sum(box["line"][half].values()) == box["R"][half], f"{key}: 이닝별 득점 합 불일치"
+
+def main():
+    parser = argparse.ArgumentParser(description="로그 통계 처리량")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--games", type=int, default=300, help="파일당 완료 경기 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (paths, finals), gen = timed(write_archive, tmp, args.files, args.games, args.seed)
+        size = sum(os.path.getsize(p) for p in paths) / 1e6
+        lines = 0
+        for p in paths:
+            with open(p, "rb") as f:
+                lines += sum(1 for _ in f)
+        print(f"로그 생성: 파일 {len(paths)}개, {size:.1f} MB, {lines}줄, 경기 {len(finals)}개 ({gen:.1f}s)")
+
+        one, t1 = timed(log_stats.stats, paths, 1)
+        many, tn = timed(log_stats.stats, paths, args.workers)
+        print(f"stats 워커 1개: {t1:.2f}s  {size / t1:.1f} MB/s  {lines / t1:,.0f}줄/s")
+        print(f"stats 워커 {args.workers}개: {tn:.2f}s  {size / tn:.1f} MB/s  {lines / tn:,.0f}줄/s")
+        chunk = min(os.path.getsize(p) for p in paths) // 8
+        split, ts = timed(log_stats.stats, paths, args.workers, chunk)
+        print(f"stats 워커 {args.workers}개, 파일당 구간 ~8개: {ts:.2f}s  {size / ts:.1f} MB/s  {lines / ts:,.0f}줄/s")
+
+        out = os.path.join(tmp, "columns")
+        _, tc = timed(log_stats.convert, paths, out, args.workers)
+        col, tq = timed(log_stats.query, out)
+        print(f"convert 워커 {args.workers}개: {tc:.2f}s,  query: {tq:.3f}s ({size / tq:.0f} MB/s 상당)")
+        split_out = os.path.join(tmp, "split-columns")
+        log_stats.convert(paths, split_out, max(args.workers, 2), chunk)
+        split_col = log_stats.query(split_out)
+
+        assert one.batters == many.batters and one.games == many.games, "워커 수에 따라 결과가 다름"
+        assert split.batters == one.batters and split.games == one.games, "구간으로 나눠 읽은 결과가 다름"
+        assert split_col.batters == one.batters and split_col.games == one.games, "구간으로 나눠 변환한 결과가 다름"
+        assert col.batters == one.batters and col.games == one.games, "열 단위 query 결과가 다름"
+        check(one, finals)
+        pa = sum(line["PA"] for line in one.batters.values())
+        print(f"검사 통과: 타석 {pa}개, 타자 {len(one.batters)}명, 경기 {len(one.games)}개")
+
+if __name__ == "__main__":
+    main()
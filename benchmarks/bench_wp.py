@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+승리 확률이 붙은 STATE 브로드캐스트 지연 벤치마크
+사용법: python benchmarks/bench_wp.py [--table wp_table.bin] [--subscribers 1000] [--abs 5000]
+설명: 같은 AB 시퀀스를 WP 표 없이/있이 GameRoom에 적용하며
+      apply + publish_state(인코딩 1회 + 구독자 큐 적재) 시간을 비교한다.
+      --table이 없으면 작은 시뮬레이션으로 임시 표를 만든다.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from common import AB_CYCLE
+import fanout
+import wp_table
+from game_room import GameRoom
+
+class NullClient:
+    remote_address = None
+
+    async def send(self, message, text=None):
+        pass
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+async def measure(table, subscribers, abs_count):
+    room = GameRoom("bench", table)
+    room.clients = {fanout.Subscriber(NullClient(), 10**6) for _ in range(subscribers)}
+    times = []
+    for i in range(abs_count):
+        t0 = time.perf_counter()
+        room.apply({"type": "AB", "batter": "", "result": AB_CYCLE[i % len(AB_CYCLE)]})
+        room.publish_state()
+        times.append(time.perf_counter() - t0)
+        if room.state["game_over"]:
+            room.apply({"type": "RESET"})
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    for sub in room.clients:
+        sub.close()
+    return times
+
+def lookup_ns(table, n=200000):
+    room = GameRoom("lookup")
+    state = room.state
+    start = time.perf_counter()
+    for _ in range(n):
+        table.lookup(state)
+    return (time.perf_counter() - start) / n * 1e9
+
+async def run(args, table):
+    print(f"표 조회: {lookup_ns(table):.0f} ns/회")
+    for name, t in (("WP 없음", None), ("WP 포함", table)):
+        times = await measure(t, args.subscribers, args.abs)
+        print(f"{name}: 구독자 {args.subscribers}명, AB당 p50={percentile(times, 50) * 1e6:.1f}us  "
+              f"p99={percentile(times, 99) * 1e6:.1f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description="WP 포함 브로드캐스트 지연")
+    parser.add_argument("--table", help="wp_table.py build로 만든 표 (없으면 임시로 생성)")
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--abs", type=int, default=5000)
+    parser.add_argument("--build-games", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.table
+        if not path:
+            path = os.path.join(tmp, "wp_table.bin")
+            table, _ = wp_table.build(args.build_games)
+            wp_table.write(path, table)
+        asyncio.run(run(args, wp_table.WinProbTable(path)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+벤치마크 공용 도우미
+설명: 임시 로그 파일로 서버를 띄우고, 서버 출력(print)을 숨긴다.
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import server_websocket
+from game_room import RoomRegistry
+from log_writer import LogWriter
+
+# 타석 결과 순환 (경기가 너무 빨리 끝나지 않도록 투구 위주)
+AB_CYCLE = ["BALL", "STRIKE", "FOUL", "1B", "STRIKE", "BALL", "OUT", "2B", "STRIKE", "STRIKE", "STRIKE", "HR"]
+
+@contextlib.contextmanager
+def quiet():
+    """서버의 [JOIN]/[LEAVE] 출력 숨기기"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+@contextlib.asynccontextmanager
+async def running_server():
+    """임시 로그 파일을 쓰는 서버를 임의 포트로 실행, ws:// 주소를 돌려줌"""
+    with tempfile.TemporaryDirectory() as tmp:
+        server_websocket.rooms = RoomRegistry()
+        async with LogWriter(os.path.join(tmp, "bench_log.jsonl")) as server_websocket.log_writer:
+            try:
+                async with server_websocket.serve("127.0.0.1", 0) as server:
+                    port = next(iter(server.sockets)).getsockname()[1]
+                    yield f"ws://127.0.0.1:{port}"
+            finally:
+                await asyncio.gather(*(room.stop() for room in server_websocket.rooms))
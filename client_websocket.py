@@ -7,15 +7,28 @@
 설명: WebSocket 서버와 통신하는 터미널 클라이언트
 """
 
+import argparse
 import asyncio
-import websockets
 import json
+import random
 import sys
-from datetime import datetime
+import time
+import websockets
 
-HOST = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+import codec
+import compression
+from log_writer import LogWriter
+
+HOST = "127.0.0.1"
 PORT = 5000
 LOG_FILE = "game_log_client.jsonl"
+RECONNECT_MIN = 0.5     # 재접속 대기 시작값 (초), 실패할 때마다 두 배
+RECONNECT_MAX = 10.0
+SCRIPT_WINDOW = 32      # 헤드리스 기록원: 응답을 기다리지 않고 보낼 수 있는 명령 수 (1이면 하나씩)
+MAX_WINDOW = 48         # 서버의 접속별 송신 큐(SEND_QUEUE_SIZE=64)가 응답만으로 차면 느린 접속으로 끊기므로
+REQUEST_TIMEOUT = 5.0   # 가장 오래된 명령의 응답을 이만큼(초) 못 받으면 다시 연결해 다시 보냄
+REQUEST_RETRIES = 3     # 명령 하나를 다시 보내는 최대 횟수
+REFRESH_HZ = 10.0       # 점수판(STATE)을 다시 그리는 최대 횟수 (초당, 0이면 받을 때마다)
 
 def result_shortcut(x: str) -> str:
     """입력 단축키를 표준 형식으로 변환"""
@@ -61,14 +74,33 @@ def result_shortcut(x: str) -> str:
     }
     return table.get(x, x)
 
-def log_event(data: dict):
-    """이벤트를 파일에 기록"""
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        line = json.dumps({
-            "timestamp": datetime.now().isoformat(),
-            "data": data
-        }, ensure_ascii=False)
-        f.write(line + "\n")
+log_writer = None  # main()에서 시작하는 LogWriter
+using = codec.JSON  # main()에서 --codec으로 정함
+
+async def send_message(websocket, obj: dict):
+    """선택한 코덱으로 메시지 전송 (JSON은 텍스트, 바이너리는 바이너리 프레임)"""
+    data = using.encode(obj)
+    await websocket.send(data if using.binary else data.decode("utf-8"))
+
+class Link:
+    """재접속해도 그대로인 송신 창구 (지금 연결된 websocket, 끊겨 있으면 None)"""
+
+    def __init__(self):
+        self.websocket = None
+        self.connected = asyncio.Event()  # 처음 연결에 성공하면 set
+
+    async def send(self, obj: dict):
+        if self.websocket is None:
+            print("⚠️ 서버에 다시 연결하는 중입니다. 잠시 후 다시 입력하세요.")
+            return
+        await send_message(self.websocket, obj)
+
+async def log_event(data: dict, message=None):
+    """이벤트를 백그라운드 기록기에 넘김 (받은 JSON 텍스트가 있으면 다시 인코딩하지 않고 그대로)"""
+    if isinstance(message, str):
+        await log_writer.write_json(message)
+    else:
+        await log_writer.write(data)
 
 def render_state(obj: dict):
     """게임 상태를 터미널에 출력"""
@@ -85,18 +117,118 @@ def render_state(obj: dict):
         print("🏆 게임 종료!")
     print("="*40)
 
-async def receive_messages(websocket, need_batter_input):
+def render_stats(obj: dict):
+    """누적 타격 기록을 터미널에 출력"""
+    print("="*40)
+    print(f"{'팀':4s} {'타자':12s} {'타석':>4s} {'타수':>4s} {'안타':>4s} {'홈런':>4s} {'볼넷':>4s} {'삼진':>4s}  타율")
+    for line in obj.get("batters", []):
+        print(f"{line['team']:4s} {line['batter'][:12]:12s} {line['PA']:4d} {line['AB']:4d} {line['H']:4d} "
+              f"{line['HR']:4d} {line['BB']:4d} {line['K']:4d}  {line['AVG']:.3f}")
+    for team, line in obj.get("teams", {}).items():
+        print(f"{team:4s} {'(팀 합계)':12s} {line['PA']:4d} {line['AB']:4d} {line['H']:4d} "
+              f"{line['HR']:4d} {line['BB']:4d} {line['K']:4d}  {line['AVG']:.3f}")
+    print("="*40)
+
+class Renderer:
+    """점수판 출력 묶기: STATE가 몰려 와도 refresh_hz마다 최대 한 번, 그동안 온 것 중 마지막 상태만 그린다
+
+    처음 STATE(와 한동안 쉬다가 온 STATE)는 바로 그린다. 다른 출력(ACK/END/ERROR 등) 전에는
+    flush()로 기다리던 STATE를 먼저 그려 순서를 지킨다. quiet=True면 아무것도 그리지 않는다 (--tap).
+    """
+
+    def __init__(self, refresh_hz=REFRESH_HZ, quiet=False):
+        self.interval = 1 / refresh_hz if refresh_hz > 0 else 0.0
+        self.quiet = quiet
+        self.pending = None     # 아직 그리지 않은 마지막 상태
+        self.timer = None
+        self.last = 0.0         # 마지막으로 그린 시각
+        self.messages = 0       # 받은 메시지 수
+        self.rendered = 0       # 그린 STATE 수
+
+    def state(self, state: dict):
+        if self.quiet:
+            return
+        self.pending = state
+        if self.timer is not None:
+            return
+        wait = self.last + self.interval - time.monotonic()
+        if wait <= 0:
+            self.flush()
+        else:
+            self.timer = asyncio.get_running_loop().call_later(wait, self.flush)
+
+    def flush(self):
+        """기다리는 STATE가 있으면 지금 그림"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.pending is not None:
+            render_state(self.pending)
+            self.pending = None
+            self.last = time.monotonic()
+            self.rendered += 1
+
+class Scoreboard:
+    """DELTA 프로토콜용: 마지막 전체 상태와 순번을 유지하고 변경분을 적용"""
+
+    def __init__(self):
+        self.state = None
+        self.seq = None
+        self.resync_pending = False    # RESYNC를 보냈고 전체 상태(STATE/REPLAY)를 기다리는 중
+
+    def apply(self, obj: dict):
+        """STATE/DELTA/REPLAY를 반영한 전체 상태 반환. 순번 공백이면 None"""
+        if obj.get("type") == "REPLAY":
+            # 재접속: 놓친 DELTA 묶음
+            for event in obj.get("events", []):
+                if self.apply(event) is None:
+                    return None
+            return self.state
+        if obj.get("type") == "STATE":
+            self.state = dict(obj)
+            self.seq = obj.get("seq")
+            return self.state
+        if self.state is None or self.seq is None or obj.get("seq") != self.seq + 1:
+            return None
+        self.state.update(obj.get("changes", {}))
+        self.seq = obj["seq"]
+        return self.state
+
+async def receive_messages(websocket, need_batter_input, board=None, renderer=None):
     """서버로부터 메시지를 받는 비동기 함수"""
+    if board is None:
+        board = Scoreboard()
+    if renderer is None:
+        renderer = Renderer()
     try:
         async for message in websocket:
             try:
-                obj = json.loads(message)
-                log_event(obj)
+                obj = using.decode(message)
+                renderer.messages += 1
+                await log_event(obj, message)
                 
-                if obj.get("type") == "STATE":
-                    render_state(obj)
-                    
+                if obj.get("type") in ("STATE", "DELTA", "REPLAY"):
+                    if obj["type"] == "DELTA" and board.resync_pending:
+                        # 이미 RESYNC를 보냄 -> STATE가 올 때까지 DELTA는 버림
+                        continue
+                    state = board.apply(obj)
+                    if state is None:
+                        # 순번 공백 -> 전체 상태 재요청 (공백 하나에 한 번만)
+                        board.resync_pending = True
+                        await send_message(websocket, {"type": "RESYNC"})
+                    else:
+                        board.resync_pending = False
+                        if obj["type"] == "REPLAY" and not renderer.quiet:
+                            renderer.flush()
+                            print(f"\n⏩ 끊긴 동안의 플레이 {len(obj.get('events', []))}개를 이어 받았습니다")
+                        renderer.state(state)
+
+                elif renderer.quiet:
+                    # --tap: 기록만
+                    continue
+
                 elif obj.get("type") == "ACK":
+                    renderer.flush()
                     if obj.get("msg") == "RESET":
                         print("\n✅ 게임이 리셋되었습니다!")
                         need_batter_input[0] = True
@@ -115,7 +247,12 @@ async def receive_messages(websocket, need_batter_input):
                             need_batter_input[0] = True
                             print("⚠️ 다음 타석에서 타자 이름을 입력하세요!")
                         
+                elif obj.get("type") == "STATS":
+                    renderer.flush()
+                    render_stats(obj)
+
                 elif obj.get("type") == "END":
+                    renderer.flush()
                     print("\n" + "="*40)
                     print(f"🏆 게임 종료! 승자: {obj['winner']}")
                     print(f"최종 점수: Away {obj['away']} - Home {obj['home']}")
@@ -123,21 +260,25 @@ async def receive_messages(websocket, need_batter_input):
                     need_batter_input[0] = True
                     
                 elif obj.get("type") == "ERROR":
+                    renderer.flush()
                     print(f"\n❌ 오류: {obj.get('msg', '알 수 없는 오류')}")
                     
-            except json.JSONDecodeError:
-                print(f"⚠️ JSON 파싱 오류: {message}")
+            except ValueError:
+                print(f"⚠️ 메시지 해석 오류: {message[:80]!r}")
                 
     except websockets.exceptions.ConnectionClosed:
-        print("\n❌ 서버와의 연결이 끊어졌습니다.")
+        pass
+    renderer.flush()
+    # 서버가 정상 종료(1001)하면 예외 없이 반복이 끝난다
+    print("\n❌ 서버와의 연결이 끊어졌습니다.")
 
-async def send_messages(websocket, need_batter_input):
+async def send_messages(link, need_batter_input):
     """사용자 입력을 받아 서버로 전송하는 비동기 함수"""
     while True:
         try:
             # asyncio에서 input을 사용하기 위해 run_in_executor 사용
             loop = asyncio.get_event_loop()
-            cmd = await loop.run_in_executor(None, input, "\n입력 (AB/SCORE/R/Q): ")
+            cmd = await loop.run_in_executor(None, input, "\n입력 (AB/SCORE/STATS/R/Q): ")
             cmd = cmd.strip().upper()
             
             if cmd == "Q":
@@ -145,11 +286,14 @@ async def send_messages(websocket, need_batter_input):
                 break
                 
             elif cmd == "R":
-                await websocket.send(json.dumps({"type": "RESET"}, ensure_ascii=False))
+                await link.send({"type": "RESET"})
                 need_batter_input[0] = True
                 
             elif cmd == "SCORE":
-                await websocket.send(json.dumps({"type": "SCORE"}, ensure_ascii=False))
+                await link.send({"type": "SCORE"})
+
+            elif cmd == "STATS":
+                await link.send({"type": "STATS"})
                 
             elif cmd == "AB":
                 batter = ""
@@ -180,53 +324,365 @@ async def send_messages(websocket, need_batter_input):
                 if batter:
                     obj["batter"] = batter
                     
-                await websocket.send(json.dumps(obj, ensure_ascii=False))
+                await link.send(obj)
                 
             else:
-                print("❌ 잘못된 명령 (AB/SCORE/R/Q 중 하나를 입력하세요)")
+                print("❌ 잘못된 명령 (AB/SCORE/STATS/R/Q 중 하나를 입력하세요)")
                 
+        except websockets.exceptions.ConnectionClosed:
+            print("❌ 전송하지 못했습니다 (연결 끊김). 다시 연결되면 입력하세요.")
         except Exception as e:
             print(f"❌ 오류 발생: {e}")
             break
 
-async def main():
+def script_command(line: str):
+    """스크립트 한 줄 -> 명령 dict (빈 줄/주석은 None)
+
+      {"type": "AB", ...}   JSON 객체 그대로
+      AB <결과> [타자]      결과는 단축키 가능 (S, B, 1, 홈런 ...)
+      RUNNERS [1B 2B 3B]    주자 설정
+      R / RESET             게임 리셋
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        return json.loads(line)
+    word, _, rest = line.partition(" ")
+    word = word.upper()
+    if word == "AB":
+        result, _, batter = rest.strip().partition(" ")
+        obj = {"type": "AB", "result": result_shortcut(result)}
+        if batter.strip():
+            obj["batter"] = batter.strip()
+        return obj
+    if word == "RUNNERS":
+        return {"type": "SET_RUNNERS", "runners": rest.upper().split()}
+    if word in ("R", "RESET"):
+        return {"type": "RESET"}
+    raise ValueError(f"알 수 없는 명령: {line[:40]}")
+
+async def script_lines(path):
+    """스크립트 파일 (-면 표준 입력, 한 줄씩 기다리며 읽음)"""
+    if path == "-":
+        loop = asyncio.get_running_loop()
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                return
+            yield line
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                yield line
+
+class Pipeline:
+    """헤드리스 기록원: 명령에 요청 ID를 붙여 window개까지 응답을 기다리지 않고 보냄
+
+    서버는 요청 ID를 응답(ACK/END/ERROR)에 그대로 붙여 돌려주므로 응답과 명령의 짝을 ID로 맞춘다.
+    연결이 끊기면 응답을 못 받은 명령을 같은 ID로 순서대로 다시 보낸다 (서버가 이미 실행한 ID는
+    실행하지 않고 그때 응답만 다시 보낸다).
+    """
+
+    def __init__(self, window=SCRIPT_WINDOW, timeout=REQUEST_TIMEOUT, retries=REQUEST_RETRIES):
+        if not 1 <= window <= MAX_WINDOW:
+            print(f"⚠️ 창 크기는 1~{MAX_WINDOW}입니다: {window} -> {min(max(window, 1), MAX_WINDOW)}")
+            window = min(max(window, 1), MAX_WINDOW)
+        self.session = f"{random.getrandbits(32):08x}"  # 다른 기록원과 ID가 겹치지 않도록
+        self.next_n = 0
+        self.timeout = timeout
+        self.retries = retries
+        self.pending = {}       # 요청 ID -> [명령, 처음 보낸 시각, 마지막으로 보낸 시각, 보낸 횟수, 줄 번호]
+        self.free = asyncio.Semaphore(window)
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.online = asyncio.Event()
+        self.websocket = None
+        self.latencies = []
+        self.sent = self.acked = self.failed = self.retried = 0
+
+    async def submit(self, cmd: dict, line_no=0):
+        """창에 자리가 나면 명령 하나를 보냄 (응답은 기다리지 않음)"""
+        await self.free.acquire()
+        request_id = f"{self.session}-{self.next_n}"
+        self.next_n += 1
+        cmd = {**cmd, "id": request_id}
+        now = time.perf_counter()
+        self.pending[request_id] = [cmd, now, now, 1, line_no]
+        self.idle.clear()
+        self.sent += 1
+        await self.online.wait()
+        try:
+            await send_message(self.websocket, cmd)
+        except websockets.exceptions.ConnectionClosed:
+            pass  # 다시 연결되면 resend()가 보냄
+
+    async def resend(self):
+        """다시 연결한 뒤: 응답을 못 받은 명령을 보낸 순서대로 다시 보냄. 재시도 횟수를 넘으면 False"""
+        for entry in list(self.pending.values()):
+            if entry[3] > self.retries:
+                print(f"❌ {entry[4]}번째 줄: {entry[3]}번 보냈지만 응답이 없습니다")
+                return False
+            entry[2] = time.perf_counter()
+            entry[3] += 1
+            self.retried += 1
+            await send_message(self.websocket, entry[0])
+        return True
+
+    def resolve(self, obj: dict):
+        """ID가 붙은 응답 하나 (이미 받은 ID면 재시도에 대한 중복 응답이라 무시)"""
+        entry = self.pending.pop(obj.get("id"), None)
+        if entry is None:
+            return
+        self.latencies.append(time.perf_counter() - entry[1])
+        if obj.get("type") == "ERROR":
+            self.failed += 1
+            print(f"❌ {entry[4]}번째 줄: {obj.get('msg', '알 수 없는 오류')}")
+        else:
+            self.acked += 1
+        self.free.release()
+        if not self.pending:
+            self.idle.set()
+
+    def overdue(self) -> bool:
+        """가장 오래 기다린 명령이 REQUEST_TIMEOUT을 넘었는지"""
+        for entry in self.pending.values():
+            return time.perf_counter() - entry[2] > self.timeout
+        return False
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies) or [0.0]
+        pick = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1e3
+        return {"sent": self.sent, "acked": self.acked, "failed": self.failed, "retried": self.retried,
+                "unanswered": len(self.pending), "elapsed": elapsed,
+                "rate": self.sent / elapsed if elapsed > 0 else 0.0,
+                "p50_ms": pick(0.5), "p99_ms": pick(0.99)}
+
+async def script_connection(args, pipe):
+    """헤드리스 기록원의 연결: 응답을 받아 짝을 맞추고, 끊기거나 응답이 늦으면 다시 연결해 다시 보냄
+
+    처음 연결이 실패하거나 재시도 횟수를 넘으면 끝난다 (돌아오면 실패).
+    관중용 STATE는 필요 없으므로 DELTA 프로토콜로 접속한다.
+    """
+    global using
+    requested = codec.CODECS[args.codec]
+    uri = server_uri(args) if args.delta else server_uri(args) + "?proto=delta"
+    delay, connected = RECONNECT_MIN, False
+    while True:
+        watchdog = None
+        try:
+            async with websockets.connect(uri, subprotocols=[requested.subprotocol],
+                                          **compression.connect_options(args.compression)) as websocket:
+                using = codec.select(websocket.subprotocol)
+                pipe.websocket = websocket
+                delay = RECONNECT_MIN
+                if connected and not await pipe.resend():
+                    return
+                connected = True
+                pipe.online.set()
+                watchdog = asyncio.create_task(watch_timeout(pipe, websocket))
+                async for message in websocket:
+                    try:
+                        obj = using.decode(message)
+                    except ValueError:
+                        continue
+                    if "id" in obj:
+                        pipe.resolve(obj)
+                        await log_event(obj)
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.InvalidHandshake,
+                websockets.exceptions.ConnectionClosed) as e:
+            if not connected:
+                print(f"❌ 서버에 연결할 수 없습니다: {e}")
+                return
+        finally:
+            pipe.online.clear()
+            pipe.websocket = None
+            if watchdog is not None:
+                watchdog.cancel()
+        if not args.reconnect:
+            return
+        wait = random.uniform(delay / 2, delay)
+        print(f"🔄 연결이 끊겼습니다. {wait:.1f}초 후 다시 연결해 응답 못 받은 명령 {len(pipe.pending)}개를 다시 보냅니다")
+        await asyncio.sleep(wait)
+        delay = min(delay * 2, RECONNECT_MAX)
+
+async def watch_timeout(pipe, websocket):
+    """응답이 REQUEST_TIMEOUT보다 늦으면 연결을 닫아 다시 연결/다시 보내기를 시작"""
+    while True:
+        await asyncio.sleep(pipe.timeout / 4)
+        if pipe.overdue():
+            await websocket.close()
+            return
+
+async def feed_script(args, pipe):
+    """스크립트를 한 줄씩 읽어 보내고, 마지막 응답까지 기다림"""
+    line_no = 0
+    async for line in script_lines(args.script):
+        line_no += 1
+        try:
+            cmd = script_command(line)
+        except ValueError as e:
+            print(f"❌ {line_no}번째 줄: {e}")
+            pipe.failed += 1
+            continue
+        if cmd is not None:
+            await pipe.submit(cmd, line_no)
+    await pipe.idle.wait()
+
+async def run_script(args):
+    """헤드리스 기록원 실행 -> Pipeline.summary()"""
+    pipe = Pipeline(args.window, args.timeout, args.retries)
+    start = time.perf_counter()
+    feeder = asyncio.create_task(feed_script(args, pipe))
+    connection = asyncio.create_task(script_connection(args, pipe))
+    await asyncio.wait((feeder, connection), return_when=asyncio.FIRST_COMPLETED)
+    for task in (feeder, connection):
+        task.cancel()
+    await asyncio.gather(feeder, connection, return_exceptions=True)
+    if feeder.cancelled() or feeder.exception() is not None:
+        print("❌ 스크립트를 끝까지 보내지 못했습니다")
+    return pipe.summary(time.perf_counter() - start)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="야구 경기 기록 시스템 - WebSocket 클라이언트")
+    parser.add_argument("host", nargs="?", default=HOST, help="서버 주소")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--game", default="", help="게임 ID (생략하면 기본 게임)")
+    parser.add_argument("--delta", action="store_true", help="변경분(DELTA) 프로토콜 사용")
+    parser.add_argument("--codec", choices=sorted(codec.CODECS), default="json",
+                        help="메시지 형식 (bin = 작은 바이너리 형식)")
+    parser.add_argument("--no-reconnect", dest="reconnect", action="store_false",
+                        help="연결이 끊겨도 다시 연결하지 않음")
+    parser.add_argument("--no-compression", dest="compression", action="store_false",
+                        help="압축(permessage-deflate)을 요청하지 않음 (CPU가 약한 기기)")
+    parser.add_argument("--script", metavar="FILE",
+                        help="헤드리스 기록원: 파일(-면 표준 입력)의 명령을 한 줄씩 보냄 (입력 화면 없음)")
+    parser.add_argument("--window", type=int, default=SCRIPT_WINDOW,
+                        help="헤드리스 기록원이 응답을 기다리지 않고 보낼 수 있는 명령 수 (1이면 하나씩)")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT,
+                        help="이 시간(초) 안에 응답이 없으면 다시 연결해 다시 보냄")
+    parser.add_argument("--retries", type=int, default=REQUEST_RETRIES, help="명령 하나를 다시 보내는 최대 횟수")
+    parser.add_argument("--refresh", type=float, default=REFRESH_HZ, metavar="HZ",
+                        help="점수판을 다시 그리는 최대 횟수 (초당, 0이면 STATE마다)")
+    parser.add_argument("--tap", "--quiet", dest="tap", action="store_true",
+                        help="기록 전용: 화면 출력/입력 없이 받은 메시지를 로그에만 씀 (Ctrl+C로 종료)")
+    parser.add_argument("--log", default=LOG_FILE, help="로그 파일")
+    return parser.parse_args(argv)
+
+def server_uri(args, since=None):
+    """접속 주소 (since가 있으면 그 순번 이후에 놓친 DELTA만 받는 재접속)"""
+    uri = f"ws://{args.host}:{args.port}/{args.game}"
+    if since is not None:
+        uri += f"?proto=delta&since={since}"
+    elif args.delta:
+        uri += "?proto=delta"
+    return uri
+
+def print_help():
+    print("\n📋 명령어 도움말:")
+    print("  AB = 타석 결과 입력")
+    print("  SCORE = 현재 점수판 보기")
+    print("  STATS = 타자별 누적 기록 보기")
+    print("  R = 게임 리셋")
+    print("  Q = 종료\n")
+
+async def connect_loop(args, link, need_batter_input, board, renderer=None):
+    """서버에 연결해 메시지를 받고, 끊기면 지수 백오프(+지터)로 다시 연결
+
+    DELTA 프로토콜이면 마지막으로 받은 순번을 ?since=로 보내 놓친 DELTA만 이어 받는다.
+    처음 연결이 실패하면 그대로 끝낸다.
+    """
+    global using
+    requested = codec.CODECS[args.codec]
+    delay = RECONNECT_MIN
+    while True:
+        try:
+            async with websockets.connect(server_uri(args, board.seq), subprotocols=[requested.subprotocol],
+                                          **compression.connect_options(args.compression)) as websocket:
+                # 하위 프로토콜을 모르는 이전 서버면 JSON으로 계속
+                using = codec.select(websocket.subprotocol)
+                link.websocket = websocket
+                delay = RECONNECT_MIN
+                if not link.connected.is_set():
+                    print("✅ [CONNECTED]")
+                    if not args.tap:
+                        print_help()
+                    link.connected.set()
+                elif board.seq is not None:
+                    print(f"\n✅ [RECONNECTED] 순번 {board.seq} 이후부터 이어 받습니다")
+                else:
+                    print("\n✅ [RECONNECTED]")
+                await receive_messages(websocket, need_batter_input, board, renderer)
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.InvalidHandshake) as e:
+            if not link.connected.is_set():
+                print("❌ 서버에 연결할 수 없습니다.")
+                print("💡 server_websocket.py가 실행 중인지 확인하세요!")
+                return
+            print(f"❌ 재연결 실패: {e}")
+        finally:
+            link.websocket = None
+        if not args.reconnect:
+            return
+        wait = random.uniform(delay / 2, delay)
+        print(f"🔄 {wait:.1f}초 후 다시 연결합니다...")
+        await asyncio.sleep(wait)
+        delay = min(delay * 2, RECONNECT_MAX)
+
+async def main(args):
     """메인 함수"""
-    uri = f"ws://{HOST}:{PORT}"
+    global log_writer
+    requested = codec.CODECS[args.codec]
     
     print("="*50)
     print("🏟️  야구 경기 기록 시스템 - WebSocket 클라이언트")
     print("="*50)
-    print(f"📡 서버 주소: {uri}")
-    print(f"📝 로그 파일: {LOG_FILE}")
+    print(f"📡 서버 주소: {server_uri(args)}")
+    print(f"📝 로그 파일: {args.log}")
+    print(f"📦 메시지 형식: {requested.name}")
     print("🔄 서버에 연결 중...")
     print("="*50)
     
     try:
-        async with websockets.connect(uri) as websocket:
-            print("✅ [CONNECTED]")
-            print("\n📋 명령어 도움말:")
-            print("  AB = 타석 결과 입력")
-            print("  SCORE = 현재 점수판 보기")
-            print("  R = 게임 리셋")
-            print("  Q = 종료\n")
-            
+        async with LogWriter(args.log) as log_writer:
+            if args.script:
+                r = await run_script(args)
+                print(f"📊 명령 {r['sent']}개: 성공 {r['acked']} / 오류 {r['failed']} / 응답 없음 {r['unanswered']}, "
+                      f"다시 보냄 {r['retried']}번, {r['elapsed']:.2f}s ({r['rate']:,.0f}/s), "
+                      f"응답 지연 p50 {r['p50_ms']:.1f}ms p99 {r['p99_ms']:.1f}ms")
+                return
+            link = Link()
             # 타자 입력 필요 여부를 리스트로 감싸서 참조 전달
             need_batter_input = [True]
+            renderer = Renderer(args.refresh, quiet=args.tap)
+            receiver = asyncio.create_task(connect_loop(args, link, need_batter_input, Scoreboard(), renderer))
+            connected = asyncio.create_task(link.connected.wait())
+            await asyncio.wait((receiver, connected), return_when=asyncio.FIRST_COMPLETED)
+            if not link.connected.is_set():
+                connected.cancel()
+                return
+            
+            if args.tap:
+                # 기록 전용: 연결이 완전히 끝나거나 Ctrl+C까지 받기만
+                start = time.perf_counter()
+                try:
+                    await receiver
+                finally:
+                    elapsed = time.perf_counter() - start
+                    print(f"\n📊 메시지 {renderer.messages:,}개를 {elapsed:.1f}s 동안 기록 "
+                          f"({renderer.messages / elapsed if elapsed else 0:,.0f}/s)")
+                return
             
-            # 송신과 수신을 동시에 처리
-            await asyncio.gather(
-                receive_messages(websocket, need_batter_input),
-                send_messages(websocket, need_batter_input)
-            )
+            # 송신(입력)은 재연결과 상관없이 Q를 입력할 때까지 계속
+            try:
+                await send_messages(link, need_batter_input)
+            finally:
+                receiver.cancel()
             
-    except ConnectionRefusedError:
-        print("❌ 서버에 연결할 수 없습니다.")
-        print("💡 server_websocket.py가 실행 중인지 확인하세요!")
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(main(parse_args()))
     except KeyboardInterrupt:
         print("\n\n👋 프로그램을 종료합니다...")
\ No newline at end of file
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+메시지 코덱 (접속할 때 선택)
+설명: 서버와 클라이언트가 주고받는 메시지(dict)를 프레임 bytes로 바꾸는 방법.
+      접속할 때 WebSocket 하위 프로토콜("bbp.json"/"bbp.bin") 또는 ?codec=json|bin으로 고르며,
+      아무것도 고르지 않으면 JSON이다.
+
+  json  텍스트 프레임. orjson이 설치돼 있으면 그것을 쓰고, 없으면 표준 json (ensure_ascii=False).
+  bin   바이너리 프레임. MessagePack 비슷한 태그 형식에 다음을 더했다:
+          - 자주 쓰는 키/값(type, STATE, STRIKE, 1B, AWAY ...)은 1바이트 기호 번호
+          - 0..127 정수는 1바이트, 주자 목록(["1B", "3B"])은 비트 마스크 1바이트
+          - 이닝 표시("7회 말")는 이닝 번호 + 초/말 1바이트
+        기호 표는 뒤에만 추가해야 한다 (번호가 바뀌면 이전 클라이언트와 호환되지 않음).
+"""
+
+import json
+import struct
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+class JsonCodec:
+    name = "json"
+    subprotocol = "bbp.json"
+    binary = False
+    bad_message = "Bad JSON"
+
+    if orjson is not None:
+        @staticmethod
+        def encode(message) -> bytes:
+            return orjson.dumps(message)
+
+        @staticmethod
+        def decode(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError as e:
+                raise ValueError(str(e)) from None
+    else:
+        @staticmethod
+        def encode(message) -> bytes:
+            return json.dumps(message, ensure_ascii=False).encode("utf-8")
+
+        @staticmethod
+        def decode(data):
+            return json.loads(data)
+
+# ---------------------------------------------------------------- 바이너리
+
+VERSION = 1
+T_NONE, T_FALSE, T_TRUE, T_UINT, T_NEG, T_FLOAT, T_STR, T_SYM, T_LIST, T_DICT, T_RUNNERS, T_INNING = range(12)
+T_SMALL = 0x80      # 0x80 | n  (0 <= n < 128)
+FLOAT = struct.Struct("<d")
+
+SYMBOLS = (
+    # 메시지 종류
+    "STATE", "DELTA", "ACK", "END", "ERROR", "STATS", "RESET", "LINEUP_SET",
+    "AB", "SCORE", "SET_RUNNERS", "SET_LINEUP", "JOIN", "PROTO", "RESYNC",
+    # 키
+    "type", "inning", "outs", "balls", "strikes", "home", "away", "runners", "current_batter",
+    "game_over", "seq", "changes", "batter", "result", "half", "winner", "msg", "home_win_prob",
+    "run_exp", "away_lineup", "home_lineup", "game", "batters", "teams", "team", "mode",
+    # 타석 결과 (fast_engine.RESULTS, ERROR는 위에 있음)
+    "STRIKE", "BALL", "FOUL", "OUT", "1B", "2B", "3B", "HR", "SAC_FLY", "SAC_BUNT",
+    "STEAL", "CAUGHT_STEALING", "WILD_PITCH", "BALK",
+    # 기타 값
+    "AWAY", "HOME", "Unknown", "delta", "full",
+    # 기록 항목 (batting.STATS 중 위에 없는 것)
+    "PA", "H", "BB", "K", "SF", "SH", "AVG",
+    # 재접속
+    "RESUME", "REPLAY", "events",
+    # 묶음 명령
+    "BATCH", "results", "index",
+)
+SYMBOL_CODES = {s: i for i, s in enumerate(SYMBOLS)}
+assert len(SYMBOL_CODES) == len(SYMBOLS) <= 256
+BASES = ("1B", "2B", "3B")
+MAX_DEPTH = 32      # 목록/사전 중첩 한도 (실제 메시지는 3단계 안쪽)
+RUNNER_MASKS = {}
+for _mask in range(8):
+    RUNNER_MASKS[tuple(b for i, b in enumerate(BASES) if _mask >> i & 1)] = _mask
+RUNNER_LISTS = {mask: list(runners) for runners, mask in RUNNER_MASKS.items()}
+HALVES = ("초", "말")
+
+def _varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _inning(s):
+    """"7회 말" -> (7, 1), 아니면 None"""
+    number, sep, half = s.partition("회 ")
+    if sep and number.isascii() and number.isdigit() and half in HALVES and number[0] != "0":
+        return int(number), HALVES.index(half)
+    return None
+
+def _encode(out, v):
+    if v is None:
+        out.append(T_NONE)
+    elif v is True:
+        out.append(T_TRUE)
+    elif v is False:
+        out.append(T_FALSE)
+    elif isinstance(v, int):
+        if 0 <= v < 0x80:
+            out.append(T_SMALL | v)
+        elif v >= 0:
+            out.append(T_UINT)
+            _varint(out, v)
+        else:
+            out.append(T_NEG)
+            _varint(out, -v - 1)
+    elif isinstance(v, str):
+        code = SYMBOL_CODES.get(v)
+        if code is not None:
+            out.append(T_SYM)
+            out.append(code)
+            return
+        inning = _inning(v)
+        if inning is not None:
+            out.append(T_INNING)
+            _varint(out, inning[0])
+            out.append(inning[1])
+            return
+        data = v.encode("utf-8")
+        out.append(T_STR)
+        _varint(out, len(data))
+        out += data
+    elif isinstance(v, dict):
+        out.append(T_DICT)
+        _varint(out, len(v))
+        for k, item in v.items():
+            _encode(out, k)
+            _encode(out, item)
+    elif isinstance(v, (list, tuple)):
+        mask = RUNNER_MASKS.get(tuple(v)) if 0 < len(v) <= 3 and all(type(b) is str for b in v) else None
+        if mask is not None:
+            out.append(T_RUNNERS)
+            out.append(mask)
+            return
+        out.append(T_LIST)
+        _varint(out, len(v))
+        for item in v:
+            _encode(out, item)
+    elif isinstance(v, float):
+        out.append(T_FLOAT)
+        out += FLOAT.pack(v)
+    else:
+        raise TypeError(f"인코딩할 수 없는 값: {type(v).__name__}")
+
+def _read_varint(data, i):
+    n = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+def _decode(data, i, depth=0):
+    tag = data[i]
+    i += 1
+    if tag >= T_SMALL:
+        return tag & 0x7F, i
+    if tag == T_SYM:
+        return SYMBOLS[data[i]], i + 1
+    if tag == T_DICT:
+        if depth >= MAX_DEPTH:
+            raise ValueError("중첩이 너무 깊습니다")
+        n, i = _read_varint(data, i)
+        d = {}
+        for _ in range(n):
+            k, i = _decode(data, i, depth + 1)
+            d[k], i = _decode(data, i, depth + 1)
+        return d, i
+    if tag == T_STR:
+        n, i = _read_varint(data, i)
+        return bytes(data[i:i + n]).decode("utf-8"), i + n
+    if tag == T_RUNNERS:
+        return list(RUNNER_LISTS[data[i]]), i + 1
+    if tag == T_INNING:
+        n, i = _read_varint(data, i)
+        return f"{n}회 {HALVES[data[i]]}", i + 1
+    if tag == T_NONE:
+        return None, i
+    if tag == T_TRUE:
+        return True, i
+    if tag == T_FALSE:
+        return False, i
+    if tag == T_UINT:
+        return _read_varint(data, i)
+    if tag == T_NEG:
+        n, i = _read_varint(data, i)
+        return -n - 1, i
+    if tag == T_FLOAT:
+        return FLOAT.unpack_from(data, i)[0], i + FLOAT.size
+    if tag == T_LIST:
+        if depth >= MAX_DEPTH:
+            raise ValueError("중첩이 너무 깊습니다")
+        n, i = _read_varint(data, i)
+        items = []
+        for _ in range(n):
+            item, i = _decode(data, i, depth + 1)
+            items.append(item)
+        return items, i
+    raise ValueError(f"알 수 없는 태그: {tag}")
+
+class BinaryCodec:
+    name = "bin"
+    subprotocol = "bbp.bin"
+    binary = True
+    bad_message = "Bad message"
+
+    @staticmethod
+    def encode(message) -> bytes:
+        out = bytearray((VERSION,))
+        _encode(out, message)
+        return bytes(out)
+
+    @staticmethod
+    def decode(data):
+        if isinstance(data, str) or not data or data[0] != VERSION:
+            raise ValueError("바이너리 메시지가 아닙니다")
+        try:
+            value, i = _decode(data, 1)
+        except (IndexError, KeyError, TypeError, UnicodeDecodeError, struct.error) as e:
+            raise ValueError(f"잘린 메시지: {e}") from None
+        if i != len(data):
+            raise ValueError("메시지 뒤에 남는 바이트가 있습니다")
+        return value
+
+JSON = JsonCodec()
+BINARY = BinaryCodec()
+CODECS = {c.name: c for c in (JSON, BINARY)}
+SUBPROTOCOLS = [c.subprotocol for c in CODECS.values()]
+
+def select(subprotocol=None, name="") -> "JsonCodec | BinaryCodec":
+    """협상된 하위 프로토콜, 없으면 ?codec= 이름, 둘 다 없으면 JSON"""
+    for c in CODECS.values():
+        if subprotocol == c.subprotocol:
+            return c
+    return CODECS.get(name, JSON)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 메시지 압축 정책 (permessage-deflate)
+사용법: python server_websocket.py [--compression on|off] [--compression-min-size 32]
+                                   [--compression-window 10] [--compression-memory 2]
+설명: websockets 라이브러리 기본값(항상 압축, 창 12비트, memLevel 5) 대신 서버가 정책을 직접 정한다.
+        - on/off: 끄면 압축을 협상하지 않는다 (서버 --compression off, 클라이언트 --no-compression)
+        - 최소 크기: 이보다 작은 메시지는 압축하지 않고 보낸다. RFC 7692는 메시지마다 RSV1로
+          압축 여부를 표시하므로 협상한 그대로 섞어 보낼 수 있다
+        - 창/메모리 수준: 접속마다 압축기 버퍼 = 2^(창+2) + 2^(메모리+9) bytes (창 10, 메모리 2면 6KB)
+      압축 문맥을 메시지 사이에 이어 쓰므로(context takeover) 70 bytes짜리 DELTA도 15 bytes 안팎으로 준다.
+      그래서 최소 크기는 작게 두고, 대신 창과 메모리 수준을 낮춰 접속당 메모리를 줄였다
+      (benchmarks/bench_compression.py: 라이브러리 기본값보다 접속당 RSS 약 18KB 적고 크기는 15%쯤 큼).
+      압축 전후 바이트, 건너뛴 메시지 수, 압축에 쓴 CPU 시간은 stats에 모아 METRICS/--metrics-port로 본다.
+      같은 메시지를 관중마다 따로 압축하므로(접속마다 압축 문맥이 다름) CPU는 관중 수에 비례한다.
+"""
+
+import time
+
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import CONT, CTRL_OPCODES
+
+import metrics
+
+MIN_SIZE = 32       # 이보다 작은 메시지는 압축하지 않음 (bytes)
+WINDOW_BITS = 10    # 압축 창 (9~15, websockets 기본값은 12)
+MEMORY_LEVEL = 2    # zlib memLevel (1~9, websockets 기본값은 5)
+
+# 서버 전체 압축 지표
+stats = {
+    "compressed": 0,        # 압축해서 보낸 메시지 수
+    "skipped": 0,           # 최소 크기보다 작아 그대로 보낸 메시지 수
+    "raw_bytes": 0,         # 압축한 메시지의 원래 크기 합
+    "compressed_bytes": 0,  # 압축한 메시지의 압축 후 크기 합
+    "seconds": 0.0,         # 압축에 쓴 CPU 시간 (thread_time: 벽시계 시간 아님, metrics.enabled일 때만)
+}
+
+def summary():
+    """지표 + 압축률 (압축 후 / 원래)"""
+    ratio = stats["compressed_bytes"] / stats["raw_bytes"] if stats["raw_bytes"] else None
+    return {**stats, "seconds": round(stats["seconds"], 6), "ratio": ratio and round(ratio, 4)}
+
+def connection_memory(window_bits=WINDOW_BITS, memory_level=MEMORY_LEVEL) -> int:
+    """접속 하나의 압축기 버퍼 (zlib 문서의 deflate 메모리 공식, zlib/파이썬 객체 자체는 뺌)"""
+    return (1 << (window_bits + 2)) + (1 << (memory_level + 9))
+
+class ThresholdDeflate(PerMessageDeflate):
+    """min_size보다 작은 메시지는 압축하지 않는 permessage-deflate (RSV1을 켜지 않고 그대로 보냄)"""
+
+    def __init__(self, *args, min_size=MIN_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+
+    def encode(self, frame):
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        if frame.opcode is not CONT and frame.fin and len(frame.data) < self.min_size:
+            stats["skipped"] += 1
+            return frame
+        if not metrics.enabled:
+            encoded = super().encode(frame)
+        else:
+            start = time.thread_time()
+            encoded = super().encode(frame)
+            stats["seconds"] += time.thread_time() - start
+        stats["compressed"] += frame.fin
+        stats["raw_bytes"] += len(frame.data)
+        stats["compressed_bytes"] += len(encoded.data)
+        return encoded
+
+class ThresholdDeflateFactory(ServerPerMessageDeflateFactory):
+    """서버 쪽 협상: 라이브러리 협상 그대로, 만든 확장만 ThresholdDeflate로"""
+
+    def __init__(self, min_size=MIN_SIZE, window_bits=WINDOW_BITS, memory_level=MEMORY_LEVEL):
+        super().__init__(server_max_window_bits=window_bits, client_max_window_bits=window_bits,
+                         compress_settings={"memLevel": memory_level})
+        self.min_size = min_size
+
+    def process_request_params(self, params, accepted_extensions):
+        response, ext = super().process_request_params(params, accepted_extensions)
+        return response, ThresholdDeflate(ext.remote_no_context_takeover, ext.local_no_context_takeover,
+                                          ext.remote_max_window_bits, ext.local_max_window_bits,
+                                          self.compress_settings, min_size=self.min_size)
+
+def serve_options(enabled=True, min_size=MIN_SIZE, window_bits=WINDOW_BITS, memory_level=MEMORY_LEVEL) -> dict:
+    """websockets.serve()에 넘길 압축 인자"""
+    if not enabled:
+        return {"compression": None}
+    return {"compression": None, "extensions": [ThresholdDeflateFactory(min_size, window_bits, memory_level)]}
+
+def connect_options(enabled=True) -> dict:
+    """websockets.connect()에 넘길 압축 인자 (클라이언트가 보내는 명령은 작으므로 라이브러리 기본값)"""
+    return {"compression": "deflate" if enabled else None}
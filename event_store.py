@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+입력 명령 이벤트 스트림과 스냅샷
+설명: 상태를 바꾸는 입력 명령(AB/RESET/SET_RUNNERS/SET_LINEUP)을
+      모든 게임 공용의 추가 전용 JSONL 스트림(events.jsonl)에 번호(n)를 붙여 기록한다.
+      주기적으로 모든 게임 상태를 snapshot.json에 저장하고,
+      재시작(--recover) 시에는 스냅샷을 읽은 뒤 그 이후의 꼬리 부분만 다시 적용한다.
+
+스냅샷 형식:
+  {"n": 마지막으로 반영된 이벤트 번호,
+   "offset": 스트림에서 다시 읽기 시작할 바이트 위치 (n 이하 이벤트가 섞여 있을 수 있음),
+   "games": {게임 ID: GameRoom.dump()}}
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+
+from log_writer import LogWriter
+
+STREAM_FILE = "events.jsonl"
+SNAPSHOT_FILE = "snapshot.json"
+
+def publishes_state(event: dict) -> bool:
+    """STATE 순번을 올리는 명령인지 (서버에서 publish_state()를 부르는 명령)"""
+    return event["type"] != "SET_LINEUP"
+
+def read_snapshot(directory):
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        return {"n": 0, "offset": 0, "games": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def read_stream(path, offset=0):
+    """(n, game, event)를 차례로 돌려줌. 마지막 줄이 잘려 있으면 거기서 멈춤"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"[RECOVER] 손상된 줄에서 중단: {line[:80]!r}")
+                return
+            yield rec["n"], rec["game"], rec["event"]
+
+def recover(directory, rooms, use_snapshot=True):
+    """스냅샷 + 꼬리 이벤트로 rooms(RoomRegistry)를 재구성. 마지막 이벤트 번호 반환"""
+    snap = read_snapshot(directory) if use_snapshot else {"n": 0, "offset": 0, "games": {}}
+    for game_id, data in snap["games"].items():
+        rooms.get(game_id).restore(data)
+    last_n = snap["n"]
+    touched = set()
+    for n, game_id, event in read_stream(os.path.join(directory, STREAM_FILE), snap["offset"]):
+        if n <= snap["n"]:
+            continue
+        room = rooms.get(game_id)
+        room.apply(event)
+        if publishes_state(event):
+            room.seq += 1
+        touched.add(room)
+        last_n = n
+    for room in touched:
+        room.refresh()
+    return last_n
+
+class EventStore:
+    """이벤트 스트림 기록기 + 주기적 스냅샷"""
+
+    def __init__(self, directory, snapshot_every=10000, fsync="none"):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.stream_path = os.path.join(directory, STREAM_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.writer = None
+        self.next_n = 1
+        self.since_snapshot = 0
+        self.snapshot_task = None
+
+    async def start(self, rooms, recover_state=False):
+        """recover_state=True면 기존 스트림으로 rooms를 복구, 아니면 기존 파일을 보관하고 새로 시작"""
+        os.makedirs(self.directory, exist_ok=True)
+        if recover_state:
+            loop = asyncio.get_running_loop()
+            self.next_n = await loop.run_in_executor(None, recover, self.directory, rooms) + 1
+        else:
+            self.archive()
+        self.writer = await LogWriter(self.stream_path, fsync=self.fsync).start()
+        return self
+
+    def archive(self):
+        """이전 실행의 스트림/스냅샷을 시각 접미사를 붙여 옮겨 둠"""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        for path in (self.stream_path, self.snapshot_path):
+            if os.path.exists(path):
+                base, ext = os.path.splitext(path)
+                os.replace(path, f"{base}-{stamp}{ext}")
+
+    async def append(self, rooms, game_id, event):
+        """이미 반영된 입력 명령을 스트림에 추가하고, 필요하면 스냅샷 예약"""
+        n = self.next_n
+        self.next_n += 1
+        line = json.dumps({"timestamp": datetime.now().isoformat(), "n": n, "game": game_id, "event": event},
+                          ensure_ascii=False) + "\n"
+        await self.writer.write_line(line)
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every and self.snapshot_task is None:
+            self.snapshot_task = asyncio.create_task(self.snapshot(rooms))
+
+    async def snapshot(self, rooms):
+        """모든 게임 상태를 snapshot.json에 원자적으로 저장"""
+        try:
+            # 아래 세 값은 await 없이 한 번에 읽어야 서로 일관된다
+            snap = {
+                "n": self.next_n - 1,
+                "offset": self.writer.position,
+                "games": rooms.dump_games(),
+            }
+            # 휴면 게임(hibernate.py)은 수가 많을 수 있으므로 압축 해제는 기록 스레드에서
+            cold = rooms.cold.view() if rooms.cold is not None else None
+            self.since_snapshot = 0
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_snapshot, snap, cold)
+        finally:
+            self.snapshot_task = None
+
+    def _write_snapshot(self, snap, cold=None):
+        if cold is not None:
+            try:
+                snap["games"] = {**dict(cold.items()), **snap["games"]}
+            finally:
+                cold.close()
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f, ensure_ascii=False)
+        os.replace(tmp, self.snapshot_path)
+
+    async def close(self, rooms):
+        """남은 이벤트를 기록하고 마지막 스냅샷 저장"""
+        if self.snapshot_task is not None:
+            await self.snapshot_task
+        await self.writer.close()
+        await self.snapshot(rooms)
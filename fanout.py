@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+브로드캐스트 팬아웃 엔진
+설명: 메시지는 코덱(codec.py)마다 한 번만 인코딩하고,
+      구독자(접속)마다 제한된 크기의 송신 큐와 전송 태스크를 둔다.
+      느린 관중 한 명이 AB 처리나 다른 관중을 기다리게 하지 않는다.
+
+느린 구독자 정책:
+  "latest"     큐가 가득 차면 대기 중인 STATE/DELTA 프레임을 버리고 최신 것만 유지:
+               마지막 STATE와 그 뒤 DELTA는 남기고, 그래도 가득 차면 가장 최근 STATE/DELTA 하나만 남긴다.
+               (DELTA를 버리면 클라이언트가 순번 공백을 보고 RESYNC를 요청한다)
+               버릴 수 없는 프레임만으로 가득 차 있으면 연결을 끊는다.
+  "disconnect" 큐가 가득 차면 바로 연결을 끊는다.
+
+전송 오류(연결 종료 말고): 프레임 하나를 건너뛰면 순서/순번이 깨지므로 구독자마다 한 번 출력하고 연결을 닫는다 (1011).
+"""
+
+import asyncio
+import inspect
+from collections import deque
+
+from websockets.exceptions import ConnectionClosed
+
+import codec
+
+POLICIES = ("latest", "disconnect")
+DROPPABLE = ("STATE", "DELTA")
+DEFAULT_QUEUE_SIZE = 64
+
+# 전체 팬아웃 지표
+stats = {
+    "frames_queued": 0,
+    "frames_sent": 0,
+    "bytes_sent": 0,
+    "frames_dropped": 0,
+    "slow_disconnects": 0,
+    "send_errors": 0,
+}
+
+_text_bytes_support = {}
+
+def encode(message, using=codec.JSON) -> bytes:
+    """dict 메시지를 프레임 페이로드로 인코딩 (bytes/str은 이미 인코딩된 JSON으로 봄)"""
+    if isinstance(message, bytes):
+        return message
+    if isinstance(message, str):
+        return message.encode("utf-8")
+    return using.encode(message)
+
+def _supports_text_bytes(websocket) -> bool:
+    """bytes를 재인코딩 없이 텍스트 프레임으로 보낼 수 있는지 (websockets 13+ send(text=True))"""
+    cls = type(websocket)
+    supported = _text_bytes_support.get(cls)
+    if supported is None:
+        try:
+            supported = "text" in inspect.signature(cls.send).parameters
+        except (TypeError, ValueError):
+            supported = False
+        _text_bytes_support[cls] = supported
+    return supported
+
+class Subscriber:
+    """접속 하나의 송신 큐와 전송 태스크"""
+
+    def __init__(self, websocket, max_queue=DEFAULT_QUEUE_SIZE, policy="latest", using=codec.JSON):
+        if policy not in POLICIES:
+            raise ValueError(f"정책은 {POLICIES} 중 하나여야 합니다: {policy}")
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.policy = policy
+        self.queue = deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.dropped = 0
+        self.delta = False  # DELTA 프로토콜 사용 여부
+        self.codec = using  # 접속할 때 고른 코덱 (바이너리면 바이너리 프레임으로 보냄)
+        self.text_bytes = _supports_text_bytes(websocket)
+        self.task = asyncio.create_task(self._run())
+
+    @property
+    def remote_address(self):
+        return getattr(self.websocket, "remote_address", None)
+
+    def send(self, message, kind=None):
+        """메시지 한 개를 이 구독자에게 예약 (기다리지 않음)"""
+        if kind is None and isinstance(message, dict):
+            kind = message.get("type")
+        self.push(encode(message, self.codec), kind)
+
+    def push(self, frame: bytes, kind=None) -> bool:
+        """인코딩된 프레임을 큐에 추가. 연결을 끊었으면 False"""
+        if self.closed:
+            return False
+        if len(self.queue) >= self.max_queue:
+            if self.policy == "latest":
+                self._drop_states()
+            if len(self.queue) >= self.max_queue:
+                self.disconnect()
+                return False
+        self.queue.append((kind, frame))
+        stats["frames_queued"] += 1
+        self.ready.set()
+        return True
+
+    def _drop_states(self):
+        """STATE/DELTA를 버려 자리를 만듦: 마지막 STATE와 그 뒤 DELTA는 남김 (STATE가 없으면 마지막 DELTA만)
+
+        그래도 가득 차면 가장 최근 STATE/DELTA 하나만 남긴다. 관중이 최신 상태(또는 RESYNC할 단서)를 잃지 않는다.
+        """
+        items = list(self.queue)
+        droppable = [i for i, item in enumerate(items) if item[0] in DROPPABLE]
+        if not droppable:
+            return
+        states = [i for i in droppable if items[i][0] == "STATE"]
+        keep = {i for i in droppable if i >= (states[-1] if states else droppable[-1])}
+        if len(items) - len(droppable) + len(keep) >= self.max_queue:
+            keep = {droppable[-1]}
+        kept = deque(item for i, item in enumerate(items) if item[0] not in DROPPABLE or i in keep)
+        dropped = len(self.queue) - len(kept)
+        if dropped:
+            self.queue = kept
+            self.dropped += dropped
+            stats["frames_dropped"] += dropped
+
+    def disconnect(self):
+        """느린 구독자 연결 종료"""
+        if self.closed:
+            return
+        stats["slow_disconnects"] += 1
+        self.close()
+        asyncio.ensure_future(self.websocket.close(code=1008, reason="slow consumer"))
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        self.task.cancel()
+
+    async def _run(self):
+        ws = self.websocket
+        while True:
+            await self.ready.wait()
+            while self.queue:
+                _, frame = self.queue.popleft()
+                try:
+                    if self.codec.binary:
+                        await ws.send(frame)
+                    elif self.text_bytes:
+                        await ws.send(frame, text=True)
+                    else:
+                        await ws.send(frame.decode("utf-8"))
+                except ConnectionClosed:
+                    self.closed = True
+                    self.queue.clear()
+                    return
+                except Exception as e:
+                    # 건너뛰고 다음 프레임을 보내면 순서/순번이 깨지므로 한 번 알리고 연결을 닫음
+                    stats["send_errors"] += 1
+                    print(f"[SEND] {self.remote_address} 전송 오류로 연결을 닫습니다: {type(e).__name__}: {e}")
+                    self.closed = True
+                    self.queue.clear()
+                    asyncio.ensure_future(ws.close(code=1011, reason="send error"))
+                    return
+                stats["frames_sent"] += 1
+                stats["bytes_sent"] += len(frame)
+            self.ready.clear()
+
+class RequestReply:
+    """요청 ID("id")가 붙은 명령의 응답 창구
+
+    그 기록원에게 직접 보내는 응답(ACK/END/ERROR/STATS)에 같은 ID를 붙인다.
+    마지막으로 보낸 응답은 재시도 중복 제거(GameRoom.requests)에 쓴다.
+    """
+
+    def __init__(self, client, request_id):
+        self.client = client
+        self.request_id = request_id
+        self.last = None
+
+    @property
+    def delta(self):
+        return self.client.delta
+
+    def send(self, message, kind=None):
+        if isinstance(message, dict):
+            message = {**message, "id": self.request_id}
+            self.last = message
+        self.client.send(message, kind)
+
+def reply_to(client, request_id):
+    """request_id가 있으면 응답에 ID를 붙이는 창구, 없으면 client 그대로"""
+    return client if request_id is None else RequestReply(client, request_id)
+
+def broadcast(subscribers, message, kind=None, frame_for=None):
+    """모든 구독자에게 같은 메시지를 예약. 인코딩은 코덱마다 한 번만 한다
+
+    frame_for(codec)를 주면 인코딩 대신 그것이 돌려주는 (캐시된) 프레임을 쓴다.
+    """
+    if kind is None and isinstance(message, dict):
+        kind = message.get("type")
+    frames = {}
+    for sub in list(subscribers):
+        frame = frames.get(sub.codec)
+        if frame is None:
+            frame = frames[sub.codec] = frame_for(sub.codec) if frame_for else encode(message, sub.codec)
+        sub.push(frame, kind)
+    return frames
+
+def queue_metrics(subscribers):
+    """구독자 큐 깊이 요약"""
+    depths = [len(sub.queue) for sub in subscribers]
+    return {
+        "subscribers": len(depths),
+        "queue_depth_total": sum(depths),
+        "queue_depth_max": max(depths, default=0),
+        "dropped": sum(sub.dropped for sub in subscribers),
+    }
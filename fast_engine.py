@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+표 기반 규칙 엔진 (simulate.py의 기준 규칙)
+설명: game_engine과 같은 규칙을 결과 코드와 루 마스크의 표로 적용한다.
+      서버/복구/재방송은 game_engine을 쓰고, 이 모듈은 시뮬레이터(simulate.py)와 결과 코드 목록(RESULTS)에만 쓴다.
+      빠른 것은 결과 코드로 바로 상태를 바꾸는 step()뿐이고 (game_engine.apply_ab의 약 4배),
+      응답 dict를 만드는 apply_ab()는 거의 같은 속도다 (benchmarks/bench_engine.py).
+      - 루 상황은 3비트 마스크 (1루=1, 2루=2, 3루=4)
+      - 게임 상태는 __slots__ 객체 (GameState)
+      - 주루 결과는 (결과 코드, 루 마스크) -> (새 마스크, 득점, 아웃 증가, 타석 종료) 표를 미리 계산
+        (이 규칙에서는 아웃 수가 주루 결과에 영향을 주지 않으므로 표 키에 넣지 않는다.
+         3아웃 처리는 표 적용 뒤에 한 번만 검사한다)
+      apply_ab/current_state가 돌려주는 dict는 game_engine과 JSON 기준으로 바이트 단위까지 같다.
+"""
+
+AWAY, HOME = 0, 1
+HALF_NAMES = ("AWAY", "HOME")
+HALF_LABELS = ("초", "말")
+
+# 결과 코드 (game_engine의 결과 문자열 순서)
+RESULTS = ("OUT", "STRIKE", "BALL", "FOUL", "1B", "2B", "3B", "HR", "SAC_FLY", "SAC_BUNT",
+           "ERROR", "STEAL", "CAUGHT_STEALING", "WILD_PITCH", "BALK")
+CODES = {name: code for code, name in enumerate(RESULTS)}
+(OUT, STRIKE, BALL, FOUL, SINGLE, DOUBLE, TRIPLE, HR, SAC_FLY, SAC_BUNT,
+ ERROR, STEAL, CAUGHT_STEALING, WILD_PITCH, BALK) = range(len(RESULTS))
+NOOP = len(RESULTS)          # 알 수 없는 결과: 카운트/주자 변화 없음
+WALK = NOOP + 1              # 볼넷 (BALL/WILD_PITCH 4번째)
+WP_ADVANCE = NOOP + 2        # 4볼이 아닌 폭투: 주자만 한 베이스씩
+TABLE_CODES = WP_ADVANCE + 1
+
+RUNNER_LISTS = tuple(tuple(b for bit, b in ((1, "1B"), (2, "2B"), (4, "3B")) if mask & bit) for mask in range(8))
+BASE_BITS = {"1B": 1, "2B": 2, "3B": 4}
+
+def _advance(mask, bases):
+    """모든 주자가 bases만큼 진루 -> (새 마스크, 득점)"""
+    return (mask << bases) & 7, bin(mask >> (3 - bases)).count("1")
+
+def _walk(mask):
+    """game_engine.walk_batter와 같은 조건 순서로 계산"""
+    new, runs = 0, 0
+    if mask == 7:
+        runs = 1
+        new |= 4 | 2
+    elif mask & 3 == 3:
+        new |= 4 | 2
+    elif mask & 1:
+        new |= 2
+    if mask & 4 and not mask & 1:
+        new |= 4
+    if mask & 2 and not mask & 1:
+        new |= 2
+    return new | 1, runs
+
+def _transition(code, mask):
+    """(새 마스크, 득점, 아웃 증가, 타석 종료)"""
+    if code in (OUT, STRIKE):
+        return mask, 0, 1, True          # STRIKE는 3번째 스트라이크일 때만 표를 쓴다
+    if code in (SINGLE, DOUBLE, TRIPLE, ERROR):
+        bases = 1 if code == ERROR else code - SINGLE + 1
+        new, runs = _advance(mask, bases)
+        return new | (1 << (bases - 1)), runs, 0, True
+    if code == HR:
+        return 0, 1 + bin(mask).count("1"), 0, True
+    if code == SAC_FLY:
+        return mask & ~4, 1 if mask & 4 else 0, 1, True
+    if code == SAC_BUNT:
+        new, runs = _advance(mask, 1)
+        return new, runs, 1, True
+    if code == STEAL:
+        if mask & 1 and not mask & 2:
+            return (mask & ~1) | 2, 0, 0, False
+        if mask & 2 and not mask & 4:
+            return (mask & ~2) | 4, 0, 0, False
+        return mask, 0, 0, False
+    if code == CAUGHT_STEALING:
+        if mask & 1:
+            return mask & ~1, 0, 1, False
+        return mask & ~2, 0, 1, False
+    if code in (WP_ADVANCE, BALK):
+        new, runs = _advance(mask, 1)
+        return new, runs, 0, False
+    if code == WALK:
+        new, runs = _walk(mask)
+        return new, runs, 0, True
+    return mask, 0, 0, False
+
+# 평탄화한 표: TABLE[code * 8 + mask]
+TABLE = tuple(_transition(code, mask) for code in range(TABLE_CODES) for mask in range(8))
+
+class GameState:
+    """game_engine.init_state() dict와 같은 정보를 담는 압축 상태"""
+
+    __slots__ = ("inning", "half", "outs", "balls", "strikes", "away", "home", "bases",
+                 "current_batter", "game_over", "away_index", "home_index", "away_lineup", "home_lineup")
+
+    def __init__(self):
+        self.inning = 1
+        self.half = AWAY
+        self.outs = 0
+        self.balls = 0
+        self.strikes = 0
+        self.away = 0
+        self.home = 0
+        self.bases = 0
+        self.current_batter = None
+        self.game_over = False
+        self.away_index = 0
+        self.home_index = 0
+        self.away_lineup = None
+        self.home_lineup = None
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        gs = cls()
+        gs.inning = state["inning"]
+        gs.half = HOME if state["half"] == "HOME" else AWAY
+        gs.outs = state["outs"]
+        gs.balls = state["balls"]
+        gs.strikes = state["strikes"]
+        gs.away = state["away"]
+        gs.home = state["home"]
+        gs.bases = sum(BASE_BITS.get(r, 0) for r in state["runners"])
+        gs.current_batter = state.get("current_batter")
+        gs.game_over = state.get("game_over", False)
+        gs.away_index = state.get("away_index", 0)
+        gs.home_index = state.get("home_index", 0)
+        gs.away_lineup = state.get("away_lineup")
+        gs.home_lineup = state.get("home_lineup")
+        return gs
+
+    def to_dict(self) -> dict:
+        """game_engine 상태 dict로 변환"""
+        state = {
+            "inning": self.inning,
+            "half": HALF_NAMES[self.half],
+            "outs": self.outs,
+            "balls": self.balls,
+            "strikes": self.strikes,
+            "home": self.home,
+            "away": self.away,
+            "runners": set(RUNNER_LISTS[self.bases]),
+            "current_batter": self.current_batter,
+            "game_over": self.game_over,
+            "away_index": self.away_index,
+            "home_index": self.home_index,
+        }
+        if self.away_lineup is not None:
+            state["away_lineup"] = self.away_lineup
+        if self.home_lineup is not None:
+            state["home_lineup"] = self.home_lineup
+        return state
+
+def next_batter(gs):
+    if gs.half == AWAY:
+        lineup = gs.away_lineup
+        if lineup:
+            idx = gs.away_index
+            gs.away_index = (idx + 1) % len(lineup)
+            return lineup[idx % len(lineup)]
+    else:
+        lineup = gs.home_lineup
+        if lineup:
+            idx = gs.home_index
+            gs.home_index = (idx + 1) % len(lineup)
+            return lineup[idx % len(lineup)]
+    return "Unknown"
+
+def step(gs, code):
+    """결과 코드 하나 적용 (타자 이름/응답 dict 없이). 게임 종료면 END 정보 tuple, 아니면 None"""
+    if code == STRIKE:
+        gs.strikes += 1
+        if gs.strikes < 3:
+            return _after(gs)
+    elif code == BALL:
+        gs.balls += 1
+        if gs.balls < 4:
+            return _after(gs)
+        code = WALK
+    elif code == WILD_PITCH:
+        gs.balls += 1
+        code = WALK if gs.balls >= 4 else WP_ADVANCE
+    elif code == FOUL:
+        if gs.strikes < 2:
+            gs.strikes += 1
+        return _after(gs)
+
+    new, runs, outs, ends = TABLE[code * 8 + gs.bases]
+    gs.bases = new
+    gs.outs += outs
+    if runs:
+        if gs.half == AWAY:
+            gs.away += runs
+        else:
+            gs.home += runs
+    if ends:
+        gs.balls = 0
+        gs.strikes = 0
+        gs.current_batter = None
+    return _after(gs)
+
+def _after(gs):
+    """3아웃 처리와 경기 종료 검사 (game_engine.apply_ab 끝부분과 같음)"""
+    if gs.outs >= 3:
+        gs.outs = 0
+        gs.balls = 0
+        gs.strikes = 0
+        gs.bases = 0
+        gs.current_batter = None
+        if gs.half == AWAY:
+            gs.half = HOME
+        else:
+            gs.half = AWAY
+            gs.inning += 1
+    if gs.inning >= 9 and gs.half == HOME and gs.home > gs.away:
+        gs.game_over = True
+        return ("HOME", gs.home, gs.away)
+    if gs.inning > 9 and gs.half == AWAY and gs.outs >= 3 and gs.home != gs.away:
+        # advance_half 직후에는 outs가 0이므로 원본 규칙에서도 도달하지 않는 분기
+        gs.game_over = True
+        return ("HOME" if gs.home > gs.away else "AWAY", gs.home, gs.away)
+    return None
+
+def apply_ab(gs, batter: str, result: str):
+    """game_engine.apply_ab와 같은 응답 dict를 돌려주는 표 기반 버전"""
+    if gs.game_over:
+        return {"type": "ERROR", "msg": "게임이 이미 종료되었습니다"}
+
+    result = result.upper()
+    if batter:
+        gs.current_batter = batter
+    elif not gs.current_batter:
+        gs.current_batter = next_batter(gs)
+    batter_name = gs.current_batter
+
+    end = step(gs, CODES.get(result, NOOP))
+    if end:
+        return {"type": "END", "winner": end[0], "home": end[1], "away": end[2], "batter": batter_name, "result": result}
+    return {
+        "type": "ACK",
+        "batter": batter_name,
+        "result": result,
+        "home": gs.home,
+        "away": gs.away,
+        "inning": gs.inning,
+        "half": HALF_NAMES[gs.half]
+    }
+
+def current_state(gs):
+    """game_engine.current_state와 같은 STATE dict"""
+    return {
+        "type": "STATE",
+        "inning": f"{gs.inning}회 {HALF_LABELS[gs.half]}",
+        "outs": gs.outs,
+        "balls": gs.balls,
+        "strikes": gs.strikes,
+        "home": gs.home,
+        "away": gs.away,
+        "runners": list(RUNNER_LISTS[gs.bases]),
+        "current_batter": gs.current_batter,
+        "game_over": gs.game_over
+    }
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+야구 경기 규칙 엔진
+설명: 게임 상태 dict 하나를 받아 타석 결과를 반영하는 함수 모음.
+      서버는 게임(방)마다 상태 dict를 따로 두고 이 함수들에 넘겨 사용한다.
+"""
+
+def init_state():
+    return {
+        "inning": 1,
+        "half": "AWAY",
+        "outs": 0,
+        "balls": 0,
+        "strikes": 0,
+        "home": 0,
+        "away": 0,
+        "runners": set(),
+        "current_batter": None,
+        "game_over": False,
+        "away_index": 0,
+        "home_index": 0,
+    }
+
+def runners_list(state):
+    return [b for b in ["1B", "2B", "3B"] if b in state["runners"]]
+
+def reset_count(state):
+    state["balls"] = 0
+    state["strikes"] = 0
+
+def advance_half(state):
+    state["outs"] = 0
+    reset_count(state)
+    state["runners"].clear()
+    state["current_batter"] = None
+    if state["half"] == "AWAY":
+        state["half"] = "HOME"
+    else:
+        state["half"] = "AWAY"
+        state["inning"] += 1
+
+def score_run(state, n=1):
+    if state["half"] == "AWAY":
+        state["away"] += n
+    else:
+        state["home"] += n
+
+BASE_POS = {"1B": 1, "2B": 2, "3B": 3}
+
+def advance_runners(state, bases):
+    new_runners = set()
+    scored = 0
+    for r in list(state["runners"]):
+        pos = BASE_POS.get(r, 0)
+        if not pos: continue
+        new_pos = pos + bases
+        if new_pos >= 4:
+            scored += 1
+        elif new_pos == 1: new_runners.add("1B")
+        elif new_pos == 2: new_runners.add("2B")
+        elif new_pos == 3: new_runners.add("3B")
+    state["runners"] = new_runners
+    score_run(state, scored)
+    return scored
+
+def walk_batter(state):
+    """4사구(BALL/WILD_PITCH 4개) 처리: 밀어내기 주루 후 타자 1루"""
+    runners = state["runners"]
+    new_runners = set()
+    if "3B" in runners and "2B" in runners and "1B" in runners:
+        score_run(state)
+        new_runners.add("3B")
+        new_runners.add("2B")
+    elif "2B" in runners and "1B" in runners:
+        new_runners.add("3B")
+        new_runners.add("2B")
+    elif "1B" in runners:
+        new_runners.add("2B")
+    if "3B" in runners and "1B" not in runners:
+        new_runners.add("3B")
+    if "2B" in runners and "1B" not in runners:
+        new_runners.add("2B")
+    new_runners.add("1B")
+    state["runners"] = new_runners
+    reset_count(state)
+    state["current_batter"] = None
+
+def check_game_over(state):
+    if state["inning"] >= 9 and state["half"] == "HOME":
+        if state["home"] > state["away"]:
+            state["game_over"] = True
+            return {"type": "END", "winner": "HOME", "home": state["home"], "away": state["away"]}
+    if state["inning"] > 9 and state["half"] == "AWAY" and state["outs"] >= 3:
+        if state["home"] > state["away"]:
+            state["game_over"] = True
+            return {"type": "END", "winner": "HOME", "home": state["home"], "away": state["away"]}
+        elif state["away"] > state["home"]:
+            state["game_over"] = True
+            return {"type": "END", "winner": "AWAY", "home": state["home"], "away": state["away"]}
+    return None
+
+def next_batter(state):
+    if state["half"] == "AWAY":
+        lineup = state.get("away_lineup", [])
+        idx = state.get("away_index", 0)
+        if lineup:
+            batter = lineup[idx % len(lineup)]
+            state["away_index"] = (idx + 1) % len(lineup)
+            return batter
+    else:
+        lineup = state.get("home_lineup", [])
+        idx = state.get("home_index", 0)
+        if lineup:
+            batter = lineup[idx % len(lineup)]
+            state["home_index"] = (idx + 1) % len(lineup)
+            return batter
+    return "Unknown"
+
+def apply_ab(state, batter: str, result: str):
+    """타석 결과 처리"""
+    if state.get("game_over"):
+        return {"type": "ERROR", "msg": "게임이 이미 종료되었습니다"}
+    
+    result = result.upper()
+
+    # 타자 이름 처리
+    if batter:
+        state["current_batter"] = batter
+    elif not state.get("current_batter"):
+        state["current_batter"] = next_batter(state)
+
+    batter_name = state["current_batter"]
+
+    if result == "OUT":
+        state["outs"] += 1
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "STRIKE":
+        state["strikes"] += 1
+        if state["strikes"] >= 3:
+            state["outs"] += 1
+            reset_count(state)
+            state["current_batter"] = None
+
+    elif result == "BALL":
+        state["balls"] += 1
+        if state["balls"] >= 4:
+            walk_batter(state)
+
+    elif result == "FOUL":
+        if state["strikes"] < 2:
+            state["strikes"] += 1
+
+    elif result == "1B":
+        advance_runners(state, 1)
+        state["runners"].add("1B")
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "2B":
+        advance_runners(state, 2)
+        state["runners"].add("2B")
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "3B":
+        advance_runners(state, 3)
+        state["runners"].add("3B")
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "HR":
+        score_run(state, 1 + len(state["runners"]))
+        state["runners"].clear()
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "SAC_FLY":
+        state["outs"] += 1
+        if "3B" in state["runners"]:
+            score_run(state)
+            state["runners"].discard("3B")
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "SAC_BUNT":
+        state["outs"] += 1
+        advance_runners(state, 1)
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "ERROR":
+        advance_runners(state, 1)
+        state["runners"].add("1B")
+        reset_count(state)
+        state["current_batter"] = None
+
+    elif result == "STEAL":
+        if "1B" in state["runners"] and "2B" not in state["runners"]:
+            state["runners"].discard("1B")
+            state["runners"].add("2B")
+        elif "2B" in state["runners"] and "3B" not in state["runners"]:
+            state["runners"].discard("2B")
+            state["runners"].add("3B")
+
+    elif result == "CAUGHT_STEALING":
+        state["outs"] += 1
+        if "1B" in state["runners"]:
+            state["runners"].discard("1B")
+        elif "2B" in state["runners"]:
+            state["runners"].discard("2B")
+
+    elif result == "WILD_PITCH":
+        state["balls"] += 1
+        if state["balls"] >= 4:
+            walk_batter(state)
+        else:
+            advance_runners(state, 1)
+
+    elif result == "BALK":
+        advance_runners(state, 1)
+
+    # 3아웃 체크
+    if state["outs"] >= 3:
+        advance_half(state)
+    
+    # 게임 종료 체크
+    game_end = check_game_over(state)
+    if game_end:
+        # 경기를 끝낸 타석도 기록에 넣을 수 있도록 타자와 결과를 함께 보냄
+        return {**game_end, "batter": batter_name, "result": result}
+
+    return {
+        "type": "ACK",
+        "batter": batter_name,
+        "result": result,
+        "home": state["home"],
+        "away": state["away"],
+        "inning": state["inning"],
+        "half": state["half"]
+    }
+
+def current_state(state):
+    """현재 게임 상태 반환"""
+    half_str = "초" if state["half"] == "AWAY" else "말"
+    return {
+        "type": "STATE",
+        "inning": f"{state['inning']}회 {half_str}",
+        "outs": state["outs"],
+        "balls": state["balls"],
+        "strikes": state["strikes"],
+        "home": state["home"],
+        "away": state["away"],
+        "runners": runners_list(state),
+        "current_batter": state.get("current_batter"),
+        "game_over": state.get("game_over", False)
+    }
+
+# 상태를 바꾸는 입력 명령 (이벤트 스트림에 기록되는 것들)
+COMMANDS = ("AB", "RESET", "SET_RUNNERS", "SET_LINEUP", "BATCH")
+BATCH_COMMANDS = ("AB", "SET_RUNNERS")  # BATCH에 담을 수 있는 명령
+MAX_BATCH = 1000                         # BATCH 하나에 담을 수 있는 명령 수
+
+def command_event(evt: dict):
+    """수신한 메시지에서 이벤트 스트림에 남길 입력 명령만 추림 (상태 변경 명령이 아니면 None)"""
+    t = str(evt.get("type", "")).upper()
+    if t == "AB":
+        return {"type": "AB", "batter": evt.get("batter", ""), "result": evt.get("result", "")}
+    if t == "RESET":
+        return {"type": "RESET"}
+    if t == "SET_RUNNERS":
+        runners = evt.get("runners", [])
+        return {"type": "SET_RUNNERS", "runners": list(runners) if isinstance(runners, (list, tuple)) else runners}
+    if t == "SET_LINEUP":
+        return {"type": "SET_LINEUP", "away_lineup": evt.get("away_lineup", []), "home_lineup": evt.get("home_lineup", [])}
+    if t == "BATCH":
+        events = evt.get("events")
+        if isinstance(events, list):
+            events = [command_event(e) if isinstance(e, dict) else None for e in events]
+        return {"type": "BATCH", "events": events}
+    return None
+
+def command_error(event: dict):
+    """상태에 반영하기 전에 거를 잘못된 입력 명령이면 오류 메시지, 아니면 None"""
+    t = event["type"]
+    if t == "AB":
+        # 방에 반영하기 전에 걸러야 상태와 이벤트 스트림이 어긋나지 않는다 (--recover)
+        if not isinstance(event["batter"], str):
+            return "Bad batter"
+        if not isinstance(event["result"], str):
+            return "Bad result"
+    elif t == "SET_RUNNERS":
+        runners = event["runners"]
+        if not isinstance(runners, list) or not all(isinstance(r, str) and r in BASE_POS for r in runners):
+            return "Bad runners"
+    elif t == "SET_LINEUP":
+        for lineup in (event["away_lineup"], event["home_lineup"]):
+            if not isinstance(lineup, list) or not all(isinstance(b, str) for b in lineup):
+                return "Bad lineup"
+    elif t == "BATCH":
+        events = event["events"]
+        if not isinstance(events, list) or not events:
+            return "Bad batch"
+        if len(events) > MAX_BATCH:
+            return "Batch too large"
+        for e in events:
+            if e is None or e["type"] not in BATCH_COMMANDS:
+                return "Bad batch command"
+            error = command_error(e)
+            if error:
+                return error
+    return None
+
+def batch_error(state, events):
+    """BATCH를 상태 사본에 미리 적용해 보고, 중간에 ERROR가 나면 (위치, 메시지) (없으면 None)
+
+    BATCH는 전부 반영하거나 하나도 반영하지 않는다 (경기가 끝난 뒤의 AB가 섞여 있으면 통째로 거절).
+    """
+    trial = load_state(dump_state(state))
+    for i, event in enumerate(events):
+        trial, res = reduce_event(trial, event)
+        if res is not None and res["type"] == "ERROR":
+            return i, res["msg"]
+    return None
+
+def reduce_event(state, event: dict):
+    """입력 명령 하나를 상태에 반영 -> (새 상태, 응답)
+
+    시계나 파일 같은 외부 값에 의존하지 않으므로
+    같은 이벤트 스트림을 다시 적용하면 항상 같은 상태가 된다.
+    RESET은 새 상태 dict를 돌려주므로 반환된 상태를 써야 한다.
+    """
+    t = event["type"]
+    if t == "AB":
+        return state, apply_ab(state, event.get("batter", ""), event.get("result", ""))
+    if t == "RESET":
+        return init_state(), {"type": "ACK", "msg": "RESET"}
+    if t == "SET_RUNNERS":
+        state["runners"] = set(event.get("runners", []))
+        return state, None
+    if t == "SET_LINEUP":
+        state["away_lineup"] = event.get("away_lineup", [])
+        state["home_lineup"] = event.get("home_lineup", [])
+        return state, {
+            "type": "ACK",
+            "msg": "LINEUP_SET",
+            "away_lineup": state["away_lineup"],
+            "home_lineup": state["home_lineup"]
+        }
+    if t == "BATCH":
+        results = []
+        for e in event["events"]:
+            state, res = reduce_event(state, e)
+            if res is not None:
+                results.append(res)
+        return state, {"type": "ACK", "msg": "BATCH", "results": results}
+    raise ValueError(f"알 수 없는 명령: {t}")
+
+def dump_state(state) -> dict:
+    """스냅샷용 JSON 호환 dict (runners set -> list)"""
+    return {**state, "runners": runners_list(state)}
+
+def load_state(data: dict):
+    state = init_state()
+    state.update(data)
+    state["runners"] = set(data.get("runners", []))
+    return state
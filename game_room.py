@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+게임 방(GameRoom)과 방 레지스트리
+설명: 한 프로세스에서 여러 경기를 동시에 기록하기 위해
+      경기마다 상태, 구독자 집합, 잠금을 따로 둔다.
+"""
+
+import asyncio
+import itertools
+import re
+import time
+from collections import OrderedDict, deque
+
+import codec
+import fanout
+import hibernate
+import metrics
+from batting import StatIndex
+from game_engine import current_state, dump_state, init_state, load_state, reduce_event
+
+DEFAULT_GAME = "default"
+COMMAND_QUEUE_SIZE = 1024  # 방마다 처리 대기 가능한 입력 명령 수 (가득 차면 보내는 쪽이 기다림)
+REPLAY_SIZE = 256          # 방마다 재접속용으로 보관할 최근 DELTA 수
+REQUEST_CACHE = 4096       # 방마다 재시도 중복 제거용으로 기억할 최근 요청 ID 수
+REPLAY_ID = re.compile(r"replay\d*-")  # 재방송 방 게임 ID 앞부분 (server_websocket.replay, log_replay.replay_log)
+
+# 모든 방을 합친 지표 (published: STATE를 내보낸 횟수, HTTP 전체 요약의 버전으로도 씀)
+stats = {"published": 0}
+
+def game_id_from_path(path: str) -> str:
+    """접속 경로에서 게임 ID 추출 ("/", "/<id>", "/games/<id>")"""
+    path = (path or "/").split("?", 1)[0].strip("/")
+    if path.startswith("games/"):
+        path = path[len("games/"):]
+    return path or DEFAULT_GAME
+
+def is_replay_id(game_id: str) -> bool:
+    """재방송 방 ID인지 (관중이 재방송 시작 전에 먼저 들어와 만든 방도 처음부터 읽기 전용으로)"""
+    return REPLAY_ID.match(game_id) is not None
+
+def state_changes(prev: dict, snapshot: dict) -> dict:
+    """두 STATE 사이에 값이 바뀐 필드만"""
+    return {k: v for k, v in snapshot.items() if prev.get(k) != v}
+
+class GameRoom:
+    """경기 한 개의 상태와 구독자"""
+
+    def __init__(self, game_id: str, wp_table=None, relay=None):
+        self.game_id = game_id
+        self.wp_table = wp_table  # wp_table.WinProbTable (없으면 승리 확률을 붙이지 않음)
+        # 샤드 모드: relay(shard.Bus)가 다른 워커의 관중에게 STATE/브로드캐스트를 전달한다.
+        # owned=False인 방은 다른 워커가 가진 게임의 사본으로, 상태는 mirror_state()로만 바뀐다
+        self.relay = relay
+        self.owned = True
+        self.read_only = is_replay_id(game_id)  # 지난 경기 재방송(log_replay.py) 방: 입력 명령을 받지 않음
+        self.state = init_state()
+        self.stats = StatIndex()  # 타자별/팀별 누적 기록 (STATS 명령)
+        self.clients = set()  # fanout.Subscriber
+        # 상태를 바꾸는 명령은 방마다 하나뿐인 처리 태스크(writer)가 큐에서 꺼내 차례로 실행한다.
+        # 방마다 따로 두어 바쁜 경기가 다른 경기를 막지 않게 한다
+        self.commands = asyncio.Queue(COMMAND_QUEUE_SIZE)
+        self.writer = None
+        # 마지막으로 내보낸 STATE와 그 순번 (게임마다 단조 증가, RESET에도 유지)
+        self.seq = 0
+        self.last_snapshot = self.state_payload()
+        self._frames = {}            # 마지막 STATE(와 REPLAY)의 인코딩 결과 {(순번 포함 여부, 코덱): bytes}
+        self.state_encodes = 0       # 실제로 인코딩한 횟수 (나머지는 캐시 재사용)
+        # 최근 DELTA (순번이 끊김 없이 이어지는 것만, 재접속한 관중이 놓친 것만 받도록)
+        self.replay = deque(maxlen=REPLAY_SIZE)
+        # 최근 요청 ID -> 그때 보낸 응답 (기록원이 재접속 후 다시 보낸 명령을 두 번 실행하지 않도록, 메모리에만 둠)
+        self.requests = OrderedDict()
+        self.pending = 0                    # 큐에 있거나 처리 중인 명령 수
+        self.touched = time.monotonic()     # 마지막으로 쓰인 시각 (휴면 판단용)
+
+    def state_payload(self):
+        """현재 STATE (WP 표가 있으면 승리 확률/기대 득점 포함)"""
+        snapshot = current_state(self.state)
+        if self.wp_table is not None:
+            self.wp_table.enrich(snapshot, self.state)
+        return snapshot
+
+    def refresh(self):
+        """상태를 직접 바꾼 뒤(복구 등) 마지막 STATE를 다시 계산"""
+        self.last_snapshot = self.state_payload()
+        self._frames = {}
+        self.replay.clear()
+
+    def apply(self, event: dict):
+        """입력 명령 하나를 이 게임 상태에 반영하고 응답 반환 (타석 결과는 누적 기록에도 반영)"""
+        if event["type"] == "BATCH":
+            results = [res for res in map(self.apply, event["events"]) if res is not None]
+            return {"type": "ACK", "msg": "BATCH", "results": results}
+        half = self.state["half"]
+        self.state, res = reduce_event(self.state, event)
+        if res is not None and res["type"] in ("ACK", "END") and "result" in res:
+            self.stats.record(half, res["batter"], res["result"], self.state["balls"], self.state["strikes"])
+        return res
+
+    def dump(self) -> dict:
+        """스냅샷용 직렬화"""
+        return {"state": dump_state(self.state), "seq": self.seq, "stats": self.stats.dump()}
+
+    def restore(self, data: dict):
+        self.state = load_state(data["state"])
+        self.seq = data.get("seq", 0)
+        self.stats.load(data.get("stats", {}))
+        self.refresh()
+
+    def snapshot(self, delta=False):
+        """마지막으로 내보낸 STATE (DELTA 구독자에게는 순번 포함)"""
+        if delta:
+            return {**self.last_snapshot, "seq": self.seq}
+        return self.last_snapshot
+
+    def replay_since(self, seq):
+        """seq 다음부터 지금까지의 DELTA 목록. 버퍼에 없을 만큼 오래됐거나 순번이 맞지 않으면 None"""
+        if seq == self.seq:
+            return []
+        if not self.replay or not self.replay[0]["seq"] <= seq + 1 <= self.seq:
+            return None
+        return list(itertools.islice(self.replay, seq + 1 - self.replay[0]["seq"], None))
+
+    def replay_frame(self, seq, using=codec.JSON):
+        """seq 이후 놓친 DELTA를 묶은 REPLAY 프레임 (놓친 것이 없으면 b"", 버퍼에 없으면 None)
+
+        재접속 폭주 때는 같은 순번에서 끊긴 관중이 많으므로 STATE 프레임처럼 캐시한다.
+        """
+        key = ("replay", seq, using)
+        frame = self._frames.get(key)
+        if frame is None:
+            missed = self.replay_since(seq)
+            if missed is None:
+                return None
+            frame = self._frames[key] = using.encode({"type": "REPLAY", "seq": self.seq, "events": missed}) \
+                if missed else b""
+        return frame
+
+    def snapshot_frame(self, delta=False, using=codec.JSON) -> bytes:
+        """마지막 STATE를 인코딩한 프레임 (순번마다, 코덱마다 한 번만 인코딩)
+
+        캐시는 상태를 바꾸는 명령(publish_state)이나 복구(refresh) 때만 비운다.
+        last_snapshot은 새 dict로만 바뀌고 bytes는 불변이므로
+        접속 시 STATE, SCORE 응답, STATE 브로드캐스트가 모두 같은 bytes를 보내고
+        읽기 요청은 처리 태스크를 기다리지 않는다.
+        """
+        frame = self._frames.get((delta, using))
+        if frame is None:
+            frame = self._frames[delta, using] = using.encode(self.snapshot(delta))
+            self.state_encodes += 1
+        return frame
+
+    async def submit(self, process, client, event):
+        """입력 명령을 처리 큐에 넣음 (큐가 가득 차면 기다림)
+
+        process(room, client, event)는 이 방의 처리 태스크 안에서 한 번에 하나씩 실행되므로
+        명령 처리 도중에 다른 명령이 상태를 바꿀 수 없다. 처리 태스크는 첫 명령이 올 때 시작한다.
+        """
+        self.pending += 1
+        if self.writer is None:
+            self.writer = asyncio.create_task(self._drain(process))
+        await self.commands.put((client, event, time.perf_counter()))
+
+    async def _drain(self, process):
+        while True:
+            client, event, queued = await self.commands.get()
+            try:
+                await process(self, client, event)
+            except Exception as e:
+                print(f"[ERROR] {self.game_id} {event.get('type')}: {e}")
+                client.send({"type": "ERROR", "msg": "Command failed"})
+            finally:
+                self.commands.task_done()
+                self.pending -= 1
+                self.touched = time.monotonic()
+                # 지연 = 큐 대기 + 처리 (로그 기록 예약과 브로드캐스트 포함)
+                metrics.observe_command(event["type"], time.perf_counter() - queued)
+
+    async def stop(self):
+        """큐에 남은 명령을 모두 처리한 뒤 처리 태스크 종료"""
+        if self.writer is not None:
+            await self.commands.join()
+            self.writer.cancel()
+            self.writer = None
+
+    def evictable(self) -> bool:
+        """메모리에서 내려도 되는지 (관중/명령이 없고, 재방송 방이 아님. 사본 방은 휴면 대신 구독 해지)"""
+        return not self.clients and not self.pending and not self.read_only
+
+    def disposable(self) -> bool:
+        """저장하지 않고 버려도 되는지 (관중/명령이 없는 재방송 방이나 사본 방. 휴면과 상관없이 expire()가 지움)"""
+        return not self.clients and not self.pending and (self.read_only or not self.owned)
+
+    def leave(self, client):
+        """관중 하나가 나감 (사본 방의 마지막 관중이면 주인 워커에게 구독 해지)"""
+        self.clients.discard(client)
+        if not self.clients and not self.owned and self.relay is not None:
+            self.relay.unwatch(self.game_id)
+
+    def idle_for(self, now) -> float:
+        """쉰 시간 (관중이나 처리 중인 명령이 있으면 now를 마지막 사용 시각으로 삼고 0)
+
+        관중이 나간 시각은 따로 기록하지 않으므로 부르는 간격만큼 늦게 잡힐 수 있다.
+        """
+        if self.clients or self.pending:
+            self.touched = now
+            return 0.0
+        return now - self.touched
+
+    def remember(self, request_id, response):
+        """실행한 요청의 응답을 기억 (오래된 것부터 버림)"""
+        self.requests[request_id] = response
+        if len(self.requests) > REQUEST_CACHE:
+            self.requests.popitem(last=False)
+
+    def stats_message(self, batter=None, team=None) -> dict:
+        """STATS 응답 (로그를 다시 읽지 않고 누적 기록에서 바로 만듦)"""
+        return {"type": "STATS", "game": self.game_id, **self.stats.query(batter, team)}
+
+    def publish_state(self):
+        """상태 변경 후 호출: 순번을 올리고 전체 STATE/DELTA를 각 구독자에게 예약"""
+        return self.publish_snapshot(self.state_payload())
+
+    def publish_snapshot(self, snapshot: dict):
+        """STATE 하나를 다음 순번으로 내보냄 (샤드 모드면 사본 워커들에게도)
+
+        재방송 방처럼 상태를 직접 계산하지 않고 이미 만들어진 STATE를 내보낼 때도 쓴다.
+        """
+        self.seq += 1
+        self._publish(snapshot)
+        if self.relay is not None:
+            self.relay.publish(self, snapshot)
+        return snapshot
+
+    def mirror_state(self, snapshot: dict, seq: int):
+        """다른 워커가 보낸 STATE를 이 워커의 구독자에게 전달 (샤드 모드의 사본 방)"""
+        contiguous = seq == self.seq + 1
+        self.seq = seq
+        self._publish(snapshot, contiguous)
+
+    def _publish(self, snapshot, contiguous=True):
+        changes = state_changes(self.last_snapshot, snapshot)
+        delta = {"type": "DELTA", "seq": self.seq, "changes": changes}
+        if not contiguous:
+            # 사본 방이 처음 받은 STATE처럼 앞 순번과 이어지지 않으면 이 변경분은 재접속에 쓸 수 없다
+            self.replay.clear()
+        else:
+            self.replay.append(delta)
+        self.last_snapshot = snapshot
+        self._frames = {}
+        stats["published"] += 1
+        start = time.perf_counter()
+        full, deltas = [], []
+        for client in self.clients:
+            (deltas if client.delta else full).append(client)
+        if full:
+            fanout.broadcast(full, snapshot, "STATE", lambda using: self.snapshot_frame(False, using))
+        if deltas:
+            fanout.broadcast(deltas, delta, "DELTA")
+        metrics.observe_fanout(time.perf_counter() - start)
+
+    def broadcast(self, message, kind=None):
+        """이 방의 모든 구독자에게 메시지 예약 (한 번만 인코딩, 전송은 기다리지 않음)"""
+        if self.relay is not None and self.owned:
+            self.relay.broadcast(self, message)
+        start = time.perf_counter()
+        frames = fanout.broadcast(self.clients, message, kind)
+        metrics.observe_fanout(time.perf_counter() - start)
+        return frames
+
+    def metrics(self):
+        return {**fanout.queue_metrics(self.clients), "seq": self.seq, "state_encodes": self.state_encodes}
+
+class RoomRegistry:
+    """게임 ID -> GameRoom (hibernate()를 부르면 쉬는 방을 디스크로 내리고 필요할 때 되살림)"""
+
+    def __init__(self, wp_table=None, relay=None):
+        self.rooms = OrderedDict()  # 오래 쓰지 않은 방부터 (get()/find()마다 맨 뒤로)
+        self.wp_table = wp_table
+        self.relay = relay
+        self.cold = None            # hibernate.ColdStore
+        self.idle_seconds = None
+        self.max_resident = None
+        self.generation = 0         # 메모리의 방 집합이 바뀔 때마다 (만들기/되살리기/내리기/지우기) 1 증가
+
+    def hibernate(self, cold, idle_seconds=hibernate.IDLE_SECONDS, max_resident=hibernate.MAX_RESIDENT):
+        """쉬는 방 휴면 시작 (idle_seconds: sweep()이 내릴 쉰 시간, max_resident: 메모리에 둘 최대 방 수)"""
+        self.cold = cold
+        self.idle_seconds = idle_seconds
+        self.max_resident = max_resident
+        self.trim()
+
+    def get(self, game_id: str) -> GameRoom:
+        room = self.rooms.get(game_id)
+        if room is None:
+            room = self.rooms[game_id] = self.thaw(game_id) or GameRoom(game_id, self.wp_table, self.relay)
+            self.generation += 1
+            self.trim(keep=room)
+        else:
+            self.rooms.move_to_end(game_id)
+        room.touched = time.monotonic()
+        return room
+
+    def find(self, game_id: str):
+        """이미 있는 방만 (휴면 중이면 되살림, 없으면 None, 만들지 않음)"""
+        if game_id in self.rooms or (self.cold is not None and game_id in self.cold):
+            return self.get(game_id)
+        return None
+
+    def thaw(self, game_id):
+        """휴면 게임을 방으로 되살림 (휴면 중이 아니면 None)"""
+        if self.cold is None or game_id not in self.cold:
+            return None
+        start = time.perf_counter()
+        room = GameRoom(game_id, self.wp_table, self.relay)
+        room.restore(self.cold.take(game_id))
+        hibernate.stats["restored"] += 1
+        hibernate.stats["restore_seconds"] += time.perf_counter() - start
+        return room
+
+    def drop(self, room):
+        """방을 저장하지 않고 메모리에서 지움 (사본 방이면 구독 해지)"""
+        del self.rooms[room.game_id]
+        self.generation += 1
+        if room.writer is not None:
+            room.writer.cancel()
+            room.writer = None
+        if not room.owned and self.relay is not None:
+            # 상태는 주인 워커에 있으므로 저장하지 않는다 (다시 관중이 오면 새로 구독)
+            self.relay.unwatch(room.game_id)
+
+    def evict(self, room):
+        """방을 휴면 파일로 내리고 메모리에서 지움 (evictable()인 방만, 사본 방은 버리고 구독 해지)"""
+        self.drop(room)
+        if room.owned:
+            self.cold.put(room.game_id, room.dump())
+            hibernate.stats["evicted"] += 1
+
+    def trim(self, keep=None):
+        """메모리의 방이 max_resident개를 넘으면 오래 쓰지 않은 방부터 내림 (방금 쓴 keep은 남김)"""
+        if self.max_resident is None or len(self.rooms) <= self.max_resident:
+            return
+        for room in list(self.rooms.values()):
+            if room is not keep and room.evictable():
+                self.evict(room)
+                if len(self.rooms) <= self.max_resident:
+                    return
+
+    def sweep(self, now) -> int:
+        """idle_seconds 넘게 쉰 방을 모두 내림 -> 내린 방 수"""
+        if self.cold is None:
+            return 0
+        idle = [room for room in self.rooms.values() if room.idle_for(now) >= self.idle_seconds and room.evictable()]
+        for room in idle:
+            self.evict(room)
+        return len(idle)
+
+    def expire(self, now, ttl) -> int:
+        """ttl초 넘게 관중 없이 쉰 재방송 방/사본 방을 메모리에서 지움 (휴면을 꺼도 동작) -> 지운 방 수
+
+        재방송 중인 방은 줄마다 get()으로 쓰이므로 끝난 뒤에야 지워진다.
+        """
+        idle = [room for room in self.rooms.values() if room.idle_for(now) >= ttl and room.disposable()]
+        for room in idle:
+            self.drop(room)
+        return len(idle)
+
+    def dump_games(self) -> dict:
+        """스냅샷용: 메모리에 있고 이 프로세스가 주인인 게임의 dump() (재방송 방 제외, 휴면 게임은 cold.view())"""
+        return {room.game_id: room.dump() for room in self if room.owned and not room.read_only}
+
+    def __len__(self):
+        """메모리에 있는 방 수 (휴면 게임은 len(self.cold))"""
+        return len(self.rooms)
+
+    def __iter__(self):
+        return iter(self.rooms.values())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+쉬는 게임 휴면 (메모리에서 내려 디스크에 두고 필요할 때 다시 올림)
+사용법: python server_websocket.py [--idle-after 600] [--max-resident 10000]
+설명: 관중도, 처리 중인 명령도 없이 --idle-after초 지난 게임은 GameRoom.dump()를 압축해
+      휴면 파일(<이벤트 디렉터리>/cold.bin) 끝에 이어 쓰고 방을 메모리에서 지운다.
+      메모리에 남는 것은 게임 ID -> 파일 위치(정수 하나) 색인뿐이다.
+      메모리에 있는 방이 --max-resident개를 넘으면 가장 오래 쓰지 않은 방부터 (쉬는 시간과 상관없이) 내린다.
+      내린 게임은 다음 접속/JOIN, AB 등 명령, SCORE(HTTP 점수판 포함) 때 RoomRegistry.get()/find()가
+      파일에서 읽어 그대로 되살린다 (순번, 누적 기록, 라인업 유지).
+      재접속용 최근 DELTA와 요청 ID 기억은 되살리지 않는다 (되살린 방의 재접속 관중은 전체 STATE를 받는다).
+      재방송 방과 (샤드 모드의) 사본 방은 휴면 파일에 쓰지 않고, 관중 없이 --room-ttl초 지나면
+      휴면을 꺼도(--no-hibernate) 메모리에서 지운다.
+      휴면 파일은 캐시일 뿐이며 내구성은 그대로 이벤트 스트림과 스냅샷이 맡는다
+      (스냅샷에는 휴면 게임도 들어가고, 서버를 다시 띄우면 휴면 파일은 새로 만든다).
+
+휴면 레코드: zlib(JSON(GameRoom.dump()))
+"""
+
+import asyncio
+import json
+import os
+import time
+import zlib
+
+IDLE_SECONDS = 600.0    # 이만큼 쉰 게임을 내림 (초)
+MAX_RESIDENT = 10000    # 메모리에 둘 최대 방 수
+SWEEP_INTERVAL = 5.0    # 쉬는 게임을 찾는 간격 (초)
+ROOM_TTL = 600.0        # 관중 없이 이만큼 쉰 재방송 방/사본 방을 지움 (초, 휴면을 꺼도)
+COLD_FILE = "cold.bin"
+COMPACT_MIN = 1 << 20   # 죽은 레코드가 이보다 크고 산 레코드보다 많으면 파일을 다시 씀 (bytes)
+LENGTH_BITS = 24        # 색인 정수 = 오프셋 << 24 | 길이
+
+# 휴면 지표
+stats = {
+    "evicted": 0,           # 내린 횟수
+    "restored": 0,          # 되살린 횟수
+    "restore_seconds": 0.0, # 되살리는 데 걸린 시간 합 (파일 읽기 + 압축 해제 + 방 만들기)
+    "compactions": 0,       # 휴면 파일을 다시 쓴 횟수
+}
+
+class ColdStore:
+    """휴면 게임 레코드를 한 파일에 이어 쓰는 저장소 (게임 ID -> 위치 색인은 메모리에)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}     # 게임 ID -> 오프셋 << LENGTH_BITS | 길이
+        self.size = 0       # 파일 크기
+        self.dead = 0       # 되살려서 더 이상 쓰지 않는 레코드 바이트
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "w+b")
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, game_id):
+        return game_id in self.index
+
+    def put(self, game_id, data: dict):
+        record = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        if game_id in self.index:
+            self.dead += self.index[game_id] & ((1 << LENGTH_BITS) - 1)
+        self.index[game_id] = self.size << LENGTH_BITS | len(record)
+        os.pwrite(self.file.fileno(), record, self.size)
+        self.size += len(record)
+
+    def read(self, game_id):
+        """-> GameRoom.dump() (없으면 None), 레코드는 그대로 둠"""
+        entry = self.index.get(game_id)
+        if entry is None:
+            return None
+        length = entry & ((1 << LENGTH_BITS) - 1)
+        return json.loads(zlib.decompress(os.pread(self.file.fileno(), length, entry >> LENGTH_BITS)))
+
+    def take(self, game_id):
+        """-> GameRoom.dump() (없으면 None), 레코드는 지움"""
+        data = self.read(game_id)
+        if data is not None:
+            self.dead += self.index.pop(game_id) & ((1 << LENGTH_BITS) - 1)
+            if self.dead > COMPACT_MIN and self.dead > self.size - self.dead:
+                self.compact()
+        return data
+
+    def view(self):
+        """지금 휴면 중인 게임들을 다른 스레드에서 읽을 수 있는 사본 (ColdView)"""
+        return ColdView(os.dup(self.file.fileno()), dict(self.index))
+
+    def compact(self):
+        """산 레코드만 새 파일에 옮겨 씀"""
+        tmp = self.path + ".tmp"
+        index, offset = {}, 0
+        with open(tmp, "wb") as out:
+            for game_id, entry in self.index.items():
+                length = entry & ((1 << LENGTH_BITS) - 1)
+                out.write(os.pread(self.file.fileno(), length, entry >> LENGTH_BITS))
+                index[game_id] = offset << LENGTH_BITS | length
+                offset += length
+        os.replace(tmp, self.path)
+        self.file.close()
+        self.file = open(self.path, "r+b")
+        self.index, self.size, self.dead = index, offset, 0
+        stats["compactions"] += 1
+
+    def close(self):
+        self.file.close()
+
+class ColdView:
+    """ColdStore의 한 시점 사본: 색인 복사본 + 파일 디스크립터 복제본
+
+    그 뒤에 레코드를 더 쓰거나 되살리거나 파일을 다시 써도(compact) 복제한 디스크립터는
+    옛 파일을 가리키므로 스냅샷 스레드가 이벤트 루프를 막지 않고 읽을 수 있다.
+    """
+
+    def __init__(self, fd, index):
+        self.fd = fd
+        self.index = index
+
+    def items(self):
+        """(게임 ID, GameRoom.dump()) 전부"""
+        for game_id, entry in self.index.items():
+            record = os.pread(self.fd, entry & ((1 << LENGTH_BITS) - 1), entry >> LENGTH_BITS)
+            yield game_id, json.loads(zlib.decompress(record))
+
+    def close(self):
+        os.close(self.fd)
+
+def summary(rooms):
+    """지표 + 휴면 게임 수와 평균 되살리기 시간"""
+    cold = rooms.cold
+    return {
+        **stats,
+        "restore_seconds": round(stats["restore_seconds"], 6),
+        "restore_ms_avg": round(stats["restore_seconds"] / stats["restored"] * 1e3, 3) if stats["restored"] else None,
+        "resident": len(rooms),
+        "cold": len(cold) if cold is not None else 0,
+        "cold_bytes": cold.size - cold.dead if cold is not None else 0,
+    }
+
+async def sweep_loop(rooms, interval=SWEEP_INTERVAL, ttl=ROOM_TTL):
+    """interval마다 쉬는 게임 내리기 + 관중 없는 재방송/사본 방 지우기 (한 번 실패해도 다음 간격에 다시 시도)
+
+    휴면을 꺼도(rooms.cold가 None) 돌린다: 그때는 재방송/사본 방만 지운다.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        try:
+            evicted = rooms.sweep(now)
+            expired = rooms.expire(now, ttl)
+        except Exception as e:
+            print(f"[HIBERNATE] 휴면 실패: {type(e).__name__}: {e}")
+            continue
+        if evicted:
+            print(f"[HIBERNATE] 게임 {evicted}개 휴면 (메모리 {len(rooms)}개, 휴면 {len(rooms.cold)}개)")
+        if expired:
+            print(f"[HIBERNATE] 관중 없는 재방송/사본 방 {expired}개 지움 (메모리 {len(rooms)}개)")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버 프로세스 안의 작은 HTTP 엔드포인트 (GET만, keep-alive 지원)
+설명: 지표/관리/점수판 요청을 WebSocket 세션 없이 받는다. 외부 웹 프레임워크를 쓰지 않고
+      asyncio.start_server 위에서 요청 줄과 헤더만 읽는다.
+      routes는 {경로: 함수(Request) -> 응답}. "/"로 끝나는 경로는 그 아래 전체(Request.rest = 나머지).
+      응답은 (상태 코드, Content-Type, 본문[, 추가 헤더 dict]) 또는 미리 만들어 둔 응답 bytes(response()).
+      본문이 async 함수(reader, writer)면 헤더만 보내고 연결을 넘긴다 (SSE처럼 끝없는 응답, 끝나면 연결을 닫음).
+"""
+
+import asyncio
+from collections import namedtuple
+from urllib.parse import parse_qs, urlsplit
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 503: "Service Unavailable"}
+MAX_HEADER_LINES = 100
+
+Request = namedtuple("Request", "path rest query headers")
+
+def response(status, content_type, body, headers=None) -> bytes:
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+    for name, value in (headers or {}).items():
+        head += f"{name}: {value}\r\n"
+    head += f"Content-Length: {len(body)}\r\n\r\n"
+    return head.encode("ascii") + body
+
+def stream_head(content_type, headers=None) -> bytes:
+    """길이를 모르는 응답의 헤더 (본문은 연결이 끝날 때까지)"""
+    head = f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+    for name, value in (headers or {}).items():
+        head += f"{name}: {value}\r\n"
+    return (head + "Connection: close\r\n\r\n").encode("ascii")
+
+def find_route(routes, path):
+    """정확한 경로, 없으면 가장 긴 "/"로 끝나는 경로 -> (함수, 나머지)"""
+    route = routes.get(path)
+    if route is not None:
+        return route, ""
+    best = None
+    for prefix in routes:
+        if prefix.endswith("/") and path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return (routes[best], path[len(best):]) if best is not None else (None, "")
+
+async def read_request(reader):
+    """요청 줄과 헤더 -> (메서드, 경로, 헤더 dict), 연결이 끝났으면 None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("잘못된 요청 줄")
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return parts[0], parts[1], headers
+
+async def serve(host, port, routes, reuse_port=False):
+    """HTTP 서버 시작 (asyncio.Server를 돌려줌)"""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except ValueError:
+                    writer.write(response(400, "text/plain", "bad request\n"))
+                    break
+                if request is None:
+                    break
+                method, target, headers = request
+                url = urlsplit(target)
+                route, rest = find_route(routes, url.path)
+                if method != "GET":
+                    writer.write(response(405, "text/plain", "GET only\n"))
+                elif route is None:
+                    writer.write(response(404, "text/plain", "not found\n"))
+                else:
+                    query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    result = route(Request(url.path, rest, query, headers))
+                    if isinstance(result, bytes):
+                        writer.write(result)
+                    elif callable(result[2]):
+                        writer.write(stream_head(result[1], result[3] if len(result) > 3 else None))
+                        await writer.drain()
+                        await result[2](reader, writer)
+                        break
+                    else:
+                        writer.write(response(*result))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port, reuse_port=reuse_port or None)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 서버 부하 발생기 (화면/입력 없음)
+사용법: python loadgen.py [--games 10] [--viewers 2000] [--duration 10] [--rate 0]
+                          [--source game_log_websocket.jsonl] [--uri ws://host:port] [--json result.json]
+설명: 게임마다 기록원 접속 하나와 관중 접속 여러 개(DELTA 프로토콜)를 열고, 기록원이 실제 로그에서 뽑은
+      (또는 무작위로 만든) 타석 결과를 보내는 동안 다음을 잰다.
+        - AB 지연: 기록원이 AB를 보낸 뒤 자기 ACK를 받기까지
+        - 브로드캐스트 지연: 기록원이 AB를 보낸 뒤 관중이 그 순번의 DELTA를 받기까지
+        - 처리량: 초당 AB 수, 초당 관중에게 전달된 프레임 수
+        - 접속당 메모리: 서버 프로세스 RSS 증가분 / 접속 수 (서버를 직접 띄웠거나 --server-pid를 준 경우)
+        - 이벤트 루프 지연: 부하 발생기 자신의 루프 (값이 크면 측정값보다 발생기가 먼저 한계라는 뜻)
+      --uri를 생략하면 임시 로그 디렉터리로 서버(--workers를 주면 shard.py)를 띄운다.
+      결과는 사람이 읽는 요약과 함께 --json 파일에 기계가 읽을 수 있는 형식으로 저장한다
+      ("-"이면 요약 대신 JSON만 표준 출력으로). 릴리스 사이 성능 비교용.
+      서버와 발생기가 같은 머신을 쓰면 CPU를 나눠 쓰므로 절대값보다 같은 조건의 비교에 쓴다.
+"""
+
+import argparse
+import array
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import websockets
+
+from fast_engine import RESULTS
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RESULT_VERSION = 1      # --json 출력 형식 버전 (필드를 바꾸면 올림)
+WEIGHTS = [20, 25, 20, 10, 8, 3, 1, 2, 1, 1, 1, 1, 1, 1, 1]    # RESULTS 순서
+GENERATED_PITCHES = 300 # 무작위 경기 하나의 투구 수
+LAG_INTERVAL = 0.01     # 이벤트 루프 지연 측정 간격 (초)
+CONNECT_CONCURRENCY = 200
+
+# ---------------------------------------------------------------- 타석 결과 순서
+
+def log_sequences(path):
+    """서버 로그의 ACK -> 경기별 [(타자, 결과), ...] (RESET/END에서 나눔)"""
+    games, done = {}, []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            data = rec.get("data")
+            if not isinstance(data, dict):
+                continue
+            seq = games.setdefault(rec.get("game", ""), [])
+            if data.get("type") == "ACK" and data.get("result") in RESULTS:
+                seq.append((data.get("batter", ""), data["result"]))
+            elif data.get("msg") == "RESET" or data.get("type") == "END":
+                if seq:
+                    done.append(seq)
+                games[rec.get("game", "")] = []
+    done.extend(seq for seq in games.values() if seq)
+    return done
+
+def generated_sequences(count, seed):
+    rng = random.Random(seed)
+    return [[("", r) for r in rng.choices(RESULTS, WEIGHTS, k=GENERATED_PITCHES)] for _ in range(count)]
+
+# ---------------------------------------------------------------- 측정
+
+def summary(values, scale=1e3):
+    """지연 목록(초) -> p50/p90/p99/max (ms)"""
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    pick = lambda p: round(values[min(len(values) - 1, int(len(values) * p / 100))] * scale, 3)
+    return {"count": len(values), "p50": pick(50), "p90": pick(90), "p99": pick(99),
+            "max": round(values[-1] * scale, 3)}
+
+def rss_kb(pid):
+    """프로세스 RSS (KB, /proc가 없으면 None)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+class Run:
+    """측정 구간(start~end) 동안 모은 값"""
+
+    def __init__(self):
+        self.start = self.end = None
+        self.sent = {}                      # 게임 -> {순번: AB 보낸 시각}
+        self.ab_latency = array.array("d")
+        self.broadcast_latency = array.array("d")
+        self.loop_lag = array.array("d")
+        self.abs = 0
+        self.frames = 0
+        self.errors = 0
+        self.failed = 0
+
+    def measuring(self, now):
+        return self.start is not None and self.start <= now < self.end
+
+async def lag_sampler(run, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        if run.measuring(time.perf_counter()):
+            run.loop_lag.append(loop.time() - t0 - LAG_INTERVAL)
+
+# ---------------------------------------------------------------- 접속
+
+async def viewer(uri, game, run, ready, gate):
+    """관중: 측정이 끝나면 load()가 태스크를 취소한다"""
+    try:
+        async with gate:
+            ws = await websockets.connect(f"{uri}/{game}?proto=delta", open_timeout=120)
+    except (OSError, asyncio.TimeoutError, websockets.exceptions.InvalidHandshake):
+        run.failed += 1
+        ready()
+        return
+    ready()
+    sent = run.sent.setdefault(game, {})
+    try:
+        async with ws:
+            async for message in ws:
+                now = time.perf_counter()
+                if run.measuring(now):
+                    run.frames += 1
+                    if "DELTA" in message[:20]:
+                        t0 = sent.get(json.loads(message)["seq"])
+                        if t0 is not None:
+                            run.broadcast_latency.append(now - t0)
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+async def scorer(uri, game, sequence, rate, run, ready, stop, go):
+    """기록원: 명령 하나마다 자기 DELTA까지 받아 순번을 맞춘 뒤 다음 명령"""
+    sent = run.sent.setdefault(game, {})
+    try:
+        ws = await websockets.connect(f"{uri}/{game}?proto=delta", open_timeout=120)
+        seq = json.loads(await ws.recv())["seq"]
+    except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException):
+        run.failed += 1
+        ready()
+        return
+    ready()
+    async with ws:
+        await go.wait()
+        i = 0
+        while not stop.is_set():
+            if i < len(sequence):
+                batter, result = sequence[i]
+                command = {"type": "AB", "batter": batter, "result": result}
+            else:
+                command = {"type": "RESET"}
+            t0 = time.perf_counter()
+            sent[seq + 1] = t0
+            sent.pop(seq - 1000, None)
+            await ws.send(json.dumps(command, ensure_ascii=False))
+            ended = False
+            while True:
+                msg = json.loads(await ws.recv())
+                t = msg["type"]
+                if t in ("ACK", "END") and command["type"] == "AB":
+                    if run.measuring(t0):
+                        run.abs += 1
+                        run.ab_latency.append(time.perf_counter() - t0)
+                    ended = t == "END"
+                elif t == "ERROR":
+                    run.errors += 1
+                    break
+                elif t == "DELTA" and msg["seq"] > seq:
+                    seq = msg["seq"]
+                    break
+            i = 0 if command["type"] == "RESET" else (len(sequence) if ended else i + 1)
+            if rate:
+                await asyncio.sleep(1 / rate)
+
+async def load(args, uri, server_pid):
+    run = Run()
+    sequences = (log_sequences(args.source) if args.source else []) or generated_sequences(args.games, args.seed)
+    games = [f"load{g}" for g in range(args.games)]
+    stop, go = asyncio.Event(), asyncio.Event()
+    gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    total = args.games + args.viewers
+    connected = 0
+    all_ready = asyncio.Event()
+
+    def ready():
+        nonlocal connected
+        connected += 1
+        if connected == total:
+            all_ready.set()
+
+    rss_base = rss_kb(server_pid) if server_pid else None
+    lag = asyncio.create_task(lag_sampler(run, stop))
+    t0 = time.perf_counter()
+    scorers = [asyncio.create_task(scorer(uri, games[g], sequences[g % len(sequences)], args.rate,
+                                          run, ready, stop, go)) for g in range(args.games)]
+    viewers = [asyncio.create_task(viewer(uri, games[i % args.games], run, ready, gate))
+               for i in range(args.viewers)]
+    await all_ready.wait()
+    connect_seconds = time.perf_counter() - t0
+    await asyncio.sleep(0.5)
+    rss_connected = rss_kb(server_pid) if server_pid else None
+
+    run.start = time.perf_counter() + args.warmup
+    run.end = run.start + args.duration
+    go.set()
+    await asyncio.sleep(args.warmup + args.duration)
+    rss_end = rss_kb(server_pid) if server_pid else None
+    stop.set()
+    await asyncio.gather(*scorers, lag, return_exceptions=True)
+    for task in viewers:
+        task.cancel()
+    await asyncio.gather(*viewers, return_exceptions=True)
+
+    connections = total - run.failed
+    per_connection = None
+    if rss_base is not None and rss_connected is not None and connections:
+        per_connection = round((rss_connected - rss_base) * 1024 / connections)
+    return {
+        "connect": {"connections": connections, "failed": run.failed, "seconds": round(connect_seconds, 3),
+                    "per_sec": round(connections / connect_seconds, 1)},
+        "throughput": {"abs_per_sec": round(run.abs / args.duration, 1),
+                       "frames_per_sec": round(run.frames / args.duration, 1),
+                       "errors": run.errors},
+        "ab_latency_ms": summary(run.ab_latency),
+        "broadcast_latency_ms": summary(run.broadcast_latency),
+        "server": {"pid": server_pid, "rss_base_kb": rss_base, "rss_connected_kb": rss_connected,
+                   "rss_end_kb": rss_end, "bytes_per_connection": per_connection},
+        "loop_lag_ms": summary(run.loop_lag),
+        "sequences": {"source": args.source or "generated", "games": len(sequences)},
+    }
+
+# ---------------------------------------------------------------- 서버
+
+def start_server(args, tmp):
+    script = "shard.py" if args.workers else "server_websocket.py"
+    cmd = [sys.executable, os.path.join(ROOT, script), "--port", str(args.port),
+           "--log", os.path.join(tmp, "log.jsonl"), "--events", os.path.join(tmp, "events")]
+    if args.workers:
+        cmd += ["--workers", str(args.workers)]
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+async def wait_server(uri, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            async with websockets.connect(f"{uri}/probe"):
+                return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"서버가 뜨지 않았습니다: {uri}")
+
+def raise_fd_limit():
+    """접속 수천 개를 열 수 있도록 파일 디스크립터 한도를 최대로"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+async def main_async(args):
+    if args.uri:
+        await wait_server(args.uri)
+        return await load(args, args.uri.rstrip("/"), args.server_pid)
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(args, tmp)
+        uri = f"ws://127.0.0.1:{args.port}"
+        try:
+            await wait_server(uri)
+            # shard.py는 실행기만 재므로 워커 RSS는 빠짐
+            return await load(args, uri, None if args.workers else server.pid)
+        finally:
+            server.send_signal(2)
+            server.wait(timeout=30)
+
+def print_summary(result):
+    c, t, s = result["connect"], result["throughput"], result["server"]
+    print(f"접속 {c['connections']:,}개 ({c['failed']}개 실패) {c['seconds']:.2f}s, {c['per_sec']:,.0f}/s")
+    print(f"처리량: AB {t['abs_per_sec']:,.1f}/s, 관중 프레임 {t['frames_per_sec']:,.0f}/s, ERROR {t['errors']}개")
+    for name, key in (("AB 지연", "ab_latency_ms"), ("브로드캐스트 지연", "broadcast_latency_ms"),
+                      ("발생기 루프 지연", "loop_lag_ms")):
+        v = result[key]
+        if v["count"]:
+            print(f"{name}: p50={v['p50']}ms p90={v['p90']}ms p99={v['p99']}ms max={v['max']}ms ({v['count']:,}개)")
+    if s["bytes_per_connection"] is not None:
+        print(f"서버 RSS: {s['rss_base_kb']:,}KB -> {s['rss_connected_kb']:,}KB "
+              f"(접속당 {s['bytes_per_connection']:,} bytes), 종료 직전 {s['rss_end_kb']:,}KB")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="WebSocket 서버 부하 발생기")
+    parser.add_argument("--uri", help="이미 떠 있는 서버 (생략하면 임시 서버를 띄움)")
+    parser.add_argument("--server-pid", type=int, help="--uri 서버의 PID (접속당 메모리 측정용)")
+    parser.add_argument("--port", type=int, default=5099, help="임시 서버 포트")
+    parser.add_argument("--workers", type=int, default=0, help="임시 서버를 shard.py 워커 N개로 띄움")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--viewers", type=int, default=2000, help="전체 관중 접속 수 (게임에 고르게 나눔)")
+    parser.add_argument("--rate", type=float, default=0, help="게임마다 초당 AB 수 (0이면 ACK를 받는 대로)")
+    parser.add_argument("--duration", type=float, default=10.0, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=1.0, help="측정 전 준비 시간 (초)")
+    parser.add_argument("--source", help="타석 결과를 뽑을 서버 로그 (생략하면 무작위 경기)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="결과 JSON 파일 (\"-\"이면 표준 출력)")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    raise_fd_limit()
+    result = {
+        "version": RESULT_VERSION,
+        "timestamp": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        **asyncio.run(main_async(args)),
+    }
+    if args.json == "-":
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    print_summary(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json}")
+
+if __name__ == "__main__":
+    main()
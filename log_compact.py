@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버 로그 압축 + 색인 (경기/이닝으로 바로 찾아가기)
+사용법:
+  python log_compact.py compact game_log_websocket.jsonl [...] --out compact/
+  python log_compact.py games compact/
+  python log_compact.py state compact/ <게임 ID> --inning 7 [--half 말] [--reset -1] [--plays 0]
+  python log_compact.py expand compact/ > full.jsonl
+설명: 서버 로그는 AB마다 ACK와 전체 STATE를 한 줄씩 쓰고, 여러 게임 줄이 섞여 있으며,
+      경기 경계는 RESET ACK 줄뿐이다 (RESET 없이 점수가 줄거나 이닝이 되돌아가면 -
+      서버를 복구 없이 다시 띄운 경우 등 - 거기서도 경기를 나눈다, log_stats.py와 같은 규칙). 압축은
+        - AB 응답(ACK/END/ERROR) 뒤의 STATE 줄 중 규칙 엔진으로 ACK를 다시 적용해 똑같이 나오는 것은 버리고
+          (SET_RUNNERS처럼 로그에 없는 명령 때문에 다른 STATE는 보정 줄로 남긴다)
+        - 게임 ID마다 나눈 경기(구간)의 줄을 연속으로 모아 games.jsonl에 쓰고
+        - 구간마다 초/말이 바뀌는 위치(바이트 오프셋)와 그때의 점수를 고정 크기 레코드로 index.bin에 쓴다.
+      읽을 때는 index.bin을 mmap으로 열어 구간 안에서 (이닝, 초/말)을 이분 탐색하고,
+      그 초/말의 시작 상태(아웃/카운트/주자 없음 + 점수)에서부터만 다시 적용한다.
+      남긴 줄은 원래 바이트 그대로이므로 expand는 버린 STATE를 다시 만들어 원래 로그와 같은 데이터를 돌려준다
+      (다시 만든 STATE의 timestamp는 앞 ACK의 것).
+
+  segments.json   {"version", "sources", "segments": [{"game", "reset", "offset", "length", "records",
+                                                       "index", "entries", "kept_states", "dropped_states"}]}
+  index.bin       INDEX 레코드: 구간 번호, 이닝, 초/말(0/1), 원정 점수, 홈 점수, games.jsonl 오프셋
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+
+from game_engine import apply_ab, current_state, init_state
+from game_room import DEFAULT_GAME
+from log_stats import parse_inning
+
+FORMAT_VERSION = 1
+DATA_FILE = "games.jsonl"
+INDEX_FILE = "index.bin"
+META_FILE = "segments.json"
+INDEX = struct.Struct("<IHBhhQ")
+HALVES = ("AWAY", "HOME")
+AB_RESPONSES = ("ACK", "END", "ERROR")
+
+def is_ab_response(data):
+    """서버가 바로 뒤에 STATE를 쓰는 AB 응답인지"""
+    t = data.get("type")
+    return t in ("END", "ERROR") or (t == "ACK" and "result" in data)
+
+def state_from_public(snapshot, prev):
+    """로그의 STATE -> 규칙 엔진 상태 (라인업과 타순은 이전 상태에서 이어받음)"""
+    inning, half = parse_inning(snapshot["inning"])
+    state = init_state()
+    for key in ("away_lineup", "home_lineup", "away_index", "home_index"):
+        if key in prev:
+            state[key] = prev[key]
+    state.update(inning=inning, half=HALVES[half], outs=snapshot["outs"], balls=snapshot["balls"],
+                 strikes=snapshot["strikes"], home=snapshot["home"], away=snapshot["away"],
+                 runners=set(snapshot["runners"]), current_batter=snapshot.get("current_batter"),
+                 game_over=snapshot.get("game_over", False))
+    return state
+
+def goes_back(state, data) -> bool:
+    """로그 데이터의 점수가 state보다 적거나 이닝/초말이 앞섬 = RESET 없이 새 경기가 시작됨"""
+    t = data.get("type")
+    if t == "STATE" and "inning" in data:
+        key = parse_inning(data["inning"])
+    elif t == "ACK" and "result" in data:
+        key = data["inning"], HALVES.index(data["half"])
+    elif t != "END":
+        return False
+    else:
+        key = state["inning"], HALVES.index(state["half"])
+    return data.get("away", state["away"]) < state["away"] or data.get("home", state["home"]) < state["home"] \
+        or key < (state["inning"], HALVES.index(state["half"]))
+
+def checkpoint_state(inning, half, away, home):
+    """초/말이 막 시작한 상태 (아웃/카운트/주자/타자 없음)"""
+    state = init_state()
+    state.update(inning=inning, half=HALVES[half], away=away, home=home)
+    return state
+
+class Replay:
+    """남긴 줄만으로 경기 상태를 다시 만드는 재생기 (압축과 읽기가 같은 규칙을 써야 함)"""
+
+    def __init__(self, state=None):
+        self.state = state if state is not None else init_state()
+
+    def feed(self, data):
+        """로그 데이터 한 개 반영. 뒤에 (버렸을 수도 있는) STATE가 오는 AB 응답이면 True"""
+        if data.get("type") == "STATE":
+            self.state = state_from_public(data, self.state)
+            return False
+        if data.get("type") == "ACK" and "result" in data:
+            apply_ab(self.state, data.get("batter", ""), data["result"])
+        elif data.get("msg") == "LINEUP_SET":
+            self.state["away_lineup"] = data.get("away_lineup", [])
+            self.state["home_lineup"] = data.get("home_lineup", [])
+        return is_ab_response(data)
+
+    def half_key(self):
+        return self.state["inning"], HALVES.index(self.state["half"])
+
+# ---------------------------------------------------------------- 압축
+
+class _Segment:
+    """게임 ID 하나의 경기 구간 (RESET이나 되돌아간 상태에서 나눔, 끝날 때까지 줄을 모아 둠)
+
+    구간 안에서는 (이닝, 초/말)이 되돌아가지 않으므로 색인을 이분 탐색할 수 있다.
+    """
+
+    def __init__(self, game, reset):
+        self.game = game
+        self.reset = reset
+        self.lines = []              # 남길 원래 줄 bytes
+        self.size = 0
+        self.entries = [(1, 0, 0, 0, 0)]  # (이닝, 초/말, 원정, 홈, 구간 안 오프셋)
+        self.replay = Replay()
+        self.after_ab = False        # 직전 줄이 AB 응답 (다음 STATE는 버릴 수 있음)
+        self.kept_states = self.dropped_states = 0
+
+    def add(self, line, data):
+        if data.get("type") == "STATE" and self.after_ab and \
+                data == current_state(self.replay.state):
+            self.dropped_states += 1
+            self.after_ab = False
+            return
+        if data.get("type") == "STATE":
+            self.kept_states += 1
+        key = self.replay.half_key()
+        start = self.size
+        self.lines.append(line)
+        self.size += len(line)
+        self.after_ab = self.replay.feed(data)
+        if self.replay.half_key() != key:
+            inning, half = self.replay.half_key()
+            # 보정 STATE로 바뀌었으면 (경기 종료 등) 시작 상태가 깨끗하지 않으므로 그 줄부터 다시 적용
+            offset = start if data.get("type") == "STATE" else self.size
+            self.entries.append((inning, half, self.replay.state["away"], self.replay.state["home"], offset))
+
+def compact(paths, out):
+    """로그 파일들 -> out 디렉터리 (games.jsonl, index.bin, segments.json). 요약 dict 반환"""
+    os.makedirs(out, exist_ok=True)
+    segments, open_segments, resets = [], {}, {}
+    with open(os.path.join(out, DATA_FILE), "wb") as data_file, open(os.path.join(out, INDEX_FILE), "wb") as index:
+        entries = 0
+
+        def flush(seg):
+            nonlocal entries
+            offset = data_file.tell()
+            data_file.write(b"".join(seg.lines))
+            for inning, half, away, home, rel in seg.entries:
+                index.write(INDEX.pack(len(segments), inning, half, away, home, offset + rel))
+            segments.append({"game": seg.game, "reset": seg.reset, "offset": offset, "length": seg.size,
+                             "records": len(seg.lines), "index": entries, "entries": len(seg.entries),
+                             "kept_states": seg.kept_states, "dropped_states": seg.dropped_states})
+            entries += len(seg.entries)
+
+        for path in paths:
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    data = rec.get("data")
+                    if not isinstance(data, dict):
+                        continue
+                    if not line.endswith(b"\n"):
+                        line += b"\n"
+                    game = rec.get("game", DEFAULT_GAME)
+                    seg = open_segments.get(game)
+                    if seg is not None and (data.get("msg") == "RESET" or goes_back(seg.replay.state, data)):
+                        flush(seg)
+                        seg = None
+                    if seg is None:
+                        resets[game] = resets.get(game, -1) + 1
+                        seg = open_segments[game] = _Segment(game, resets[game])
+                    seg.add(line, data)
+        for seg in open_segments.values():
+            flush(seg)
+    with open(os.path.join(out, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "sources": [os.path.abspath(p) for p in paths],
+                   "segments": segments}, f, ensure_ascii=False)
+    return {"segments": len(segments), "index_entries": entries,
+            "dropped_states": sum(s["dropped_states"] for s in segments),
+            "kept_states": sum(s["kept_states"] for s in segments)}
+
+# ---------------------------------------------------------------- 읽기
+
+class CompactLog:
+    """압축 디렉터리 읽기 (games.jsonl/index.bin은 mmap)"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 압축 형식 버전: {meta.get('version')}")
+        self.segments = meta["segments"]
+        self.by_game = {}
+        for i, seg in enumerate(self.segments):
+            self.by_game.setdefault(seg["game"], []).append(i)
+        self._files = [open(os.path.join(directory, name), "rb") for name in (DATA_FILE, INDEX_FILE)]
+        self.data, self.index = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(f.name)
+                                 else b"" for f in self._files)
+
+    def close(self):
+        for m in (self.data, self.index):
+            if isinstance(m, mmap.mmap):
+                m.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def segment(self, game, reset=-1):
+        """게임 ID와 경기 번호(0부터, 음수면 뒤에서부터) -> 구간 번호"""
+        ids = self.by_game.get(game)
+        if not ids:
+            raise KeyError(f"게임 없음: {game}")
+        return ids[reset]
+
+    def entry(self, i):
+        return INDEX.unpack_from(self.index, i * INDEX.size)
+
+    def seek(self, segment, inning, half=0):
+        """구간 안에서 (이닝, 초/말)이 시작하는 오프셋과 그때 상태 (이분 탐색)
+
+        그 초/말이 없으면(경기가 그 전에 끝남) 그 전의 마지막 초/말에서 시작한다.
+        """
+        seg = self.segments[segment]
+        lo, hi = seg["index"], seg["index"] + seg["entries"]
+        i = bisect.bisect_right(range(lo, hi), (inning, half), key=lambda j: self.entry(j)[1:3]) + lo - 1
+        _, inning, half, away, home, offset = self.entry(max(i, lo))
+        return offset, checkpoint_state(inning, half, away, home)
+
+    def records(self, start, end):
+        """[start, end) 바이트 구간의 레코드"""
+        while start < end:
+            stop = self.data.find(b"\n", start, end)
+            stop = end if stop < 0 else stop + 1
+            yield json.loads(self.data[start:stop])
+            start = stop
+
+    def state_at(self, game, inning, half=0, reset=-1, plays=0):
+        """게임의 (이닝, 초/말) 시작 상태 + 그 뒤 plays개 AB 응답까지 반영한 STATE"""
+        segment = self.segment(game, reset)
+        seg = self.segments[segment]
+        offset, state = self.seek(segment, inning, half)
+        replay = Replay(state)
+        for rec in self.records(offset, seg["offset"] + seg["length"]):
+            data = rec["data"]
+            if not plays:
+                # 시작 위치나 마지막 AB 응답 바로 뒤에 보정 STATE가 남아 있으면 그것까지
+                if data.get("type") == "STATE":
+                    replay.feed(data)
+                break
+            if replay.feed(data):
+                plays -= 1
+        return current_state(replay.state)
+
+    def expand(self, segment):
+        """구간의 원래 레코드 (버린 STATE를 다시 만들어 끼워 넣음)"""
+        seg = self.segments[segment]
+        replay = Replay()
+        pending = None
+        for rec in self.records(seg["offset"], seg["offset"] + seg["length"]):
+            data = rec["data"]
+            if pending is not None:
+                if data.get("type") != "STATE":
+                    yield pending
+                pending = None
+            yield rec
+            if replay.feed(data):
+                pending = {"timestamp": rec.get("timestamp"), **({"game": rec["game"]} if "game" in rec else {}),
+                           "data": current_state(replay.state)}
+        if pending is not None:
+            yield pending
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 로그 압축 + 색인")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("compact", help="로그 압축")
+    p.add_argument("logs", nargs="+")
+    p.add_argument("--out", required=True)
+    p = sub.add_parser("games", help="게임/경기 목록")
+    p.add_argument("dir")
+    p = sub.add_parser("state", help="이닝 시작 상태")
+    p.add_argument("dir")
+    p.add_argument("game")
+    p.add_argument("--inning", type=int, default=1)
+    p.add_argument("--half", choices=("초", "말"), default="초")
+    p.add_argument("--reset", type=int, default=-1, help="경기 번호 (0부터, -1 = 마지막 경기)")
+    p.add_argument("--plays", type=int, default=0, help="이닝 시작 뒤 반영할 AB 수")
+    p = sub.add_parser("expand", help="원래 형식으로 풀기 (표준 출력)")
+    p.add_argument("dir")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        before = sum(os.path.getsize(p) for p in args.logs)
+        summary = compact(args.logs, args.out)
+        after = sum(os.path.getsize(os.path.join(args.out, name)) for name in (DATA_FILE, INDEX_FILE, META_FILE))
+        print(f"구간 {summary['segments']}개, 색인 {summary['index_entries']}개, "
+              f"STATE {summary['dropped_states']}줄 버림 / {summary['kept_states']}줄 보정으로 남김")
+        print(f"크기: {before:,} -> {after:,} bytes ({after / before * 100:.1f}%)")
+    elif args.command == "games":
+        with CompactLog(args.dir) as log:
+            for game, ids in log.by_game.items():
+                print(f"{game}: 경기 {len(ids)}개, 줄 {sum(log.segments[i]['records'] for i in ids)}개")
+    elif args.command == "state":
+        with CompactLog(args.dir) as log:
+            state = log.state_at(args.game, args.inning, ("초", "말").index(args.half), args.reset, args.plays)
+            print(json.dumps(state, ensure_ascii=False))
+    elif args.command == "expand":
+        with CompactLog(args.dir) as log:
+            for segment in range(len(log.segments)):
+                for rec in log.expand(segment):
+                    sys.stdout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지난 경기 로그 재방송
+사용법: python server_websocket.py --replay game_log_websocket.jsonl [...] [--replay-speed 10] [--replay-loop]
+        (관중은 ws://host:port/replay0-<게임 ID> 로 접속)
+설명: 서버 로그(ACK/STATE/RESET 줄)를 한 줄씩 읽어(log_stats.read_records, 파일 전체를 읽지 않음)
+      실제 방과 같은 경로로 내보낸다. STATE는 publish_snapshot()으로 순번을 붙여 STATE/DELTA로,
+      ACK/END/RESET은 방 브로드캐스트로 보낸다 (샤드 모드면 둘 다 주인 워커가 사본 워커들에게 전달). 재방송 방은 읽기 전용이라 입력 명령을 받지 않는다.
+      speed > 0이면 원래 timestamp 간격을 speed배 빠르게(경기 사이처럼 max_gap초보다 긴 공백은 max_gap으로 줄임),
+      speed == 0이면 기다리지 않고 최대한 빨리 보낸다 (줄마다 이벤트 루프에 한 번 양보).
+      재방송 여러 개를 한 이벤트 루프에서 동시에 돌릴 수 있고, 메모리는 로그 크기와 상관없이 일정하다.
+"""
+
+import asyncio
+from datetime import datetime
+
+from game_room import DEFAULT_GAME
+from log_stats import read_records
+
+MAX_GAP = 5.0   # 재방송 중 기다리는 최대 공백 (초, speed를 적용한 뒤)
+
+def room_id(prefix, rec):
+    return f"{prefix}{rec.get('game', DEFAULT_GAME)}"
+
+def publish(rooms, prefix, rec):
+    """로그 레코드 하나를 재방송 방에 내보냄. 보낸 메시지가 있으면 True"""
+    data = rec.get("data")
+    if not isinstance(data, dict):
+        return False
+    game_id = room_id(prefix, rec)
+    if rooms.relay is not None and not rooms.relay.owns(game_id):
+        return False    # 샤드 모드: 게임의 주인 워커만 내보냄
+    room = rooms.get(game_id)
+    room.read_only = True
+    if data.get("type") == "STATE":
+        room.publish_snapshot(data)
+    else:
+        room.broadcast(data)
+    return True
+
+def timestamp(rec):
+    try:
+        return datetime.fromisoformat(rec["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+async def replay_log(rooms, path, prefix="replay-", speed=1.0, max_gap=MAX_GAP, repeat=False):
+    """로그 파일 하나를 재방송 (repeat이면 끝나면 처음부터). 보낸 메시지 수 반환"""
+    loop = asyncio.get_running_loop()
+    sent = 0
+    while True:
+        start = loop.time()
+        offset = 0.0        # 로그 시간 -> 재방송 시간 (줄인 공백만큼 당김)
+        first = last = None
+        for rec in read_records(path):
+            if speed > 0:
+                ts = timestamp(rec)
+                if ts is not None:
+                    if first is None:
+                        first = last = ts
+                    gap = (ts - last) / speed
+                    if gap > max_gap:
+                        offset += gap - max_gap
+                    last = ts
+                    delay = start + (ts - first) / speed - offset - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            sent += publish(rooms, prefix, rec)
+        if not repeat:
+            return sent
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSONL 로그 통계 도구 (박스 스코어 / 타자별 기록)
+사용법:
+  python log_stats.py stats LOG... [--workers 4] [--chunk-mb 16] [--box] [--top 20]
+  python log_stats.py convert LOG... --out DIR [--workers 4] [--chunk-mb 16]
+  python log_stats.py query DIR [--box] [--top 20]
+설명: {"timestamp", ["game",] "data"} 형식의 서버/클라이언트 로그를 한 줄씩 읽는 제너레이터 파이프라인
+        읽기 -> ACK와 직후 STATE 짝짓기 -> 타석 이벤트 -> 집계
+      로 처리한다. 워커가 여러 개면 작은 파일은 파일 단위로 프로세스 풀에서 처리하고,
+      --chunk-mb보다 큰 파일은 줄 경계에 맞춘 바이트 구간으로 나눠 워커들이 파싱과 짝짓기까지 한다.
+      구간 안에서 게임마다 첫 RESET부터는 워커가 타석 이벤트로 바꾸고, 그 앞 몇 줄만 앞 구간의
+      진행 상황이 필요하므로 이 프로세스가 구간 순서대로 이어서 처리한다 (range_events/chunked_events).
+      convert는 타석 이벤트를 열 단위 바이너리(열마다 파일 하나 + meta.json)로 저장하고,
+      query는 그 열들을 NumPy로 한 번에 읽어 같은 집계를 행마다 Python 반복 없이 한다.
+
+게임 구분: 로그 줄의 "game" 필드(없으면 기본 게임)와 RESET 횟수로 나눈다. RESET 없이 점수가 줄거나
+          이닝이 되돌아가면(서버를 복구 없이 다시 띄운 경우 등) 그때도 새 경기로 본다.
+경기를 끝낸 타석은 서버가 ACK 대신 END에 타자와 결과를 실어 보내므로 ACK처럼 기록에 넣는다.
+한계: END에 타자/결과가 없는 이전 로그에서는 그 타석이 점수에는 반영되지만 타자 기록에는 빠진다.
+"""
+
+import argparse
+import json
+import os
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import batting
+from fast_engine import RESULTS
+from game_room import DEFAULT_GAME
+
+TEAMS = ("AWAY", "HOME")
+RESULT_CODES = {name: code for code, name in enumerate(RESULTS)}
+RESULT_CODES["END"] = 254
+UNKNOWN_RESULT = 255
+COLUMNS = (("game", "I"), ("inning", "H"), ("half", "B"), ("batter", "I"),
+           ("result", "B"), ("stats", "H"), ("runs", "b"))
+FLUSH_EVERY = 1 << 20
+CHUNK_BYTES = 16 << 20      # 이보다 큰 파일은 바이트 구간으로 나눠 여러 워커가 파싱
+# 워커가 돌려주는 prefix 레코드에 남길 필드 (plate_events가 보는 것만)
+KEEP_FIELDS = ("type", "inning", "half", "away", "home", "balls", "strikes", "batter", "result", "msg")
+
+# ---------------------------------------------------------------- 파이프라인
+
+def read_records(path):
+    """로그 파일 -> 레코드 dict (깨진 줄은 건너뜀)"""
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def line_ranges(path, chunk=CHUNK_BYTES):
+    """파일을 chunk 바이트 안팎의 [(시작, 끝)] 구간으로 (경계는 줄 시작)"""
+    total = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        while bounds[-1] + chunk < total:
+            f.seek(bounds[-1] + chunk)
+            f.readline()
+            if f.tell() >= total:
+                break
+            bounds.append(f.tell())
+    bounds.append(total)
+    return list(zip(bounds, bounds[1:]))
+
+def is_reset(data) -> bool:
+    return data.get("type") == "ACK" and "result" not in data and data.get("msg") == "RESET"
+
+def slim(rec):
+    """레코드에서 plate_events가 쓰는 필드만 (쓰지 않는 레코드는 None)"""
+    data = rec.get("data")
+    if not isinstance(data, dict):
+        return None
+    t = data.get("type")
+    if t not in ("STATE", "ACK", "END") or (t == "ACK" and "result" not in data and not is_reset(data)):
+        return None
+    out = {"data": {k: data[k] for k in KEEP_FIELDS if k in data}}
+    if "game" in rec:
+        out["game"] = rec["game"]
+    return out
+
+def read_range(job):
+    """(경로, 시작, 끝) 구간의 레코드 dict (깨진 줄은 건너뜀)"""
+    path, start, end = job
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    for line in data.splitlines():
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+def parse_inning(label):
+    """"7회 말" -> (7, 1)"""
+    number, _, half = label.partition("회")
+    return int(number), 1 if half.strip() == "말" else 0
+
+class _Game:
+    """게임 ID 하나의 진행 상황 (RESET마다 새 경기 번호)"""
+    __slots__ = ("key", "resets", "inning", "half", "away", "home", "pending")
+
+    def __init__(self, source, game_id):
+        self.key = f"{source}:{game_id}"
+        self.resets = 0
+        self.reset()
+
+    def reset(self):
+        self.inning, self.half, self.away, self.home = 1, 0, 0, 0
+        self.pending = None
+
+    def went_back(self, inning, half, away, home) -> bool:
+        """점수가 줄거나 이닝이 되돌아감 = RESET 없이 새 경기가 시작됨"""
+        return away < self.away or home < self.home or (inning, half) < (self.inning, self.half)
+
+    def restart(self):
+        """새 경기 번호로 (RESET과 같음)"""
+        self.resets += 1
+        self.reset()
+
+    @property
+    def game_key(self):
+        return f"{self.key}#{self.resets}"
+
+def plate_events(records, source="", games=None, flush=True):
+    """레코드 -> (게임 키, 이닝, 초/말, 타자, 결과, 기록 항목, 득점) 이벤트
+
+    ACK는 직후의 같은 게임 STATE를 보고 삼진/볼넷 여부를 정한 뒤 내보낸다.
+    득점은 ACK/END 점수의 증가분이며, 타석 직전 이닝/초말에 붙인다.
+    STATE/ACK/END의 점수나 이닝이 되돌아가면 새 경기로 나누므로 득점은 음수가 되지 않는다.
+    games(게임 ID -> _Game)를 주면 그 진행 상황에서 이어 가고, flush=False면 끝에서
+    STATE를 기다리는 타석을 내보내지 않고 남겨 둔다 (파일을 구간으로 나눠 읽을 때).
+    """
+    if games is None:
+        games = {}
+    for rec in records:
+        data = rec.get("data")
+        if not isinstance(data, dict):
+            continue
+        t = data.get("type")
+        game_id = rec.get("game", DEFAULT_GAME)
+        g = games.get(game_id)
+        if g is None:
+            g = games[game_id] = _Game(source, game_id)
+
+        if t == "STATE":
+            inning, half = parse_inning(data["inning"]) if "inning" in data else (g.inning, g.half)
+            away, home = data.get("away", g.away), data.get("home", g.home)
+            if g.went_back(inning, half, away, home):
+                if g.pending is not None:
+                    ev = g.pending
+                    yield ev[:5] + (batting.classify(ev[4], -1, -1), ev[6])
+                g.restart()
+                g.away, g.home = away, home
+            elif g.pending is not None:
+                ev = g.pending
+                g.pending = None
+                yield ev[:5] + (batting.classify(ev[4], data.get("balls", 0), data.get("strikes", 0)), ev[6])
+            g.inning, g.half = inning, half
+        elif t == "ACK":
+            if "result" in data:
+                if g.pending is not None:
+                    ev = g.pending
+                    g.pending = None
+                    yield ev[:5] + (batting.classify(ev[4], -1, -1), ev[6])
+                if g.went_back(data["inning"], 1 if data["half"] == "HOME" else 0, data["away"], data["home"]):
+                    g.restart()
+                runs = data["away"] + data["home"] - g.away - g.home
+                g.away, g.home = data["away"], data["home"]
+                g.pending = (g.game_key, g.inning, g.half, data.get("batter") or "Unknown",
+                             data["result"], (), runs)
+                g.inning, g.half = data["inning"], 1 if data["half"] == "HOME" else 0
+            elif data.get("msg") == "RESET":
+                g.pending = None
+                g.resets += 1
+                g.reset()
+        elif t == "END":
+            if g.pending is not None:
+                ev = g.pending
+                g.pending = None
+                yield ev[:5] + (batting.classify(ev[4], -1, -1), ev[6])
+            if data["away"] < g.away or data["home"] < g.home:
+                g.restart()
+            runs = data["away"] + data["home"] - g.away - g.home
+            g.away, g.home = data["away"], data["home"]
+            if "result" in data:
+                # 경기를 끝낸 타석: ACK처럼 직후 STATE의 카운트를 보고 내보냄
+                g.pending = (g.game_key, g.inning, g.half, data.get("batter") or "Unknown", data["result"], (), runs)
+            else:
+                yield (g.game_key, g.inning, g.half, "", "END", (), runs)
+    if flush:
+        yield from flush_pending(games)
+
+def flush_pending(games):
+    """끝까지 STATE가 오지 않은 타석들"""
+    for g in games.values():
+        if g.pending is not None:
+            ev = g.pending
+            g.pending = None
+            yield ev[:5] + (batting.classify(ev[4], -1, -1), ev[6])
+
+def range_events(job):
+    """워커: 구간 하나 -> (prefix 레코드, 타석 이벤트, 게임 ID -> _Game)
+
+    게임마다 구간 안 첫 RESET부터는 진행 상황을 모두 알 수 있으므로 여기서 타석 이벤트로 바꾼다
+    (경기 번호는 구간 안에서 1부터). 그 앞 레코드(prefix)는 앞 구간의 진행 상황이 있어야 하므로
+    slim() 레코드 그대로 돌려주고, 주 프로세스가 앞 구간에 이어서 처리한다.
+    """
+    prefix, started = [], set()
+
+    def records():
+        for rec in read_range(job):
+            data = rec.get("data")
+            if not isinstance(data, dict):
+                continue
+            game_id = rec.get("game", DEFAULT_GAME)
+            if game_id not in started:
+                if not is_reset(data):
+                    rec = slim(rec)
+                    if rec is not None:
+                        prefix.append(rec)
+                    continue
+                started.add(game_id)
+            yield rec
+
+    games = {}
+    events = list(plate_events(records(), os.path.basename(job[0]), games, flush=False))
+    return prefix, events, games
+
+class Aggregate:
+    """타자별 기록과 경기별 박스 스코어 (합칠 수 있음)"""
+
+    def __init__(self):
+        self.batters = {}   # (팀, 타자) -> 기록 dict
+        self.games = {}     # 게임 키 -> {"line": [{이닝: 득점}, {..}], "R": [..], "H": [..], "E": [..]}
+
+    def add(self, game_key, inning, half, batter, result, stats, runs):
+        box = self.games.get(game_key)
+        if box is None:
+            box = self.games[game_key] = {"line": [{}, {}], "R": [0, 0], "H": [0, 0], "E": [0, 0]}
+        if runs:
+            line = box["line"][half]
+            line[inning] = line.get(inning, 0) + runs
+            box["R"][half] += runs
+        if result == "ERROR":
+            box["E"][1 - half] += 1
+        if stats:
+            if "H" in stats:
+                box["H"][half] += 1
+            key = (TEAMS[half], batter)
+            line = self.batters.get(key)
+            if line is None:
+                line = self.batters[key] = batting.new_line()
+            batting.add(line, stats)
+
+    def merge(self, other):
+        batting.merge_lines(self.batters, other.batters)
+        self.games.update(other.games)
+        return self
+
+def file_stats(path):
+    agg = Aggregate()
+    add = agg.add
+    for ev in plate_events(read_records(path), os.path.basename(path)):
+        add(*ev)
+    return agg
+
+def ordered_map(pool, fn, jobs, window):
+    """pool.map처럼 순서대로 결과를 주되 한 번에 window개까지만 제출 (큰 파일의 파싱 결과가 메모리에 쌓이지 않게)"""
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def chunked_events(pool, path, workers, chunk):
+    """큰 파일 하나의 타석 이벤트: 워커들이 바이트 구간마다 range_events()를 하고, 구간 순서대로 이어 붙인다"""
+    source = os.path.basename(path)
+    games = {}
+    jobs = [(path, start, end) for start, end in line_ranges(path, chunk)]
+    for prefix, events, started in ordered_map(pool, range_events, jobs, workers * 2):
+        yield from plate_events(prefix, source, games, flush=False)
+        # 워커가 RESET부터 처리한 게임: 경기 번호를 앞 구간에 이어 붙이고 구간 끝의 진행 상황을 넘겨받음
+        # (그 RESET이 이쪽에 남은 STATE 대기 타석을 버리는 것도 같다)
+        keys = {}
+        for game_id, g in started.items():
+            base = games[game_id].resets if game_id in games else 0
+            for n in range(1, g.resets + 1):
+                keys[f"{g.key}#{n}"] = f"{g.key}#{base + n}"
+            g.resets += base
+            if g.pending is not None:
+                g.pending = (g.game_key,) + g.pending[1:]
+            games[game_id] = g
+        for ev in events:
+            yield (keys[ev[0]],) + ev[1:]
+    yield from flush_pending(games)
+
+def run_files(whole, chunked, jobs, workers, chunk, path_of=lambda job: job):
+    """파일 작업마다 whole(작업) 또는 chunked(풀, 작업)의 결과 (작업 순서대로)
+
+    chunk보다 작은 파일은 파일 단위로 워커에 맡기고, 큰 파일은 chunked가 구간 파싱을 워커들에 나눈다.
+    """
+    large = [i for i, job in enumerate(jobs) if os.path.getsize(path_of(job)) > chunk]
+    if workers <= 1 or (len(jobs) <= 1 and not large):
+        return list(map(whole, jobs))
+    with ProcessPoolExecutor(workers) as pool:
+        small = [i for i in range(len(jobs)) if i not in large]
+        pending = pool.map(whole, [jobs[i] for i in small])     # 작은 파일은 큰 파일과 함께 진행
+        results = {i: chunked(pool, jobs[i]) for i in large}
+        results.update(zip(small, pending))
+        return [results[i] for i in range(len(jobs))]
+
+def stats(paths, workers=1, chunk=CHUNK_BYTES):
+    def chunked(pool, path):
+        agg = Aggregate()
+        add = agg.add
+        for ev in chunked_events(pool, path, workers, chunk):
+            add(*ev)
+        return agg
+    total = Aggregate()
+    for agg in run_files(file_stats, chunked, paths, workers, chunk):
+        total.merge(agg)
+    return total
+
+# ---------------------------------------------------------------- 열 단위 저장
+
+class ColumnWriter:
+    """타석 이벤트 열을 array로 모았다가 FLUSH_EVERY개마다 파일에 덧붙임"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self.files = {name: open(os.path.join(directory, f"{name}.bin"), "wb") for name, _ in COLUMNS}
+        self.game_ids = {}
+        self.batter_ids = {}
+        self.rows = 0
+
+    def _id(self, table, key):
+        value = table.get(key)
+        if value is None:
+            value = table[key] = len(table)
+        return value
+
+    def add(self, game_key, inning, half, batter, result, stats, runs):
+        c = self.columns
+        c["game"].append(self._id(self.game_ids, game_key))
+        c["inning"].append(inning)
+        c["half"].append(half)
+        c["batter"].append(self._id(self.batter_ids, batter))
+        c["result"].append(RESULT_CODES.get(result, UNKNOWN_RESULT))
+        c["stats"].append(batting.stat_mask(stats))
+        c["runs"].append(runs)
+        self.rows += 1
+        if len(c["game"]) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        for name, col in self.columns.items():
+            if sys.byteorder != "little":
+                col.byteswap()
+            col.tofile(self.files[name])
+            del col[:]
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+        meta = {
+            "rows": self.rows,
+            "columns": dict(COLUMNS),
+            "games": list(self.game_ids),
+            "batters": list(self.batter_ids),
+            "results": list(RESULTS),
+            "stats": list(batting.STATS),
+        }
+        with open(os.path.join(self.directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+def convert_file(job):
+    path, directory = job
+    writer = ColumnWriter(directory)
+    for ev in plate_events(read_records(path), os.path.basename(path)):
+        writer.add(*ev)
+    writer.close()
+    return directory
+
+def convert(paths, out_dir, workers=1, chunk=CHUNK_BYTES):
+    """로그 파일마다 out_dir/part-NNNN/ 열 디렉터리를 만든다"""
+    def chunked(pool, job):
+        path, directory = job
+        writer = ColumnWriter(directory)
+        for ev in chunked_events(pool, path, workers, chunk):
+            writer.add(*ev)
+        writer.close()
+        return directory
+    jobs = [(path, os.path.join(out_dir, f"part-{i:04d}")) for i, path in enumerate(paths)]
+    return run_files(convert_file, chunked, jobs, workers, chunk, path_of=lambda job: job[0])
+
+def load_part(directory):
+    import numpy as np
+    with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    cols = {name: np.fromfile(os.path.join(directory, f"{name}.bin"), dtype=np.dtype(code).newbyteorder("<"))
+            for name, code in meta["columns"].items()}
+    return meta, cols
+
+def query(directory):
+    """열 디렉터리(들)를 읽어 stats()와 같은 Aggregate를 만든다"""
+    import numpy as np
+    parts = sorted(os.path.join(directory, d) for d in os.listdir(directory) if d.startswith("part-"))
+    if not parts and os.path.exists(os.path.join(directory, "meta.json")):
+        parts = [directory]
+    total = Aggregate()
+    for part in parts:
+        meta, c = load_part(part)
+        agg = Aggregate()
+        # 타자별: (타자 ID * 2 + 초/말) 키마다 기록 항목 비트를 bincount
+        key = c["batter"].astype(np.int64) * 2 + c["half"]
+        n_keys = len(meta["batters"]) * 2
+        counts = {name: np.bincount(key, weights=(c["stats"] & bit) > 0, minlength=n_keys)
+                  for name, bit in batting.STAT_BITS.items()}
+        for k in np.flatnonzero(counts["PA"]):
+            agg.batters[(TEAMS[k % 2], meta["batters"][k // 2])] = {name: int(counts[name][k]) for name in batting.STATS}
+        # 경기별: (게임 ID * 2 + 초/말) 키로 득점/안타/실책, 득점이 있는 줄만 이닝별로
+        gkey = c["game"].astype(np.int64) * 2 + c["half"]
+        n_gkeys = len(meta["games"]) * 2
+        runs = np.bincount(gkey, weights=c["runs"], minlength=n_gkeys).astype(int)
+        hits = np.bincount(gkey, weights=(c["stats"] & batting.STAT_BITS["H"]) > 0, minlength=n_gkeys).astype(int)
+        errs = np.bincount(c["game"].astype(np.int64) * 2 + (1 - c["half"]),
+                           weights=c["result"] == RESULT_CODES["ERROR"], minlength=n_gkeys).astype(int)
+        for gid, name in enumerate(meta["games"]):
+            agg.games[name] = {"line": [{}, {}], "R": [int(runs[gid * 2]), int(runs[gid * 2 + 1])],
+                               "H": [int(hits[gid * 2]), int(hits[gid * 2 + 1])],
+                               "E": [int(errs[gid * 2]), int(errs[gid * 2 + 1])]}
+        # 이닝별 득점: 득점이 있는 줄만 골라 (게임, 초/말, 이닝) 키마다 합침 (Python 반복은 키마다 한 번)
+        scored = c["runs"] != 0
+        if scored.any():
+            inning = c["inning"][scored].astype(np.int64)
+            width = int(inning.max()) + 1
+            keys, inverse = np.unique(gkey[scored] * width + inning, return_inverse=True)
+            sums = np.bincount(inverse, weights=c["runs"][scored])
+            for k, total_runs in zip(keys.tolist(), sums.astype(int).tolist()):
+                gk, inning = divmod(k, width)
+                agg.games[meta["games"][gk // 2]]["line"][gk % 2][inning] = total_runs
+        total.merge(agg)
+    return total
+
+# ---------------------------------------------------------------- 출력
+
+def print_batters(agg, top):
+    rows = sorted(agg.batters.items(), key=lambda kv: (-kv[1]["H"], -kv[1]["AB"], kv[0]))
+    print(f"{'팀':4s} {'타자':16s} " + " ".join(f"{s:>4s}" for s in batting.STATS) + "   AVG")
+    for (team, batter), line in rows[:top]:
+        avg = line["H"] / line["AB"] if line["AB"] else 0.0
+        print(f"{team:4s} {batter[:16]:16s} " + " ".join(f"{line[s]:4d}" for s in batting.STATS) + f"  {avg:.3f}")
+
+def print_box(agg):
+    for game_key, box in agg.games.items():
+        innings = max([9] + [i for line in box["line"] for i in line])
+        print(f"\n[{game_key}]")
+        print("     " + " ".join(f"{i:3d}" for i in range(1, innings + 1)) + "     R   H   E")
+        for half, team in enumerate(TEAMS):
+            line = box["line"][half]
+            print(f"{team:4s} " + " ".join(f"{line.get(i, 0):3d}" for i in range(1, innings + 1))
+                  + f"   {box['R'][half]:3d} {box['H'][half]:3d} {box['E'][half]:3d}")
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL 로그 통계")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("stats", help="로그를 바로 읽어 집계")
+    p.add_argument("logs", nargs="+")
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.add_argument("--chunk-mb", type=float, default=CHUNK_BYTES / (1 << 20), help="이보다 큰 파일은 구간으로 나눠 파싱")
+    p.add_argument("--box", action="store_true", help="경기별 박스 스코어 출력")
+    p.add_argument("--top", type=int, default=20)
+    p = sub.add_parser("convert", help="열 단위 형식으로 변환")
+    p.add_argument("logs", nargs="+")
+    p.add_argument("--out", required=True)
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.add_argument("--chunk-mb", type=float, default=CHUNK_BYTES / (1 << 20), help="이보다 큰 파일은 구간으로 나눠 파싱")
+    p = sub.add_parser("query", help="열 단위 파일로 집계")
+    p.add_argument("dir")
+    p.add_argument("--box", action="store_true")
+    p.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.cmd == "convert":
+        parts = convert(args.logs, args.out, args.workers, int(args.chunk_mb * (1 << 20)))
+        print(f"{args.out}: {len(parts)}개 파트 생성")
+        return
+    agg = stats(args.logs, args.workers, int(args.chunk_mb * (1 << 20))) if args.cmd == "stats" else query(args.dir)
+    print_batters(agg, args.top)
+    if args.box:
+        print_box(agg)
+
+if __name__ == "__main__":
+    main()
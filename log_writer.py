@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비동기 배치 로그 기록기
+설명: JSONL 로그 파일을 열어 둔 채로 asyncio 큐에 줄을 모았다가
+      개수/시간/종료 시점에 한 번에 기록한다.
+      실제 파일 쓰기와 fsync는 스레드 풀에서 실행되어 이벤트 루프를 막지 않는다.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+import metrics
+
+FSYNC_POLICIES = ("none", "batch", "interval")
+
+class LogWriter:
+    """백그라운드 JSONL 로그 기록기
+
+    max_queue: 큐에 쌓일 수 있는 최대 줄 수 (메모리 상한).
+               가득 차면 write()가 자리가 날 때까지 기다린다 (backpressure).
+    max_batch: 한 번에 기록할 최대 줄 수
+    flush_interval: 첫 줄을 받은 뒤 배치를 모으는 최대 시간(초)
+    fsync: "none" = OS에 맡김, "batch" = 배치마다, "interval" = fsync_interval초마다
+    """
+
+    def __init__(self, path, max_queue=10000, max_batch=512, flush_interval=0.05,
+                 fsync="none", fsync_interval=1.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync 정책은 {FSYNC_POLICIES} 중 하나여야 합니다: {fsync}")
+        self.path = path
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.file = None
+        self.task = None
+        self.position = 0  # 파일에 실제로 기록된 바이트 위치
+        self.last_fsync = time.monotonic()
+        # 지표
+        self.lines_written = 0
+        self.batches_written = 0
+        self.max_depth = 0
+        self.backpressure_waits = 0
+        self.backpressure_seconds = 0.0
+        self.lag = metrics.Histogram()  # 줄을 큐에 넣은 때부터 파일에 쓸 때까지 (배치의 가장 오래된 줄)
+
+    async def start(self):
+        self.file = open(self.path, "ab")
+        self.position = self.file.tell()
+        self.task = asyncio.create_task(self._run())
+        return self
+
+    async def close(self):
+        """남은 줄을 모두 기록하고 파일 닫기"""
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+        self._fsync()
+        self.file.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def encode(self, data, **extra):
+        record = {"timestamp": datetime.now().isoformat(), **extra, "data": data}
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    async def write(self, data, **extra):
+        """이벤트 한 개를 큐에 넣음 (extra는 "game" 같은 바깥 필드)"""
+        await self.write_line(self.encode(data, **extra))
+
+    async def write_json(self, text, **extra):
+        """이미 JSON 텍스트인 이벤트를 다시 인코딩하지 않고 큐에 넣음 (한 줄이 아니면 write())"""
+        if "\n" in text:
+            await self.write(json.loads(text), **extra)
+            return
+        head = json.dumps({"timestamp": datetime.now().isoformat(), **extra}, ensure_ascii=False)
+        await self.write_line(f'{head[:-1]}, "data": {text}}}\n')
+
+    async def write_many(self, records, **extra):
+        """이벤트 여러 개를 큐 항목 하나로 (한 번에 이어서 기록됨)"""
+        await self.write_line("".join(self.encode(data, **extra) for data in records))
+
+    async def write_line(self, line):
+        item = (time.perf_counter(), line)
+        if self.queue.full():
+            self.backpressure_waits += 1
+            start = time.perf_counter()
+            await self.queue.put(item)
+            self.backpressure_seconds += time.perf_counter() - start
+        else:
+            self.queue.put_nowait(item)
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def metrics(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "lines_written": self.lines_written,
+            "batches_written": self.batches_written,
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_seconds": round(self.backpressure_seconds, 6),
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self.queue.get()
+            if item is None:
+                break
+            oldest, line = item
+            batch = [line]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    if self.queue.empty():
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    else:
+                        item = self.queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item[1])
+            await loop.run_in_executor(None, self._write_batch, batch)
+            if metrics.enabled:
+                self.lag.record(time.perf_counter() - oldest)
+
+    def _write_batch(self, batch):
+        data = "".join(batch).encode("utf-8")
+        self.file.write(data)
+        self.file.flush()
+        self.position += len(data)
+        self.lines_written += data.count(b"\n")  # 항목 하나에 여러 줄일 수 있음 (write_many)
+        self.batches_written += 1
+        if self.fsync == "batch":
+            self._fsync()
+        elif self.fsync == "interval" and time.monotonic() - self.last_fsync >= self.fsync_interval:
+            self._fsync()
+
+    def _fsync(self):
+        if self.fsync != "none":
+            os.fsync(self.file.fileno())
+            self.last_fsync = time.monotonic()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버 실행 중 지표 (명령별 지연 히스토그램, 팬아웃 시간, 이벤트 루프 지연, 샘플링 프로파일러)
+설명: 값을 기록할 때는 버킷 하나의 카운트만 올리고(고정 버킷, 이분 탐색), 요약은 요청할 때만 만든다.
+      enabled = False이면 기록 함수가 바로 돌아온다 (오버헤드 비교용).
+      서버는 METRICS 명령(JSON)과 --metrics-port의 HTTP 엔드포인트(http_api.py)로 내보낸다.
+
+  commands     명령 종류별 지연: 상태 변경 명령은 처리 큐에 넣은 때부터 처리가 끝날 때까지,
+               읽기 명령(SCORE/STATS 등)은 메시지를 받은 때부터 응답을 예약할 때까지
+  fanout       STATE/DELTA/방 메시지 하나를 모든 구독자 큐에 넣는 데 걸린 시간
+  loop_lag     LOOP_LAG_INTERVAL마다 잰 이벤트 루프 지연 (잠든 시간 - 요청한 시간)
+  bytes_in     받은 메시지 바이트 (보낸 바이트는 fanout.stats["bytes_sent"])
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+# 버킷 상한 (초): 10us ~ 10s, 1-2-5 간격. 마지막 버킷은 그보다 큰 값
+BOUNDS = [m * 10.0 ** e for e in range(-5, 1) for m in (1, 2, 5)] + [10.0]
+LOOP_LAG_INTERVAL = 0.1
+PROFILE_INTERVAL = 0.005    # 프로파일러 샘플 간격 (초)
+PROFILE_DEPTH = 40          # 샘플마다 남길 최대 호출 깊이
+
+enabled = True
+bytes_in = 0
+
+class Histogram:
+    """고정 버킷 지연 히스토그램 (초 단위로 기록)"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """버킷 상한으로 어림한 p 백분위 (최댓값을 넘지 않음)"""
+        if not self.count:
+            return 0.0
+        rank = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BOUNDS[i] if i < len(BOUNDS) else self.max, self.max)
+        return self.max
+
+    def summary(self):
+        """요약 (ms)"""
+        ms = lambda s: round(s * 1e3, 3)
+        return {"count": self.count, "mean_ms": ms(self.total / self.count) if self.count else 0.0,
+                "p50_ms": ms(self.percentile(50)), "p90_ms": ms(self.percentile(90)),
+                "p99_ms": ms(self.percentile(99)), "max_ms": ms(self.max)}
+
+commands = {}               # 명령 종류 -> Histogram
+fanout = Histogram()
+loop_lag = Histogram()
+
+def observe_command(kind, seconds):
+    if enabled:
+        hist = commands.get(kind)
+        if hist is None:
+            hist = commands[kind] = Histogram()
+        hist.record(seconds)
+
+def observe_fanout(seconds):
+    if enabled:
+        fanout.record(seconds)
+
+def count_in(message):
+    global bytes_in
+    if enabled:
+        bytes_in += len(message)
+
+async def sample_loop_lag(interval=LOOP_LAG_INTERVAL):
+    """이벤트 루프 지연 측정 태스크 (서버 main()에서 시작)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        if enabled:
+            loop_lag.record(max(0.0, loop.time() - t0 - interval))
+
+# ---------------------------------------------------------------- 프로파일러
+
+class SamplingProfiler:
+    """이벤트 루프 스레드의 호출 스택을 일정 간격으로 훑는 프로파일러 (켜 둔 동안만 스레드가 돎)"""
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.thread = None
+        self.target = None
+        self.stop_event = threading.Event()
+        self.samples = 0
+        self.functions = Counter()  # 스택 맨 위 함수 -> 샘플 수 (자기 시간)
+        self.stacks = Counter()     # "바깥;...;안쪽" -> 샘플 수 (flame graph용 collapsed 형식)
+        self.started = self.stopped = None
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self):
+        """호출한 스레드(이벤트 루프)를 대상으로 샘플링 시작"""
+        if self.running:
+            return
+        self.target = threading.get_ident()
+        self.samples = 0
+        self.functions.clear()
+        self.stacks.clear()
+        self.started = time.time()
+        self.stopped = None
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.running:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+            self.stopped = time.time()
+        return self.report()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < PROFILE_DEPTH:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples += 1
+            self.functions[names[0]] += 1
+            self.stacks[";".join(reversed(names))] += 1
+
+    def report(self, top=20):
+        return {
+            "running": self.running,
+            "samples": self.samples,
+            "seconds": round((self.stopped or time.time()) - self.started, 3) if self.started else 0.0,
+            "top": [{"function": name, "samples": n, "ratio": round(n / self.samples, 4)}
+                    for name, n in self.functions.most_common(top)],
+            "stacks": [f"{stack} {n}" for stack, n in self.stacks.most_common(top)],
+        }
+
+profiler = SamplingProfiler()
+
+def profile_command(action):
+    """"start" / "stop" / 그 밖(현재 결과) -> 프로파일러 결과"""
+    if action == "start":
+        profiler.start()
+        return profiler.report()
+    if action == "stop":
+        return profiler.stop()
+    return profiler.report()
+
+# ---------------------------------------------------------------- 내보내기
+
+def snapshot(rooms=(), writers=None, fanout_stats=None, compression=None, hibernation=None):
+    """지금까지의 지표 (JSON으로 보낼 수 있는 dict)
+
+    writers: {"log": LogWriter, ...} (큐 깊이와 기록 지연), fanout_stats: fanout.stats,
+    compression: compression.summary() (압축 전후 바이트, 압축률, 압축 CPU 시간),
+    hibernation: hibernate.summary() (휴면/되살린 게임 수, 되살리기 시간)
+    """
+    rooms = list(rooms)
+    return {
+        "enabled": enabled,
+        "commands": {kind: hist.summary() for kind, hist in sorted(commands.items())},
+        "fanout": fanout.summary(),
+        "loop_lag": loop_lag.summary(),
+        "writers": {name: {**w.metrics(), "lag": w.lag.summary()} for name, w in (writers or {}).items() if w},
+        "games": len(rooms),
+        "clients": {room.game_id: len(room.clients) for room in rooms if room.clients},
+        "bytes_in": bytes_in,
+        "bytes_out": (fanout_stats or {}).get("bytes_sent", 0),
+        "frames": dict(fanout_stats or {}),
+        "compression": compression or {},
+        "hibernation": hibernation or {},
+        "profiler": {"running": profiler.running, "samples": profiler.samples},
+    }
+
+def _histogram_lines(name, hist, labels=""):
+    sep = "," if labels else ""
+    lines, seen = [], 0
+    for bound, n in zip(BOUNDS, hist.counts):
+        seen += n
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{bound:g}"}} {seen}')
+    lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {hist.count}')
+    lines.append(f"{name}_sum{{{labels}}} {hist.total:.6f}" if labels else f"{name}_sum {hist.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {hist.count}" if labels else f"{name}_count {hist.count}")
+    return lines
+
+def render_text(rooms=(), writers=None, fanout_stats=None, compression=None, hibernation=None) -> str:
+    """Prometheus 텍스트 형식"""
+    lines = ["# TYPE bb_command_seconds histogram"]
+    for kind, hist in sorted(commands.items()):
+        lines += _histogram_lines("bb_command_seconds", hist, f'command="{kind}"')
+    lines.append("# TYPE bb_fanout_seconds histogram")
+    lines += _histogram_lines("bb_fanout_seconds", fanout)
+    lines.append("# TYPE bb_loop_lag_seconds histogram")
+    lines += _histogram_lines("bb_loop_lag_seconds", loop_lag)
+    lines.append("# TYPE bb_writer_lag_seconds histogram")
+    for name, w in (writers or {}).items():
+        if w:
+            lines += _histogram_lines("bb_writer_lag_seconds", w.lag, f'writer="{name}"')
+            lines.append(f'bb_writer_queue_depth{{writer="{name}"}} {w.queue.qsize()}')
+    rooms = list(rooms)
+    lines.append(f"bb_games {len(rooms)}")
+    for room in rooms:
+        if room.clients:
+            game = room.game_id.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'bb_clients{{game="{game}"}} {len(room.clients)}')
+    lines.append(f"bb_bytes_in_total {bytes_in}")
+    for key, value in (fanout_stats or {}).items():
+        lines.append(f"bb_{key}_total {value}")
+    for key, value in (compression or {}).items():
+        if value is not None:
+            name = f"bb_compression_{key}" if key == "ratio" else f"bb_compression_{key}_total"
+            lines.append(f"{name} {value}")
+    for key, value in (hibernation or {}).items():
+        if value is not None:
+            lines.append(f"bb_hibernate_{key} {value}")
+    return "\n".join(lines) + "\n"
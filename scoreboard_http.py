@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 점수판 (WebSocket 세션 없이 점수만 보는 위젯/제휴 사이트/캐시용)
+사용법: python server_websocket.py --http-port 8080
+경로:
+  GET /games              모든 게임 요약 {"games": [{"game", "seq", "inning", "away", "home", "game_over"}, ...]}
+  GET /games/<id>         그 게임의 마지막 STATE (WebSocket 관중이 받는 것과 같은 bytes)
+  GET /games/<id>/events  SSE: 접속하면 STATE, 이후 바뀔 때마다 STATE (RESET 등 방 브로드캐스트 포함)
+설명: 응답에는 버전 ETag(게임은 STATE 순번, 요약은 전체 발행 횟수와 방 집합 세대)를 붙이고, If-None-Match가
+      같으면 본문 없이 304를 돌려준다. 본문은 인코딩해 둔 STATE 프레임(GameRoom.snapshot_frame)으로
+      만들고, 완성된 응답 bytes를 버전마다 한 번만 만들어 둔다.
+      SSE 연결은 fanout.Subscriber로 방에 붙으므로 느린 소비자 정책과 프레임 캐시를 그대로 쓴다.
+      ETag에는 프로세스 시작 시각이 들어가 서버를 다시 띄우면(순번이 0부터 다시 시작해도) 바뀐다.
+      샤드 모드에서는 워커들이 같은 포트를 나눠 받고, 남의 게임은 처음 요청에 주인 워커에게 있는지 묻고
+      503(Retry-After: 1)을 돌려준다. 있는 게임이면 그때부터 사본 구독, 없으면 404 (방은 만들지 않음). 요약은 요청을 받은 워커의 메모리에 있는 게임만 보여준다
+      (휴면 게임은 빠지고, /games/<id>로 요청하면 되살아난다).
+"""
+
+import json
+import time
+import weakref
+
+from websockets.exceptions import ConnectionClosed
+
+import game_room
+import http_api
+from fanout import Subscriber
+
+BOOT = f"{int(time.time()):x}"
+SUMMARY_FIELDS = ("inning", "away", "home", "game_over")
+SSE_QUEUE_SIZE = 16
+NO_CACHE = "no-cache"   # 캐시해도 되지만 매번 ETag로 확인
+
+# HTTP 점수판 지표
+stats = {"full": 0, "not_modified": 0, "streams": 0}
+
+def etag_matches(request, etag) -> bool:
+    """If-None-Match에 etag가 있는지 ("*", 여러 개, W/ 접두어 허용)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def responses(etag, body):
+    """버전 하나의 (ETag, 200 응답, 304 응답) bytes"""
+    headers = {"ETag": etag, "Cache-Control": NO_CACHE}
+    return (etag, http_api.response(200, "application/json", body, headers),
+            http_api.response(304, "application/json", b"", headers))
+
+def reply(request, cached):
+    if etag_matches(request, cached[0]):
+        stats["not_modified"] += 1
+        return cached[2]
+    stats["full"] += 1
+    return cached[1]
+
+class EventStream:
+    """SSE 연결을 fanout.Subscriber가 쓰는 websocket처럼 보이게 함 (JSON 프레임 하나 -> 이벤트 하나)"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.remote_address = writer.get_extra_info("peername")
+
+    async def send(self, frame, text=True):
+        try:
+            self.writer.write(b"data: " + frame + b"\n\n")
+            await self.writer.drain()
+        except ConnectionError as e:
+            raise ConnectionClosed(None, None) from e
+
+    async def close(self, code=1000, reason=""):
+        self.writer.close()
+
+class Scoreboard:
+    """HTTP 점수판 경로
+
+    sync(game_id) -> True(볼 수 있음)/False(주인에게 확인 중)/None(없는 게임): 샤드 모드에서 남의 게임 확인
+    (생략하면 모든 방이 이 프로세스에 있음)
+    """
+
+    def __init__(self, rooms, sync=None):
+        self.rooms = rooms
+        self.sync = sync
+        self.cache = weakref.WeakKeyDictionary()  # GameRoom -> responses() (휴면 등으로 방이 사라지면 같이 사라짐)
+        self.summary = None     # 전체 요약의 responses()
+
+    def routes(self):
+        return {"/games": self.games, "/games/": self.game}
+
+    def room_for(self, game_id):
+        """-> (방, None) 또는 (None, 오류 응답). 없는 게임의 방은 만들지 않는다"""
+        ready = self.sync(game_id) if self.sync is not None else True
+        if ready is False:
+            return None, http_api.response(503, "text/plain", "syncing\n", {"Retry-After": "1"})
+        room = self.rooms.find(game_id) if ready else None
+        if room is None:
+            return None, http_api.response(404, "text/plain", "no such game\n")
+        return room, None
+
+    def game(self, request):
+        game_id, _, tail = request.rest.partition("/")
+        if not game_id or tail not in ("", "events"):
+            return http_api.response(404, "text/plain", "not found\n")
+        room, error = self.room_for(game_id)
+        if error is not None:
+            return error
+        if tail == "events":
+            return self.event_stream(room)
+        etag = f'"{BOOT}-{room.seq}"'
+        cached = self.cache.get(room)
+        if cached is None or cached[0] != etag:
+            cached = self.cache[room] = responses(etag, room.snapshot_frame())
+        return reply(request, cached)
+
+    def games(self, request):
+        # 발행 횟수만으로는 방이 하나 내려가고 다른 하나가 되살아난 경우를 구분하지 못한다
+        etag = f'"{BOOT}-{game_room.stats["published"]}-{self.rooms.generation}"'
+        if self.summary is None or self.summary[0] != etag:
+            games = [{"game": room.game_id, "seq": room.seq, **{k: room.last_snapshot.get(k) for k in SUMMARY_FIELDS}}
+                     for room in self.rooms]
+            self.summary = responses(etag, json.dumps({"games": games}, ensure_ascii=False))
+        return reply(request, self.summary)
+
+    def event_stream(self, room):
+        async def stream(reader, writer):
+            client = Subscriber(EventStream(writer), SSE_QUEUE_SIZE, "latest")
+            room.clients.add(client)
+            stats["streams"] += 1
+            try:
+                client.push(room.snapshot_frame(), "STATE")
+                # 클라이언트가 연결을 닫을 때까지 (SSE는 클라이언트가 보내는 것이 없음)
+                while await reader.read(1024):
+                    pass
+            except ConnectionError:
+                pass
+            finally:
+                room.leave(client)
+                client.close()
+                stats["streams"] -= 1
+        return 200, "text/event-stream", stream, {"Cache-Control": "no-cache"}
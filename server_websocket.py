@@ -1,398 +1,446 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import argparse
 import asyncio
-import websockets
 import json
-from datetime import datetime
+import os
+import time
+import websockets
+from urllib.parse import parse_qs, urlsplit
+
+import codec
+import compression
+import fanout
+import hibernate
+import http_api
+import log_replay
+import metrics
+from scoreboard_http import Scoreboard
+from event_store import EventStore
+from fanout import Subscriber
+from game_engine import batch_error, command_error, command_event
+from game_room import DEFAULT_GAME, RoomRegistry, game_id_from_path
+from log_writer import LogWriter
+from wp_table import WinProbTable
 
 PORT = 5000
 LOG_FILE = "game_log_websocket.jsonl"
-clients = set()
-state = {}
-
-def init_state():
-    return {
-        "inning": 1,
-        "half": "AWAY",
-        "outs": 0,
-        "balls": 0,
-        "strikes": 0,
-        "home": 0,
-        "away": 0,
-        "runners": set(),
-        "current_batter": None,
-        "game_over": False,
-        "away_index": 0,
-        "home_index": 0,
-    }
-
-state = init_state()
-
-def log_event(data):
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        line = json.dumps({"timestamp": datetime.now().isoformat(), "data": data}, ensure_ascii=False)
-        f.write(line + "\n")
-
-def runners_list():
-    return [b for b in ["1B", "2B", "3B"] if b in state["runners"]]
-
-def reset_count():
-    state["balls"] = 0
-    state["strikes"] = 0
-
-def advance_half():
-    state["outs"] = 0
-    reset_count()
-    state["runners"].clear()
-    state["current_batter"] = None
-    if state["half"] == "AWAY":
-        state["half"] = "HOME"
+EVENT_DIR = "game_events"       # 입력 명령 스트림과 스냅샷 저장 위치
+SNAPSHOT_EVERY = 10000          # 이벤트 몇 개마다 스냅샷을 저장할지
+SEND_QUEUE_SIZE = 64            # 접속마다 대기 가능한 송신 프레임 수
+SLOW_CLIENT_POLICY = "latest"   # 느린 접속: "latest"(중간 STATE 버림) / "disconnect"
+READ_COMMANDS = ("JOIN", "PROTO", "RESYNC", "RESUME", "SCORE", "STATS", "METRICS")  # 받은 자리에서 지연을 재는 명령
+rooms = RoomRegistry()
+compression_options = compression.serve_options()   # main()에서 --compression 인자로 바꿈
+
+log_writer = None   # main()에서 시작하는 LogWriter
+event_store = None  # main()에서 시작하는 EventStore (입력 명령 스트림)
+bus = None          # 샤드 모드(shard.py)에서 워커 사이 버스 (shard.Bus)
+
+async def log_event(data, game_id=DEFAULT_GAME):
+    """백그라운드 기록기 큐에 로그 한 줄 추가"""
+    await log_writer.write(data, game=game_id)
+
+async def log_events(records, game_id=DEFAULT_GAME):
+    """여러 줄을 한 번에 이어서 기록"""
+    await log_writer.write_many(records, game=game_id)
+
+def request_path(websocket):
+    """접속 요청 경로 (websockets 버전에 따라 위치가 다름)"""
+    request = getattr(websocket, "request", None)
+    if request is not None:
+        return request.path
+    return getattr(websocket, "path", "/")
+
+def query_param(path, name, default=""):
+    values = parse_qs(urlsplit(path).query).get(name)
+    return values[0] if values else default
+
+async def apply_command(room, event):
+    """입력 명령을 게임 상태에 반영하고 이벤트 스트림에 기록 (방의 처리 태스크에서만 호출)
+
+    스냅샷 번호가 상태와 어긋나지 않도록 apply와 append 사이에 await가 없어야 한다.
+    """
+    res = room.apply(event)
+    if event_store is not None:
+        await event_store.append(rooms, room.game_id, event)
+    return res
+
+async def process_command(room, client, event):
+    """방의 처리 태스크가 명령 하나를 실행 (같은 방의 다른 명령과 섞이지 않음)
+
+    요청 ID가 붙은 명령(fanout.RequestReply)은 응답을 방에 기억해 두고, 같은 ID가 다시 오면
+    (재접속한 기록원의 재시도) 실행하지 않고 그때 응답만 다시 보낸다.
+    RESET/SET_RUNNERS처럼 기록원에게 직접 가는 응답이 없는 명령도 ID가 있으면 ACK를 보낸다.
+    """
+    if isinstance(client, fanout.RequestReply):
+        done = room.requests.get(client.request_id)
+        if done is not None:
+            client.send(done)
+            return
+        await execute_command(room, client, event)
+        if client.last is None:
+            client.send({"type": "ACK", "msg": event["type"]})
+        room.remember(client.request_id, client.last)
     else:
-        state["half"] = "AWAY"
-        state["inning"] += 1
-
-def score_run(n=1):
-    if state["half"] == "AWAY":
-        state["away"] += n
-    else:
-        state["home"] += n
-
-def advance_runners(bases):
-    new_runners = set()
-    scored = 0
-    for r in list(state["runners"]):
-        pos = {"1B":1,"2B":2,"3B":3}.get(r,0)
-        if not pos: continue
-        new_pos = pos + bases
-        if new_pos >= 4:
-            scored += 1
-        elif new_pos == 1: new_runners.add("1B")
-        elif new_pos == 2: new_runners.add("2B")
-        elif new_pos == 3: new_runners.add("3B")
-    state["runners"] = new_runners
-    score_run(scored)
-    return scored
-
-def check_game_over():
-    if state["inning"] >= 9 and state["half"] == "HOME":
-        if state["home"] > state["away"]:
-            state["game_over"] = True
-            return {"type": "END", "winner": "HOME", "home": state["home"], "away": state["away"]}
-    if state["inning"] > 9 and state["half"] == "AWAY" and state["outs"] >= 3:
-        if state["home"] > state["away"]:
-            state["game_over"] = True
-            return {"type": "END", "winner": "HOME", "home": state["home"], "away": state["away"]}
-        elif state["away"] > state["home"]:
-            state["game_over"] = True
-            return {"type": "END", "winner": "AWAY", "home": state["home"], "away": state["away"]}
-    return None
-
-def next_batter():
-    if state["half"] == "AWAY":
-        lineup = state.get("away_lineup", [])
-        idx = state.get("away_index", 0)
-        if lineup:
-            batter = lineup[idx % len(lineup)]
-            state["away_index"] = (idx + 1) % len(lineup)
-            return batter
-    else:
-        lineup = state.get("home_lineup", [])
-        idx = state.get("home_index", 0)
-        if lineup:
-            batter = lineup[idx % len(lineup)]
-            state["home_index"] = (idx + 1) % len(lineup)
-            return batter
-    return "Unknown"
-
-def apply_ab(batter: str, result: str):
-    """타석 결과 처리"""
-    if state.get("game_over"):
-        return {"type": "ERROR", "msg": "게임이 이미 종료되었습니다"}
-    
-    result = result.upper()
-
-    # 타자 이름 처리
-    if batter:
-        state["current_batter"] = batter
-    elif not state.get("current_batter"):
-        state["current_batter"] = next_batter()
-
-    batter_name = state["current_batter"]
-
-    if result == "OUT":
-        state["outs"] += 1
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "STRIKE":
-        state["strikes"] += 1
-        if state["strikes"] >= 3:
-            state["outs"] += 1
-            reset_count()
-            state["current_batter"] = None
-
-    elif result == "BALL":
-        state["balls"] += 1
-        if state["balls"] >= 4:
-            # 4사구 처리
-            new_runners = set()
-            if "3B" in state["runners"] and "2B" in state["runners"] and "1B" in state["runners"]:
-                score_run()
-                new_runners.add("3B")
-                new_runners.add("2B")
-            elif "2B" in state["runners"] and "1B" in state["runners"]:
-                new_runners.add("3B")
-                new_runners.add("2B")
-            elif "1B" in state["runners"]:
-                new_runners.add("2B")
-            if "3B" in state["runners"] and "1B" not in state["runners"]:
-                new_runners.add("3B")
-            if "2B" in state["runners"] and "1B" not in state["runners"]:
-                new_runners.add("2B")
-            
-            new_runners.add("1B")
-            state["runners"] = new_runners
-            reset_count()
-            state["current_batter"] = None
-
-    elif result == "FOUL":
-        if state["strikes"] < 2:
-            state["strikes"] += 1
-
-    elif result == "1B":
-        advance_runners(1)
-        state["runners"].add("1B")
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "2B":
-        advance_runners(2)
-        state["runners"].add("2B")
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "3B":
-        advance_runners(3)
-        state["runners"].add("3B")
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "HR":
-        score_run(1 + len(state["runners"]))
-        state["runners"].clear()
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "SAC_FLY":
-        state["outs"] += 1
-        if "3B" in state["runners"]:
-            score_run()
-            state["runners"].discard("3B")
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "SAC_BUNT":
-        state["outs"] += 1
-        advance_runners(1)
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "ERROR":
-        advance_runners(1)
-        state["runners"].add("1B")
-        reset_count()
-        state["current_batter"] = None
-
-    elif result == "STEAL":
-        if "1B" in state["runners"] and "2B" not in state["runners"]:
-            state["runners"].discard("1B")
-            state["runners"].add("2B")
-        elif "2B" in state["runners"] and "3B" not in state["runners"]:
-            state["runners"].discard("2B")
-            state["runners"].add("3B")
-
-    elif result == "CAUGHT_STEALING":
-        state["outs"] += 1
-        if "1B" in state["runners"]:
-            state["runners"].discard("1B")
-        elif "2B" in state["runners"]:
-            state["runners"].discard("2B")
-
-    elif result == "WILD_PITCH":
-        state["balls"] += 1
-        if state["balls"] >= 4:
-            # 4볼 처리
-            new_runners = set()
-            if "3B" in state["runners"] and "2B" in state["runners"] and "1B" in state["runners"]:
-                score_run()
-                new_runners.add("3B")
-                new_runners.add("2B")
-            elif "2B" in state["runners"] and "1B" in state["runners"]:
-                new_runners.add("3B")
-                new_runners.add("2B")
-            elif "1B" in state["runners"]:
-                new_runners.add("2B")
-            if "3B" in state["runners"] and "1B" not in state["runners"]:
-                new_runners.add("3B")
-            if "2B" in state["runners"] and "1B" not in state["runners"]:
-                new_runners.add("2B")
-            new_runners.add("1B")
-            state["runners"] = new_runners
-            reset_count()
-            state["current_batter"] = None
-        else:
-            advance_runners(1)
-
-    elif result == "BALK":
-        advance_runners(1)
+        await execute_command(room, client, event)
+
+async def execute_command(room, client, event):
+    t = event["type"]
+    if room.read_only:
+        # 재방송 방 (샤드 모드에서 다른 워커가 전달한 명령도 여기서 거른다)
+        client.send({"type": "ERROR", "msg": "Replay game is read-only"})
+        return
+    if t == "BATCH":
+        await process_batch(room, client, event)
+        return
+    res = await apply_command(room, event)
+
+    if t == "AB":
+        # 로그 기록 -> ACK 전송 -> 같은 게임의 모든 클라이언트에게 상태 브로드캐스트
+        await log_event(res, room.game_id)
+        client.send(res)
+        snapshot = room.publish_state()
+        await log_event(snapshot, room.game_id)
+
+    elif t == "RESET":
+        await log_event(res, room.game_id)
+        # 모든 클라이언트에게 리셋 알림 후 초기 상태 전송
+        room.broadcast(res)
+        room.publish_state()
+
+    elif t == "SET_RUNNERS":
+        # 모든 클라이언트에게 업데이트된 상태 전송
+        room.publish_state()
+
+    elif t == "SET_LINEUP":
+        # 확인 메시지 전송
+        client.send(res)
+        print(f"[LINEUP] {room.game_id} Away: {res['away_lineup']}")
+        print(f"[LINEUP] {room.game_id} Home: {res['home_lineup']}")
+
+async def process_batch(room, client, event):
+    """BATCH: AB/SET_RUNNERS 여러 개를 한꺼번에 반영
+
+    전부 반영하거나(상태 사본에 미리 적용해 봄) 하나도 반영하지 않는다. 이벤트 스트림에는 BATCH 한 줄,
+    로그에는 AB마다 응답과 STATE 쌍(명령 하나씩 보낼 때와 같은 형식)을 한 번에 이어서 기록하고,
+    구독자에게는 마지막 STATE(DELTA)만 한 번 보낸다. 응답은 AB 응답 목록을 담은 ACK 하나.
+    """
+    failed = batch_error(room.state, event["events"])
+    if failed is not None:
+        client.send({"type": "ERROR", "msg": failed[1], "index": failed[0]})
+        return
+    results, records = [], []
+    for e in event["events"]:
+        res = room.apply(e)
+        if res is not None:
+            results.append(res)
+            records.append(res)
+            records.append(room.state_payload())
+    if event_store is not None:
+        await event_store.append(rooms, room.game_id, event)
+    await log_events(records, room.game_id)
+    client.send({"type": "ACK", "msg": "BATCH", "results": results})
+    room.publish_state()
+
+def resume(room, client, since):
+    """재접속한 관중에게 since 다음 순번부터 놓친 DELTA만 보냄
+
+    놓친 DELTA는 REPLAY 프레임 하나로 묶는다 (송신 큐가 넘쳐 DELTA가 버려지지 않도록).
+    방의 재생 버퍼보다 오래됐거나 순번을 알 수 없으면 순번이 붙은 전체 STATE를 보낸다.
+    """
+    client.delta = True
+    frame = room.replay_frame(since, client.codec) if since is not None else None
+    if frame is None:
+        client.push(room.snapshot_frame(True, client.codec), "STATE")
+    elif frame:
+        client.push(frame, "REPLAY")
+
+def bad_request_id(value):
+    """요청 ID는 문자열이나 정수만 (응답에 그대로 붙이고 재시도 중복 제거 키로 쓰므로)"""
+    return value is not None and (isinstance(value, bool) or not isinstance(value, (str, int)))
+
+def parse_seq(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
-    # 3아웃 체크
-    if state["outs"] >= 3:
-        advance_half()
-    
-    # 게임 종료 체크
-    game_end = check_game_over()
-    if game_end:
-        return game_end
+def metrics_snapshot():
+    return metrics.snapshot(rooms, {"log": log_writer, "events": event_store and event_store.writer}, fanout.stats,
+                            compression.summary(), hibernate.summary(rooms))
 
+def metrics_routes():
+    """--metrics-port HTTP 경로"""
     return {
-        "type": "ACK",
-        "batter": batter_name,
-        "result": result,
-        "home": state["home"],
-        "away": state["away"],
-        "inning": state["inning"],
-        "half": state["half"]
+        "/metrics": lambda request: (200, "text/plain; version=0.0.4",
+                                     metrics.render_text(rooms, {"log": log_writer,
+                                                                 "events": event_store and event_store.writer},
+                                                         fanout.stats, compression.summary(),
+                                                         hibernate.summary(rooms))),
+        "/metrics.json": lambda request: (200, "application/json",
+                                          json.dumps(metrics_snapshot(), ensure_ascii=False)),
+        # /profile?action=start|stop (생략하면 지금까지의 샘플)
+        "/profile": lambda request: (200, "application/json",
+                                     json.dumps(metrics.profile_command(request.query.get("action")),
+                                                ensure_ascii=False)),
     }
 
-def current_state():
-    """현재 게임 상태 반환"""
-    half_str = "초" if state["half"] == "AWAY" else "말"
-    return {
-        "type": "STATE",
-        "inning": f"{state['inning']}회 {half_str}",
-        "outs": state["outs"],
-        "balls": state["balls"],
-        "strikes": state["strikes"],
-        "home": state["home"],
-        "away": state["away"],
-        "runners": runners_list(),
-        "current_batter": state.get("current_batter"),
-        "game_over": state.get("game_over", False)
-    }
+def sync_room(game_id):
+    """HTTP 점수판: 이 워커에서 게임을 볼 수 있으면 True, 주인에게 확인 중이면 False, 없는 게임이면 None"""
+    if bus is None or bus.owns(game_id):
+        return True
+    return bus.probe(game_id)
+
+def select_subprotocol(connection, subprotocols):
+    """클라이언트가 제안한 코덱 하위 프로토콜 중 첫 번째 (없으면 하위 프로토콜 없이 JSON)"""
+    for subprotocol in subprotocols:
+        if subprotocol in codec.SUBPROTOCOLS:
+            return subprotocol
+    return None
 
-async def broadcast(message):
-    """모든 연결된 클라이언트에게 메시지 전송"""
-    if clients:
-        await asyncio.gather(
-            *[client.send(message) for client in clients],
-            return_exceptions=True
-        )
+def serve(host, port, **kwargs):
+    """handler로 WebSocket 서버 시작 (코덱 하위 프로토콜과 압축 정책 협상 포함)"""
+    return websockets.serve(handler, host, port, select_subprotocol=select_subprotocol,
+                            **{**compression_options, **kwargs})
 
 async def handler(websocket):
     """클라이언트 연결 처리"""
-    clients.add(websocket)
-    print(f"[JOIN] {websocket.remote_address} (총 {len(clients)}명 접속)")
+    path = request_path(websocket)
+    room = rooms.get(game_id_from_path(path))
+    # 코덱: 하위 프로토콜(bbp.json/bbp.bin) 또는 ?codec=json|bin, 기본은 JSON
+    using = codec.select(websocket.subprotocol, query_param(path, "codec"))
+    client = Subscriber(websocket, SEND_QUEUE_SIZE, SLOW_CLIENT_POLICY, using)
+    # ?proto=delta: 접속 시 전체 STATE(seq 포함), 이후에는 변경분(DELTA)만 수신
+    # ?since=<순번>: 재접속. DELTA 프로토콜로 그 순번 이후에 놓친 DELTA만 받음
+    client.delta = query_param(path, "proto") == "delta"
+    since = query_param(path, "since")
+    room.clients.add(client)
+    if bus is not None:
+        bus.watch(room)
+    print(f"[JOIN] {websocket.remote_address} -> {room.game_id} (총 {len(room.clients)}명 접속)")
     
     try:
         # 접속 시 현재 상태 전송
-        await websocket.send(json.dumps(current_state(), ensure_ascii=False))
+        if since:
+            resume(room, client, parse_seq(since))
+        else:
+            client.push(room.snapshot_frame(client.delta, using), "STATE")
         
         async for message in websocket:
+            received = time.perf_counter()
+            metrics.count_in(message)
             try:
-                evt = json.loads(message)
+                evt = using.decode(message)
+                if not isinstance(evt, dict):
+                    raise ValueError("메시지는 객체여야 합니다")
                 t = evt.get("type", "").upper()
                 
-                if t == "AB":
-                    # 타석 결과 처리
-                    batter = evt.get("batter", "")
-                    result = evt.get("result", "")
-                    res = apply_ab(batter, result)
-                    
-                    # 로그 기록
-                    log_event(res)
-                    
-                    # ACK 전송
-                    await websocket.send(json.dumps(res, ensure_ascii=False))
-                    
-                    # 모든 클라이언트에게 상태 브로드캐스트
-                    state_msg = json.dumps(current_state(), ensure_ascii=False)
-                    log_event(current_state())
-                    await broadcast(state_msg)
-                    
+                if t == "JOIN":
+                    # 다른 게임으로 이동 (경로 대신 첫 메시지로 게임 지정)
+                    room.leave(client)
+                    room = rooms.get(str(evt.get("game") or DEFAULT_GAME))
+                    room.clients.add(client)
+                    if bus is not None:
+                        bus.watch(room)
+                    print(f"[JOIN] {websocket.remote_address} -> {room.game_id} (총 {len(room.clients)}명 접속)")
+                    client.push(room.snapshot_frame(client.delta, using), "STATE")
+                
+                elif t == "PROTO":
+                    # 접속 후 프로토콜 전환 ("delta" / "full")
+                    client.delta = str(evt.get("mode", "")).lower() == "delta"
+                    client.push(room.snapshot_frame(client.delta, using), "STATE")
+                
+                elif t == "RESYNC":
+                    # DELTA 순번 공백을 발견한 클라이언트에게 전체 상태 재전송
+                    client.push(room.snapshot_frame(client.delta, using), "STATE")
+
+                elif t == "RESUME":
+                    # {"type": "RESUME", "seq": 마지막으로 받은 순번} -> 놓친 DELTA만 (접속 후 ?since=와 같음)
+                    resume(room, client, parse_seq(evt.get("seq")))
+                
+                elif t in ("AB", "RESET", "SET_RUNNERS", "SET_LINEUP", "BATCH"):
+                    # 상태 변경은 방의 처리 큐로 (이 접속의 명령 순서는 그대로 유지됨)
+                    # "id"가 있으면 응답(ACK/END/ERROR)에 그대로 붙여 돌려준다
+                    request_id = evt.get("id")
+                    event = command_event(evt)
+                    error = command_error(event)
+                    if bad_request_id(request_id):
+                        client.send({"type": "ERROR", "msg": "Bad request id"})
+                    elif error:
+                        fanout.reply_to(client, request_id).send({"type": "ERROR", "msg": error})
+                    elif not room.owned:
+                        # 샤드 모드: 다른 워커가 가진 게임이면 주인 워커가 실행
+                        bus.forward(room, client, event, request_id)
+                    else:
+                        await room.submit(process_command, fanout.reply_to(client, request_id), event)
+
                 elif t == "SCORE":
-                    # 현재 점수판 요청
-                    await websocket.send(json.dumps(current_state(), ensure_ascii=False))
-                    
-                elif t == "RESET":
-                    # 게임 리셋
-                    global state
-                    state = init_state()
-                    log_event({"type": "ACK", "msg": "RESET"})
-                    
-                    # 모든 클라이언트에게 리셋 알림
-                    reset_msg = json.dumps({"type": "ACK", "msg": "RESET"}, ensure_ascii=False)
-                    await broadcast(reset_msg)
-                    
-                    # 초기 상태 전송
-                    state_msg = json.dumps(current_state(), ensure_ascii=False)
-                    await broadcast(state_msg)
-                    
-                elif t == "SET_RUNNERS":
-                    # 주자 수동 조정
-                    runners = evt.get("runners", [])
-                    state["runners"] = set(runners)
-                    
-                    # 모든 클라이언트에게 업데이트된 상태 전송
-                    state_msg = json.dumps(current_state(), ensure_ascii=False)
-                    await broadcast(state_msg)
-                    
-                elif t == "SET_LINEUP":
-                    # 라인업 설정
-                    away_lineup = evt.get("away_lineup", [])
-                    home_lineup = evt.get("home_lineup", [])
-                    
-                    # 라인업을 전역 변수로 저장
-                    state["away_lineup"] = away_lineup
-                    state["home_lineup"] = home_lineup
-                    
-                    # 확인 메시지 전송
-                    await websocket.send(json.dumps({
-                        "type": "ACK",
-                        "msg": "LINEUP_SET",
-                        "away_lineup": away_lineup,
-                        "home_lineup": home_lineup
-                    }, ensure_ascii=False))
-                    
-                    print(f"[LINEUP] Away: {away_lineup}")
-                    print(f"[LINEUP] Home: {home_lineup}")
+                    # 현재 점수판 요청 (처리 태스크를 기다리지 않고 인코딩해 둔 마지막 STATE 전송)
+                    client.push(room.snapshot_frame(client.delta, using), "STATE")
+
+                elif t == "STATS":
+                    # 타자별/팀별 누적 기록 요청 ("batter", "team"으로 거를 수 있음)
+                    if room.owned:
+                        client.send(room.stats_message(evt.get("batter"), evt.get("team")))
+                    else:
+                        bus.forward(room, client, {"type": "STATS", "batter": evt.get("batter"), "team": evt.get("team")})
+
+                elif t == "METRICS":
+                    # 이 프로세스의 지표 ("profile": "start"/"stop"이면 샘플링 프로파일러 켜기/끄기)
+                    if "profile" in evt:
+                        client.send({"type": "METRICS", "profile": metrics.profile_command(evt["profile"])})
+                    else:
+                        client.send({"type": "METRICS", **metrics_snapshot()})
+
                 else:
-                    await websocket.send(json.dumps({"type": "ERROR", "msg": "Unknown command"}, ensure_ascii=False))
+                    client.send({"type": "ERROR", "msg": "Unknown command"})
+
+                if t in READ_COMMANDS:
+                    metrics.observe_command(t, time.perf_counter() - received)
                     
-            except json.JSONDecodeError:
-                await websocket.send(json.dumps({"type": "ERROR", "msg": "Bad JSON"}, ensure_ascii=False))
+            except ValueError:
+                client.send({"type": "ERROR", "msg": using.bad_message})
                 
     except websockets.exceptions.ConnectionClosed:
         print(f"[LEAVE] {websocket.remote_address}")
     finally:
-        clients.remove(websocket)
-        print(f"[INFO] 남은 접속자: {len(clients)}명")
-
-async def main():
-    """서버 시작"""
+        room.leave(client)
+        client.close()
+        if bus is not None:
+            bus.forget(client)
+        print(f"[INFO] {room.game_id} 남은 접속자: {len(room.clients)}명")
+
+async def replay(args, index, path):
+    """--replay 로그 하나 재방송"""
+    prefix = f"replay{index}-"
+    print(f"📼 재방송: {path} -> ws://0.0.0.0:{args.port}/{prefix}<game_id> "
+          f"({'최대 속도' if args.replay_speed <= 0 else f'{args.replay_speed:g}배속'})")
+    start = time.perf_counter()
+    sent = await log_replay.replay_log(rooms, path, prefix, args.replay_speed, args.replay_max_gap, args.replay_loop)
+    elapsed = time.perf_counter() - start
+    print(f"📼 재방송 끝: {path} 메시지 {sent}개, {elapsed:.1f}s ({sent / max(elapsed, 1e-9):,.0f}/s)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="야구 경기 기록 시스템 - WebSocket 서버")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--log", default=LOG_FILE, help="ACK/STATE 로그 파일")
+    parser.add_argument("--events", default=EVENT_DIR, help="입력 명령 스트림/스냅샷 디렉터리")
+    parser.add_argument("--recover", action="store_true",
+                        help="시작할 때 스냅샷과 이벤트 스트림으로 모든 게임 상태 복구")
+    parser.add_argument("--snapshot-every", type=int, default=SNAPSHOT_EVERY)
+    parser.add_argument("--wp-table", help="승리 확률/기대 득점 표 (python wp_table.py build로 생성)")
+    parser.add_argument("--metrics-port", type=int,
+                        help="지표 HTTP 포트 (/metrics, /metrics.json, /profile). 생략하면 METRICS 명령으로만")
+    parser.add_argument("--http-port", type=int,
+                        help="HTTP 점수판 포트 (/games, /games/<id>, /games/<id>/events SSE)")
+    parser.add_argument("--no-metrics", action="store_true", help="지연/바이트 지표 기록 끄기")
+    parser.add_argument("--compression", choices=("on", "off"), default="on",
+                        help="permessage-deflate 압축 협상 (off면 클라이언트가 원해도 압축하지 않음)")
+    parser.add_argument("--compression-min-size", type=int, default=compression.MIN_SIZE,
+                        help="이보다 작은 메시지는 압축하지 않음 (bytes)")
+    parser.add_argument("--compression-window", type=int, choices=range(9, 16), default=compression.WINDOW_BITS,
+                        metavar="9-15", help="압축 창 비트 수 (접속마다 버퍼 2^(창+2) bytes)")
+    parser.add_argument("--compression-memory", type=int, choices=range(1, 10), default=compression.MEMORY_LEVEL,
+                        metavar="1-9", help="zlib memLevel (접속마다 버퍼 2^(값+9) bytes)")
+    parser.add_argument("--idle-after", type=float, default=hibernate.IDLE_SECONDS,
+                        help="관중도 명령도 없이 이만큼(초) 쉰 게임을 디스크로 내림 (다음 접속/명령 때 되살림)")
+    parser.add_argument("--max-resident", type=int, default=hibernate.MAX_RESIDENT,
+                        help="메모리에 둘 최대 게임 수 (넘으면 오래 쓰지 않은 게임부터 내림)")
+    parser.add_argument("--no-hibernate", action="store_true", help="게임을 디스크로 내리지 않음")
+    parser.add_argument("--room-ttl", type=float, default=hibernate.ROOM_TTL,
+                        help="관중 없이 이만큼(초) 쉰 재방송 방/사본 방을 메모리에서 지움 (--no-hibernate여도)")
+    parser.add_argument("--replay", nargs="+", default=[], metavar="LOG",
+                        help="지난 경기 로그 재방송 (파일마다 게임 ID 앞에 replay<번호>- 를 붙임)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="재방송 배속 (0이면 기다리지 않고 최대한 빨리)")
+    parser.add_argument("--replay-max-gap", type=float, default=log_replay.MAX_GAP,
+                        help="재방송 중 기다리는 최대 공백 (초)")
+    parser.add_argument("--replay-loop", action="store_true", help="재방송이 끝나면 처음부터 반복")
+    return parser.parse_args(argv)
+
+async def main(args, shard_bus=None):
+    """서버 시작 (shard_bus가 있으면 shard.py의 워커 하나로 실행)"""
+    global log_writer, event_store, rooms, bus, compression_options
     print("="*50)
     print("🏟️  야구 경기 기록 시스템 - WebSocket 서버")
     print("="*50)
-    print(f"📡 서버 주소: ws://0.0.0.0:{PORT}")
-    print(f"📝 로그 파일: {LOG_FILE}")
+    print(f"📡 서버 주소: ws://0.0.0.0:{args.port}")
+    print(f"🎮 게임별 접속: ws://0.0.0.0:{args.port}/<game_id>")
+    print(f"📝 로그 파일: {args.log}")
+    print(f"🗂️  이벤트 스트림: {args.events}")
+    compression_options = compression.serve_options(args.compression == "on", args.compression_min_size,
+                                                    args.compression_window, args.compression_memory)
+    if args.compression == "on":
+        memory = compression.connection_memory(args.compression_window, args.compression_memory)
+        print(f"🗜️  압축: {args.compression_min_size} bytes 이상, 창 {args.compression_window}비트, "
+              f"memLevel {args.compression_memory} (접속당 압축 버퍼 {memory // 1024}KB)")
+    else:
+        print("🗜️  압축: 끔")
+    if args.wp_table or shard_bus is not None:
+        rooms = RoomRegistry(WinProbTable(args.wp_table) if args.wp_table else None, shard_bus)
+    if args.wp_table:
+        print(f"📈 승리 확률 표: {args.wp_table}")
+    if shard_bus is not None:
+        bus = await shard_bus.start(rooms, process_command)
+        print(f"🧩 샤드 워커 {bus.index + 1}/{bus.workers}")
+    
+    metrics.enabled = not args.no_metrics
+    lag_task = asyncio.create_task(metrics.sample_loop_lag())
+    http_server = None
+    if args.metrics_port is not None:
+        http_server = await http_api.serve("127.0.0.1", args.metrics_port, metrics_routes())
+        print(f"📊 지표: http://127.0.0.1:{args.metrics_port}/metrics")
+    scoreboard_server = None
+    if args.http_port is not None:
+        scoreboard = Scoreboard(rooms, sync_room if bus is not None else None)
+        scoreboard_server = await http_api.serve("0.0.0.0", args.http_port, scoreboard.routes(),
+                                                 reuse_port=bus is not None)
+        print(f"🌐 HTTP 점수판: http://0.0.0.0:{args.http_port}/games")
+
+    event_store = EventStore(args.events, args.snapshot_every)
+    await event_store.start(rooms, recover_state=args.recover)
+    if args.recover:
+        print(f"♻️  복구 완료: 게임 {len(rooms)}개, 이벤트 {event_store.next_n - 1}개")
+
+    # 휴면은 복구가 끝난 뒤에 시작 (복구는 실행기 스레드에서 rooms를 채우므로 sweep과 겹치면 안 됨)
+    cold = None
+    if not args.no_hibernate:
+        cold = hibernate.ColdStore(os.path.join(args.events, hibernate.COLD_FILE))
+        rooms.hibernate(cold, args.idle_after, args.max_resident)
+        print(f"💤 휴면: {args.idle_after:g}초 쉰 게임, 메모리 최대 {args.max_resident:,}개 -> {cold.path}")
+    sweep_task = asyncio.create_task(hibernate.sweep_loop(rooms, ttl=args.room_ttl))
     print("✅ 서버 준비 완료! 클라이언트 접속 대기 중...")
     print("="*50)
     
-    async with websockets.serve(handler, "0.0.0.0", PORT):
-        await asyncio.Future()  # 무한 대기
+    try:
+        async with LogWriter(args.log) as log_writer:
+            try:
+                # 샤드 모드에서는 워커들이 같은 포트를 나눠 받는다 (SO_REUSEPORT)
+                async with serve("0.0.0.0", args.port, reuse_port=bus is not None):
+                    replays = [asyncio.create_task(replay(args, i, path)) for i, path in enumerate(args.replay)]
+                    try:
+                        await asyncio.Future()  # 무한 대기
+                    finally:
+                        for task in replays:
+                            task.cancel()
+            finally:
+                # 접속을 모두 닫은 뒤 방마다 큐에 남은 명령 처리
+                await asyncio.gather(*(room.stop() for room in rooms))
+    finally:
+        lag_task.cancel()
+        sweep_task.cancel()
+        for server in (http_server, scoreboard_server):
+            if server is not None:
+                server.close()
+        await event_store.close(rooms)
+        if cold is not None:
+            cold.close()
+        if bus is not None:
+            await bus.close()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(main(parse_args()))
     except KeyboardInterrupt:
-        print("\n\n서버를 종료합니다...")
\ No newline at end of file
+        print("\n\n서버를 종료합니다...")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+멀티 프로세스 샤드 서버
+사용법: python shard.py --workers 4 [--port 5000] [--bus-dir /tmp/bb-bus] [server_websocket.py 옵션...]
+설명: 워커 N개가 SO_REUSEPORT로 같은 포트에서 접속을 나눠 받는다 (어느 워커로 접속해도 된다).
+      게임마다 주인 워커(crc32(게임 ID) % N)가 하나 있어서 상태 변경 명령은 주인만 실행하고,
+      다른 워커에 접속한 기록원의 명령은 로컬 버스(Unix 도메인 소켓)로 주인에게 전달된다.
+      주인은 STATE/브로드캐스트를 그 게임의 관중이 있는 워커들에게 한 번씩 보내고,
+      각 워커가 자기 관중에게 인코딩/팬아웃한다 (외부 브로커 없음).
+
+버스 메시지 (워커 사이, 줄마다 JSON 한 개):
+  {"op": "sub",   "game", "from"[, "probe"]}               사본 워커 -> 주인: 이 게임 STATE를 보내 달라
+                                                           (probe = HTTP 점수판: 없는 게임이면 만들지 말고 missing)
+  {"op": "unsub", "game", "from"}                          사본 워커 -> 주인: 관중이 없어졌으니 그만 보내라
+  {"op": "missing", "game"}                                주인 -> 사본 워커: probe한 게임이 없음
+  {"op": "cmd",   "game", "from", "client", "event", "id"} 사본 워커 -> 주인: 명령 실행 (STATS 포함, id = 요청 ID)
+  {"op": "reply", "client", "msg"}                         주인 -> 사본 워커: 그 기록원에게만 보낼 응답
+  {"op": "state", "game", "seq", "snapshot"}               주인 -> 사본 워커: 새 STATE
+  {"op": "bcast", "game", "msg"}                           주인 -> 사본 워커: 방 전체 메시지 (RESET 등)
+
+워커마다 로그 파일(<이름>.w<번호>.jsonl)과 이벤트 디렉터리(<디렉터리>/w<번호>)를 따로 쓰며,
+자기가 주인인 게임만 기록한다. 따라서 --recover는 같은 워커 수로 재시작할 때만 맞다.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+
+import fanout
+
+SOCKET_NAME = "w{}.sock"
+CONNECT_RETRY = 0.05    # 상대 워커가 아직 버스 소켓을 열지 않았을 때 재시도 간격 (초)
+MISSING_SECONDS = 5.0   # 주인이 없다고 한 게임을 다시 묻지 않고 404로 답하는 시간 (초)
+MISSING_CACHE = 1024    # 없다고 기억해 두는 게임 ID 최대 수
+
+def owner_of(game_id: str, workers: int) -> int:
+    """게임 ID -> 주인 워커 번호 (프로세스마다 값이 같아야 하므로 hash() 대신 crc32)"""
+    return zlib.crc32(game_id.encode("utf-8")) % workers
+
+class RemoteClient:
+    """다른 워커에 접속한 기록원을 대신하는 객체 (send()를 버스 reply로 바꿈)"""
+
+    delta = False
+
+    def __init__(self, bus, worker, client_id):
+        self.bus = bus
+        self.worker = worker
+        self.client_id = client_id
+
+    def send(self, message, kind=None):
+        self.bus.send(self.worker, {"op": "reply", "client": self.client_id, "msg": message})
+
+class Bus:
+    """워커 하나의 버스 끝점: 다른 워커들과 Unix 소켓으로 연결"""
+
+    def __init__(self, index, workers, directory):
+        self.index = index
+        self.workers = workers
+        self.directory = directory
+        self.rooms = None           # server_websocket.rooms (start()에서 지정)
+        self.process = None         # server_websocket.process_command
+        self.outbox = {}            # 워커 번호 -> 보낼 줄 큐
+        self.senders = []
+        self.subscribers = {}       # 게임 ID -> 이 게임 STATE를 받을 워커 번호 집합 (주인 쪽)
+        self.watching = set()       # 이 워커가 사본을 가진 게임 ID
+        self.probing = set()        # HTTP 점수판 요청으로 주인에게 확인 중인 게임 ID
+        self.missing = OrderedDict()  # 주인이 없다고 한 게임 ID -> 그때 시각 (오래된 것부터)
+        self.clients = {}           # 응답을 기다리는 로컬 기록원 id -> Subscriber
+        self.server = None
+
+    def path(self, index):
+        return os.path.join(self.directory, SOCKET_NAME.format(index))
+
+    async def start(self, rooms, process):
+        self.rooms = rooms
+        self.process = process
+        path = self.path(self.index)
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = await asyncio.start_unix_server(self._serve_peer, path)
+        for w in range(self.workers):
+            if w != self.index:
+                self.outbox[w] = asyncio.Queue()
+                self.senders.append(asyncio.create_task(self._sender(w)))
+        return self
+
+    async def close(self):
+        for task in self.senders:
+            task.cancel()
+        if self.server is not None:
+            self.server.close()
+
+    def owns(self, game_id) -> bool:
+        return owner_of(game_id, self.workers) == self.index
+
+    # ------------------------------------------------------------ 보내기
+
+    def send(self, worker, message):
+        self.send_line(worker, (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def send_line(self, worker, line: bytes):
+        self.outbox[worker].put_nowait(line)
+
+    async def _sender(self, worker):
+        """워커 하나로 가는 연결 (상대가 아직 안 떴으면 재시도)"""
+        while True:
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path(worker))
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(CONNECT_RETRY)
+        queue = self.outbox[worker]
+        while True:
+            lines = [await queue.get()]
+            while not queue.empty():
+                lines.append(queue.get_nowait())
+            writer.write(b"".join(lines))
+            await writer.drain()
+
+    # ------------------------------------------------------------ 사본 쪽 (접속한 워커)
+
+    def watch(self, room):
+        """로컬 관중이 생긴 남의 게임: 주인에게 STATE 구독 요청"""
+        if room.game_id in self.watching or self.owns(room.game_id):
+            return
+        self.watching.add(room.game_id)
+        room.owned = False
+        self.send(owner_of(room.game_id, self.workers), {"op": "sub", "game": room.game_id, "from": self.index})
+
+    def unwatch(self, game_id):
+        """남의 게임의 마지막 로컬 관중이 나갔거나 사본 방을 내림: 주인에게 구독 해지"""
+        if game_id not in self.watching:
+            return
+        self.watching.discard(game_id)
+        self.send(owner_of(game_id, self.workers), {"op": "unsub", "game": game_id, "from": self.index})
+
+    def probe(self, game_id):
+        """HTTP 점수판: 남의 게임 사본이 있으면 True, 주인에게 확인 중이면 False, 없는 게임이면 None
+
+        읽기 요청으로는 방을 만들지 않는다: 사본은 주인이 STATE를 보내 줄 때(있는 게임일 때)만 생긴다.
+        """
+        if game_id in self.watching:
+            return True
+        seen = self.missing.get(game_id)
+        if seen is not None:
+            if time.monotonic() - seen < MISSING_SECONDS:
+                return None
+            del self.missing[game_id]
+        if game_id not in self.probing:
+            self.probing.add(game_id)
+            self.send(owner_of(game_id, self.workers), {"op": "sub", "game": game_id, "from": self.index, "probe": True})
+        return False
+
+    def forward(self, room, client, event, request_id=None):
+        """남의 게임에 온 명령을 주인 워커로 전달 (응답은 reply로 돌아옴, 요청 ID는 주인이 붙임)"""
+        self.clients[id(client)] = client
+        self.send(owner_of(room.game_id, self.workers),
+                  {"op": "cmd", "game": room.game_id, "from": self.index, "client": id(client), "event": event,
+                   "id": request_id})
+
+    def forget(self, client):
+        self.clients.pop(id(client), None)
+
+    # ------------------------------------------------------------ 주인 쪽 (GameRoom.relay)
+
+    def publish(self, room, snapshot):
+        """주인 방의 새 STATE를 구독 워커들에게 (줄은 한 번만 인코딩)"""
+        targets = self.subscribers.get(room.game_id)
+        if targets and room.owned:
+            msg = {"op": "state", "game": room.game_id, "seq": room.seq, "snapshot": snapshot}
+            line = (json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8")
+            for w in targets:
+                self.send_line(w, line)
+
+    def broadcast(self, room, message):
+        targets = self.subscribers.get(room.game_id)
+        if targets:
+            line = (json.dumps({"op": "bcast", "game": room.game_id, "msg": message}, ensure_ascii=False)
+                    + "\n").encode("utf-8")
+            for w in targets:
+                self.send_line(w, line)
+
+    # ------------------------------------------------------------ 받기
+
+    async def _serve_peer(self, reader, writer):
+        """다른 워커에서 온 메시지 처리 (연결 하나 안에서는 순서대로)"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                await self.dispatch(json.loads(line))
+        except asyncio.CancelledError:
+            # 종료할 때 취소됨 (연결 콜백 태스크라 다시 올리면 asyncio가 오류로 출력한다)
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, msg):
+        op = msg["op"]
+        if op == "state":
+            if msg["game"] not in self.watching and msg["game"] not in self.probing:
+                # 구독을 해지한 뒤에 도착한 STATE (사본 방을 다시 만들지 않음)
+                return
+            self.probing.discard(msg["game"])
+            self.watching.add(msg["game"])
+            room = self.rooms.get(msg["game"])
+            room.owned = False
+            room.mirror_state(msg["snapshot"], msg["seq"])
+        elif op == "missing":
+            self.probing.discard(msg["game"])
+            self.missing[msg["game"]] = time.monotonic()
+            while len(self.missing) > MISSING_CACHE:
+                self.missing.popitem(last=False)
+        elif op == "reply":
+            client = self.clients.get(msg["client"])
+            if client is not None:
+                client.send(msg["msg"])
+        elif op == "bcast":
+            if msg["game"] in self.watching:
+                self.rooms.get(msg["game"]).broadcast(msg["msg"])
+        elif op == "sub":
+            room = self.rooms.find(msg["game"]) if msg.get("probe") else self.rooms.get(msg["game"])
+            if room is None:
+                self.send(msg["from"], {"op": "missing", "game": msg["game"]})
+                return
+            self.subscribers.setdefault(room.game_id, set()).add(msg["from"])
+            self.send(msg["from"], {"op": "state", "game": room.game_id, "seq": room.seq, "snapshot": room.last_snapshot})
+        elif op == "unsub":
+            targets = self.subscribers.get(msg["game"])
+            if targets is not None:
+                targets.discard(msg["from"])
+                if not targets:
+                    del self.subscribers[msg["game"]]
+        elif op == "cmd":
+            room = self.rooms.get(msg["game"])
+            client = fanout.reply_to(RemoteClient(self, msg["from"], msg["client"]), msg.get("id"))
+            event = msg["event"]
+            if event["type"] == "STATS":
+                client.send(room.stats_message(event.get("batter"), event.get("team")))
+            else:
+                await room.submit(self.process, client, event)
+
+# ---------------------------------------------------------------- 실행기
+
+def worker_args(args, index):
+    """워커마다 로그 파일/이벤트 디렉터리를 나눈 옵션"""
+    base, ext = os.path.splitext(args.log)
+    return argparse.Namespace(**{**vars(args), "log": f"{base}.w{index}{ext}",
+                                 "events": os.path.join(args.events, f"w{index}")})
+
+async def serve_worker(args, index, workers, bus_dir):
+    """SIGTERM을 받으면 서버 main()을 취소해 큐/로그/스냅샷을 정리하고 끝냄"""
+    import server_websocket
+    task = asyncio.current_task()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    try:
+        await server_websocket.main(worker_args(args, index), Bus(index, workers, bus_dir))
+    except asyncio.CancelledError:
+        pass
+
+def run_worker(args, index, workers, bus_dir):
+    # Ctrl+C는 실행기만 받고, 실행기가 워커마다 SIGTERM을 한 번씩 보낸다
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(serve_worker(args, index, workers, bus_dir))
+
+def parse_args(argv=None):
+    import server_websocket
+    parser = argparse.ArgumentParser(description="샤드 서버 실행기", add_help=False)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--bus-dir", help="버스 소켓 디렉터리 (생략하면 임시 디렉터리)")
+    shard_args, rest = parser.parse_known_args(argv)
+    args = server_websocket.parse_args(rest)
+    args.workers, args.bus_dir = shard_args.workers, shard_args.bus_dir
+    return args
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="bb-bus-") as tmp:
+        bus_dir = args.bus_dir or tmp
+        os.makedirs(bus_dir, exist_ok=True)
+        procs = [multiprocessing.Process(target=run_worker, args=(args, i, args.workers, bus_dir), daemon=True)
+                 for i in range(args.workers)]
+        for p in procs:
+            p.start()
+        print(f"[SHARD] 워커 {args.workers}개 시작 (포트 {args.port}, 버스 {bus_dir})")
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            # 터미널/timeout은 프로세스 그룹 전체에 SIGINT를 보내므로 정리 중에 다시 받을 수 있다
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            for p in procs:
+                p.terminate()
+            for p in procs:
+                p.join()
+            print("\n\n샤드 서버를 종료합니다...")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+몬테카를로 경기 시뮬레이터 (NumPy 일괄 처리)
+사용법: python simulate.py [--games 100000] [--workers 4] [--seed 1] [--probs probs.json]
+설명: 타자별 투구 결과 확률로 여러 경기를 NumPy 배열(루 마스크, 아웃, 카운트, 점수, 타순)로
+      나란히 진행한다. 주루/카운트/3아웃/끝내기 규칙은 fast_engine의 표와 같은 것을 쓴다.
+
+경기 종료 규칙:
+  - 끝내기(9회 이후 말에 홈 팀 리드)는 서버와 같다.
+  - 서버의 원정 팀 승리 분기는 advance_half()가 아웃을 0으로 되돌린 뒤 검사하므로 실행되지 않는다.
+    그대로 두면 원정 팀이 이기는 경기가 끝나지 않으므로, 시뮬레이터는 9회 이후 말 공격이
+    끝났을 때 원정 팀이 앞서면 원정 승으로 끝낸다.
+  - --max-innings 회를 넘기면 무승부로 끝낸다.
+
+같은 --seed와 --chunk면 작업 프로세스 수와 관계없이 결과가 같다.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import fast_engine as fe
+
+LINEUP_SIZE = 9
+MAX_HALVES = 64
+DEFAULT_PROBS = {
+    "BALL": 0.35, "STRIKE": 0.29, "FOUL": 0.17, "OUT": 0.115, "1B": 0.045, "2B": 0.012,
+    "3B": 0.002, "HR": 0.008, "SAC_FLY": 0.002, "SAC_BUNT": 0.001, "ERROR": 0.002,
+    "STEAL": 0.002, "CAUGHT_STEALING": 0.001, "WILD_PITCH": 0.002, "BALK": 0.0005,
+}
+
+# fast_engine 표를 NumPy 배열로 (TABLE[code * 8 + mask])
+T_NEW, T_RUNS, T_OUTS, T_ENDS = (np.array(col, dtype=np.int8) for col in zip(*fe.TABLE))
+T_ENDS = T_ENDS.astype(bool)
+
+def lineup_cdfs(probs):
+    """{"away": [타자별 {결과: 확률}], "home": [...]} -> (2, 9, 결과 수) 누적 확률"""
+    cdfs = np.zeros((2, LINEUP_SIZE, len(fe.RESULTS)))
+    for team, name in enumerate(("away", "home")):
+        batters = probs.get(name) or [DEFAULT_PROBS]
+        for slot in range(LINEUP_SIZE):
+            p = batters[slot % len(batters)]
+            row = np.array([p.get(r, 0.0) for r in fe.RESULTS], dtype=float)
+            cdfs[team, slot] = np.cumsum(row / row.sum())
+    cdfs[:, :, -1] = 1.0
+    return cdfs
+
+def start_state_cell(inning, half, outs, bases, away, home, balls, strikes):
+    """기본 셀: 타석 시작(0-0 카운트)의 (아웃, 루 마스크) -> 0..23, 그 외 -1 (RE24)"""
+    return np.where((balls == 0) & (strikes == 0), outs * 8 + bases, -1)
+
+class Games:
+    """n개 경기의 상태 배열"""
+
+    def __init__(self, n):
+        self.inning = np.ones(n, np.int16)
+        self.half = np.zeros(n, np.int8)
+        self.outs = np.zeros(n, np.int8)
+        self.balls = np.zeros(n, np.int8)
+        self.strikes = np.zeros(n, np.int8)
+        self.bases = np.zeros(n, np.int8)
+        self.score = np.zeros((n, 2), np.int32)           # [원정, 홈]
+        self.index = np.zeros((n, 2), np.int8)            # 다음 타순 (away_index, home_index)
+        self.slot = np.zeros(n, np.int8)                  # 현재 타자 타순
+        self.need_batter = np.ones(n, bool)               # current_batter가 None인 상태
+        self.active = np.ones(n, bool)
+        self.winner = np.full(n, -1, np.int8)             # 0=원정, 1=홈, 2=무승부
+        self.half_end_runs = np.zeros((n, MAX_HALVES), np.int32)
+
+    def half_no(self, g):
+        return np.minimum((self.inning[g] - 1) * 2 + self.half[g], MAX_HALVES - 1)
+
+def simulate_chunk(n, cdfs, seed, max_innings=15, cell_fn=None, n_cells=24, record_codes=False):
+    """경기 n개를 끝까지 진행하고 합칠 수 있는 요약(dict)을 반환
+
+    cell_fn(inning, half, outs, bases, away, home, balls, strikes) -> 셀 번호 배열 (-1은 무시).
+    각 투구 직전 상태를 셀로 기록하고, 셀별 방문 수/그 반 이닝 끝까지의 득점 합/홈 승리 수를 모은다.
+    """
+    rng = np.random.default_rng(seed)
+    g = Games(n)
+    rows = np.arange(n)
+    visits = []
+    codes_log = [] if record_codes else None
+
+    while True:
+        a = rows[g.active]
+        if not a.size:
+            break
+        half = g.half[a]
+
+        if cell_fn is not None:
+            cells = cell_fn(g.inning[a], half, g.outs[a], g.bases[a], g.score[a, 0], g.score[a, 1],
+                            g.balls[a], g.strikes[a])
+            keep = cells >= 0
+            visits.append((a[keep], cells[keep], g.score[a[keep], half[keep]], g.half_no(a[keep])))
+
+        # 새 타자 (next_batter와 같이 타순을 하나 넘김)
+        nb = a[g.need_batter[a]]
+        team = g.half[nb]
+        g.slot[nb] = g.index[nb, team]
+        g.index[nb, team] = (g.index[nb, team] + 1) % LINEUP_SIZE
+        g.need_batter[nb] = False
+
+        # 타자별 확률로 결과 코드 뽑기
+        cdf = cdfs[half, g.slot[a]]
+        code = (rng.random(a.size)[:, None] > cdf).sum(axis=1).astype(np.int16)
+        np.minimum(code, len(fe.RESULTS) - 1, out=code)
+        if record_codes:
+            log = np.full(n, -1, np.int16)
+            log[a] = code
+            codes_log.append(log)
+
+        # 카운트 처리 (fast_engine.step 앞부분)
+        c = code.copy()
+        m = c == fe.STRIKE
+        g.strikes[a[m]] += 1
+        c[m & (g.strikes[a] < 3)] = fe.NOOP
+        m = c == fe.BALL
+        g.balls[a[m]] += 1
+        c[m] = np.where(g.balls[a[m]] >= 4, fe.WALK, fe.NOOP)
+        m = c == fe.WILD_PITCH
+        g.balls[a[m]] += 1
+        c[m] = np.where(g.balls[a[m]] >= 4, fe.WALK, fe.WP_ADVANCE)
+        m = c == fe.FOUL
+        f = a[m]
+        g.strikes[f] += g.strikes[f] < 2
+        c[m] = fe.NOOP
+
+        # 표 적용
+        k = c.astype(np.int32) * 8 + g.bases[a]
+        g.bases[a] = T_NEW[k]
+        g.outs[a] += T_OUTS[k]
+        g.score[a, half] += T_RUNS[k]
+        e = a[T_ENDS[k]]
+        g.balls[e] = 0
+        g.strikes[e] = 0
+        g.need_batter[e] = True
+
+        # 3아웃 -> 공수 교대
+        t = a[g.outs[a] >= 3]
+        if t.size:
+            g.half_end_runs[t, g.half_no(t)] = g.score[t, g.half[t]]
+            g.outs[t] = 0
+            g.balls[t] = 0
+            g.strikes[t] = 0
+            g.bases[t] = 0
+            g.need_batter[t] = True
+            was_home = g.half[t] == 1
+            g.inning[t] += was_home
+            g.half[t] = 1 - g.half[t]
+            # 9회 이후 말 공격이 끝났는데 원정 팀이 앞섬 -> 원정 승 / 연장 한도 초과 -> 무승부
+            t = t[was_home & (g.inning[t] > 9)]
+            away_win = g.score[t, 0] > g.score[t, 1]
+            g.winner[t[away_win]] = 0
+            g.active[t[away_win]] = False
+            tie = t[~away_win & (g.inning[t] > max_innings)]
+            g.winner[tie] = 2
+            g.active[tie] = False
+
+        # 끝내기 (check_game_over 첫 분기)
+        a = a[g.active[a]]
+        w = a[(g.inning[a] >= 9) & (g.half[a] == 1) & (g.score[a, 1] > g.score[a, 0])]
+        g.half_end_runs[w, g.half_no(w)] = g.score[w, 1]
+        g.winner[w] = 1
+        g.active[w] = False
+
+    summary = summarize(g, visits, n_cells)
+    if record_codes:
+        summary["codes"] = np.array(codes_log).T
+        summary["games_state"] = g
+    return summary
+
+def summarize(g, visits, n_cells):
+    summary = {
+        "games": len(g.winner),
+        "away_wins": int((g.winner == 0).sum()),
+        "home_wins": int((g.winner == 1).sum()),
+        "ties": int((g.winner == 2).sum()),
+        "away_runs": int(g.score[:, 0].sum()),
+        "home_runs": int(g.score[:, 1].sum()),
+        "cell_visits": np.zeros(n_cells, np.int64),
+        "cell_runs": np.zeros(n_cells, np.int64),
+        "cell_home_wins": np.zeros(n_cells, np.int64),
+    }
+    if visits:
+        games = np.concatenate([v[0] for v in visits])
+        cells = np.concatenate([v[1] for v in visits])
+        runs_at = np.concatenate([v[2] for v in visits])
+        half_no = np.concatenate([v[3] for v in visits])
+        runs_after = g.half_end_runs[games, half_no] - runs_at
+        summary["cell_visits"] = np.bincount(cells, minlength=n_cells)
+        summary["cell_runs"] = np.bincount(cells, weights=runs_after, minlength=n_cells).astype(np.int64)
+        summary["cell_home_wins"] = np.bincount(cells, weights=g.winner[games] == 1, minlength=n_cells).astype(np.int64)
+    return summary
+
+def merge(summaries):
+    total = None
+    for s in summaries:
+        if total is None:
+            total = dict(s)
+            continue
+        for key, value in s.items():
+            total[key] = total[key] + value
+    return total
+
+def _run_chunk(job):
+    n, cdfs, seed, max_innings, cell_fn, n_cells = job
+    return simulate_chunk(n, cdfs, seed, max_innings, cell_fn, n_cells)
+
+def simulate(games, probs=None, seed=0, workers=1, chunk=10000, max_innings=15,
+             cell_fn=start_state_cell, n_cells=24):
+    """경기 games개를 chunk 단위로 나눠 (workers>1이면 프로세스 풀에서) 시뮬레이션"""
+    cdfs = lineup_cdfs(probs or {})
+    seeds = np.random.SeedSequence(seed).spawn((games + chunk - 1) // chunk)
+    jobs = [(min(chunk, games - i * chunk), cdfs, s, max_innings, cell_fn, n_cells) for i, s in enumerate(seeds)]
+    if workers <= 1:
+        return merge(map(_run_chunk, jobs))
+    with ProcessPoolExecutor(workers) as pool:
+        return merge(pool.map(_run_chunk, jobs))
+
+def check_against_engine(n=300, seed=0):
+    """같은 결과 코드를 fast_engine.step으로 한 경기씩 다시 적용해 최종 상태 비교"""
+    s = simulate_chunk(n, lineup_cdfs({}), seed, record_codes=True)
+    g = s["games_state"]
+    for i, codes in enumerate(s["codes"]):
+        gs = fe.GameState()
+        gs.away_lineup = gs.home_lineup = [f"{slot + 1}번" for slot in range(LINEUP_SIZE)]
+        for code in codes[codes >= 0]:
+            if not gs.current_batter:
+                gs.current_batter = fe.next_batter(gs)
+            fe.step(gs, int(code))
+        got = (int(g.inning[i]), int(g.half[i]), int(g.outs[i]), int(g.bases[i]), int(g.score[i, 0]), int(g.score[i, 1]),
+               int(g.index[i, 0]), int(g.index[i, 1]))
+        want = (gs.inning, gs.half, gs.outs, gs.bases, gs.away, gs.home, gs.away_index, gs.home_index)
+        assert got == want, f"경기 {i}: {got} != {want}"
+    return n
+
+def run_expectancy(summary):
+    """RE24: (아웃, 루 마스크) -> 반 이닝 끝까지 기대 득점"""
+    visits = summary["cell_visits"][:24]
+    runs = summary["cell_runs"][:24]
+    return np.where(visits > 0, runs / np.maximum(visits, 1), np.nan).reshape(3, 8)
+
+def main():
+    parser = argparse.ArgumentParser(description="몬테카를로 경기 시뮬레이터")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, os.cpu_count()],
+                        help="측정할 작업 프로세스 수 목록")
+    parser.add_argument("--chunk", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-innings", type=int, default=15)
+    parser.add_argument("--probs", help='타자별 결과 확률 JSON {"away": [{...}], "home": [{...}]}')
+    parser.add_argument("--check", action="store_true", help="fast_engine과 규칙 일치 검사 후 실행")
+    args = parser.parse_args()
+
+    probs = None
+    if args.probs:
+        with open(args.probs, encoding="utf-8") as f:
+            probs = json.load(f)
+    if args.check:
+        print(f"규칙 일치 검사 통과: {check_against_engine()}경기")
+
+    summary = None
+    for workers in dict.fromkeys(args.workers):
+        start = time.perf_counter()
+        summary = simulate(args.games, probs, args.seed, workers, args.chunk, args.max_innings)
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers:3d}  {args.games / elapsed:12.0f} games/sec")
+
+    n = summary["games"]
+    print(f"홈 승률 {summary['home_wins'] / n:.3f}  원정 승률 {summary['away_wins'] / n:.3f}  무승부 {summary['ties'] / n:.3f}")
+    print(f"경기당 득점: 원정 {summary['away_runs'] / n:.2f}  홈 {summary['home_runs'] / n:.2f}")
+    print("기대 득점 (RE24, 행=아웃, 열=루 마스크 000..111):")
+    for outs, row in enumerate(run_expectancy(summary)):
+        print(f"  {outs}아웃 " + " ".join(f"{v:5.2f}" for v in row))
+
+if __name__ == "__main__":
+    main()
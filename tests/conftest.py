@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""테스트 공용 설정: 저장소 루트를 import 경로에 추가하고, 임의 포트의 서버를 띄우는 fixture"""
+
+import asyncio
+import contextlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import server_websocket
+from event_store import EventStore
+from game_room import RoomRegistry
+from log_writer import LogWriter
+
+@pytest.fixture
+def running_server(tmp_path):
+    """async with running_server(events=False) as uri: 임시 디렉터리에 로그(와 이벤트 스트림)를 쓰는 서버
+
+    benchmarks/common.running_server와 같지만 tmp_path를 쓰고, 끝나면 server_websocket의 전역을 되돌린다.
+    events=True면 tmp_path/"events"에 이벤트 스트림을 기록한다 (닫을 때 스냅샷도 저장).
+    """
+    saved = server_websocket.rooms, server_websocket.log_writer, server_websocket.event_store
+
+    @contextlib.asynccontextmanager
+    async def start(events=False):
+        rooms = server_websocket.rooms = RoomRegistry()
+        store = None
+        if events:
+            store = server_websocket.event_store = await EventStore(str(tmp_path / "events")).start(rooms)
+        try:
+            async with LogWriter(str(tmp_path / "log.jsonl")) as server_websocket.log_writer:
+                try:
+                    async with server_websocket.serve("127.0.0.1", 0) as server:
+                        port = next(iter(server.sockets)).getsockname()[1]
+                        yield f"ws://127.0.0.1:{port}"
+                finally:
+                    await asyncio.gather(*(room.stop() for room in rooms))
+        finally:
+            if store is not None:
+                await store.close(rooms)
+
+    yield start
+    server_websocket.rooms, server_websocket.log_writer, server_websocket.event_store = saved
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+메시지 코덱: JSON/바이너리 왕복과 잘못된 바이너리 프레임 거절.
+(크기/속도 비교는 benchmarks/bench_codec.py)
+"""
+
+import asyncio
+
+import pytest
+import websockets
+
+import codec
+
+MESSAGES = [
+    {"type": "STATE", "inning": "7회 말", "outs": 2, "balls": 3, "strikes": 1, "home": 4, "away": 12,
+     "runners": ["1B", "3B"], "current_batter": "김타자", "game_over": False, "seq": 300,
+     "home_win_prob": 0.4375, "run_exp": -0.25},
+    {"type": "DELTA", "seq": 7, "changes": {"runners": [], "outs": 0, "winner": None}},
+    {"type": "BATCH", "events": [{"type": "AB", "batter": "", "result": "HR"}], "id": "x" * 200},
+    {"type": "STATS", "batters": {"홍길동": {"PA": 4, "H": 2, "AVG": 0.5}}, "nested": [[1, [2, [3]]], True]},
+    {"type": "ERROR", "msg": "Unknown", "n": -129, "big": 1 << 40},
+]
+
+@pytest.mark.parametrize("c", list(codec.CODECS.values()), ids=list(codec.CODECS))
+def test_round_trip(c):
+    for message in MESSAGES:
+        assert c.decode(c.encode(message)) == message
+
+def nested_lists(depth):
+    return bytes([codec.VERSION] + [codec.T_LIST, 1] * depth + [codec.T_NONE])
+
+def test_nesting_limit():
+    assert codec.BINARY.decode(nested_lists(codec.MAX_DEPTH)) is not None
+    with pytest.raises(ValueError):
+        codec.BINARY.decode(nested_lists(codec.MAX_DEPTH + 1))
+    with pytest.raises(ValueError):
+        codec.BINARY.decode(nested_lists(5000))
+    deep_dicts = bytes([codec.VERSION] + [codec.T_DICT, 1, codec.T_SMALL] * 5000 + [codec.T_NONE])
+    with pytest.raises(ValueError):
+        codec.BINARY.decode(deep_dicts)
+
+def test_malformed_binary_rejected():
+    good = codec.BINARY.encode(MESSAGES[0])
+    bad = [
+        b"", "텍스트", b"\x00" + good[1:], good[:-1], good + b"\x00",
+        bytes([codec.VERSION, codec.T_SYM, 255]),                     # 없는 기호
+        bytes([codec.VERSION, codec.T_STR, 2, 0xFF, 0xFE]),           # 깨진 UTF-8
+        bytes([codec.VERSION, codec.T_DICT, 1, codec.T_LIST, 0, 1]),  # 해시할 수 없는 키
+        bytes([codec.VERSION, 99]),                                   # 알 수 없는 태그
+    ]
+    for data in bad:
+        with pytest.raises(ValueError):
+            codec.BINARY.decode(data)
+
+async def send_deep_frame(running_server):
+    async with running_server() as uri:
+        async with websockets.connect(f"{uri}/deep", subprotocols=[codec.BINARY.subprotocol]) as ws:
+            await ws.recv()  # 접속 시 STATE
+            await ws.send(nested_lists(5000))
+            return codec.BINARY.decode(await ws.recv())
+
+def test_server_replies_error_to_deep_frame(running_server):
+    assert asyncio.run(send_deep_frame(running_server)) == {"type": "ERROR", "msg": "Bad message"}
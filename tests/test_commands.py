@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+입력 명령 검사: 잘못된 SET_RUNNERS/BATCH는 처리 큐에 넣기 전에 ERROR로 거절되고 상태가 바뀌지 않는다.
+(동시 명령 스트레스는 benchmarks/bench_commands.py)
+"""
+
+import asyncio
+import json
+
+import websockets
+
+import server_websocket
+from game_engine import command_error, command_event
+
+def error_for(message):
+    return command_error(command_event(message))
+
+def test_valid_runners_accepted():
+    assert error_for({"type": "SET_RUNNERS", "runners": []}) is None
+    assert error_for({"type": "SET_RUNNERS", "runners": ["1B", "3B"]}) is None
+    assert error_for({"type": "SET_RUNNERS", "runners": ("2B",)}) is None
+
+def test_bad_runners_rejected():
+    for runners in (["4B"], ["1B", "HOME"], "1B", None, [1], [["1B"]], {"1B": True}):
+        assert error_for({"type": "SET_RUNNERS", "runners": runners}) == "Bad runners", runners
+
+def test_bad_runners_inside_batch_rejected():
+    batch = {"type": "BATCH", "events": [{"type": "AB", "result": "1B"}, {"type": "SET_RUNNERS", "runners": ["4B"]}]}
+    assert error_for(batch) == "Bad runners"
+
+async def exchange(running_server):
+    """서버에 잘못된/올바른 SET_RUNNERS를 보내고 -> (거절 응답, 그다음 응답들, 방의 순번)"""
+    async with running_server() as uri:
+        async with websockets.connect(f"{uri}/runners") as ws:
+            await ws.recv()  # 접속 시 STATE
+            await ws.send(json.dumps({"type": "SET_RUNNERS", "runners": ["4B"], "id": "bad"}))
+            rejected = json.loads(await ws.recv())
+            await ws.send(json.dumps({"type": "SET_RUNNERS", "runners": ["2B"], "id": "ok"}))
+            replies = [json.loads(await ws.recv()) for _ in range(2)]
+            return rejected, replies, server_websocket.rooms.get("runners").seq
+
+def test_server_rejects_bad_runners_without_changing_state(running_server):
+    rejected, replies, seq = asyncio.run(exchange(running_server))
+    assert rejected == {"type": "ERROR", "msg": "Bad runners", "id": "bad"}
+    states = [m for m in replies if m["type"] == "STATE"]
+    acks = [m for m in replies if m["type"] == "ACK"]
+    assert acks and acks[0]["id"] == "ok"
+    assert states and states[0]["runners"] == ["2B"]
+    # 거절된 명령은 상태를 바꾸지 않으므로 순번도 쓰지 않는다
+    assert seq == 1
+
+def test_bad_at_bat_rejected():
+    assert error_for({"type": "AB", "batter": "", "result": "1B"}) is None
+    assert error_for({"type": "AB", "result": "1B"}) is None
+    assert error_for({"type": "AB", "batter": {"name": "x"}, "result": "1B"}) == "Bad batter"
+    assert error_for({"type": "AB", "batter": ["x"], "result": "1B"}) == "Bad batter"
+    assert error_for({"type": "AB", "batter": "", "result": 5}) == "Bad result"
+    assert error_for({"type": "AB", "batter": "", "result": None}) == "Bad result"
+    batch = {"type": "BATCH", "events": [{"type": "AB", "result": "1B"}, {"type": "AB", "result": ["HR"]}]}
+    assert error_for(batch) == "Bad result"
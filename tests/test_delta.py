@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+DELTA 프로토콜 검사: ?proto=delta 관중은 순번이 붙은 STATE 한 번 뒤에 변경분(DELTA)만 받고,
+변경분을 차례로 적용한 상태가 전체 STATE와 같다.
+"""
+
+import asyncio
+import json
+
+import websockets
+
+from client_websocket import Scoreboard
+from game_room import state_changes
+
+PLAYS = ["BALL", "STRIKE", "1B", "HR", "OUT", "2B", "STRIKE", "STRIKE", "STRIKE", "OUT"]
+
+async def play(ws, results):
+    """기록원: 타석 결과마다 ACK/END까지 기다림"""
+    for result in results:
+        await ws.send(json.dumps({"type": "AB", "batter": "", "result": result}))
+        while json.loads(await ws.recv())["type"] not in ("ACK", "END", "ERROR"):
+            pass
+
+def test_state_changes_only_lists_changed_fields():
+    prev = {"type": "STATE", "outs": 0, "balls": 1, "runners": []}
+    assert state_changes(prev, {**prev, "balls": 2}) == {"balls": 2}
+    assert state_changes(prev, dict(prev)) == {}
+
+def test_delta_stream_rebuilds_full_state(running_server):
+    async def run():
+        async with running_server() as uri:
+            async with websockets.connect(f"{uri}/delta?proto=delta") as viewer, \
+                    websockets.connect(f"{uri}/delta") as scorer:
+                first = json.loads(await viewer.recv())
+                await scorer.recv()
+                await play(scorer, PLAYS)
+                deltas = [json.loads(await viewer.recv()) for _ in PLAYS]
+                await scorer.send('{"type": "SCORE"}')
+                full = json.loads(await scorer.recv())
+                return first, deltas, full
+    first, deltas, full = asyncio.run(run())
+    assert first["type"] == "STATE" and first["seq"] == 0
+    assert [d["type"] for d in deltas] == ["DELTA"] * len(PLAYS)
+    assert [d["seq"] for d in deltas] == list(range(1, len(PLAYS) + 1))
+    board = Scoreboard()
+    board.apply(first)
+    for delta in deltas:
+        state = board.apply(delta)
+    assert {k: v for k, v in state.items() if k != "seq"} == full
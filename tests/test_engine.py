@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+규칙 엔진 속성 검사: 무작위 타석 결과/타자/라인업 시퀀스로 game_engine(dict)과 fast_engine(표 기반)을
+나란히 돌려 모든 ACK/END/ERROR와 STATE의 JSON 직렬화 결과가 바이트 단위로 같은지 확인한다.
+두 엔진이 함께 틀리는 경우를 잡도록, 원래 서버가 남긴 로그(baseline_games.jsonl)의 ACK/STATE와도 비교한다.
+(처리량은 benchmarks/bench_engine.py)
+"""
+
+import json
+import os
+import random
+
+import fast_engine
+import game_engine
+
+RESULTS = list(fast_engine.RESULTS) + ["foul", "UNKNOWN"]
+
+# 원래(리팩터링 전) 서버의 game_log_websocket.jsonl 중 로그만으로 다시 만들 수 있는 경기들.
+# RESET마다 새 경기이고, 줄마다 ACK 다음에 그 결과의 STATE가 온다
+BASELINE_LOG = os.path.join(os.path.dirname(__file__), "baseline_games.jsonl")
+
+def baseline_games():
+    """-> [[(ACK, STATE), ...] 경기마다]"""
+    with open(BASELINE_LOG, encoding="utf-8") as f:
+        rows = [json.loads(line)["data"] for line in f]
+    games = []
+    for i, row in enumerate(rows):
+        if row.get("msg") == "RESET":
+            games.append([])
+        elif row["type"] == "ACK":
+            games[-1].append((row, rows[i + 1]))
+    return games
+
+def dumps(obj):
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+def random_game(rng):
+    """무작위 라인업/주자로 시작하는 기준 상태"""
+    ref = game_engine.init_state()
+    if rng.random() < 0.7:
+        ref["away_lineup"] = [f"A{i}" for i in range(rng.randint(1, 9))]
+        ref["home_lineup"] = [f"H{i}" for i in range(rng.randint(1, 9))]
+    if rng.random() < 0.3:
+        ref["runners"] = set(rng.sample(["1B", "2B", "3B"], rng.randint(0, 3)))
+    return ref
+
+def test_engines_agree_on_random_sequences():
+    rng = random.Random(0)
+    for g in range(300):
+        ref = random_game(rng)
+        fast = fast_engine.GameState.from_dict(ref)
+        for i in range(200):
+            batter = rng.choice(["", "", "", "대타"])
+            result = rng.choice(RESULTS)
+            a = dumps(game_engine.apply_ab(ref, batter, result))
+            b = dumps(fast_engine.apply_ab(fast, batter, result))
+            assert a == b, f"game {g} step {i} {result}"
+            assert dumps(game_engine.current_state(ref)) == dumps(fast_engine.current_state(fast)), \
+                f"game {g} step {i} {result}"
+        assert fast.to_dict() == ref, f"game {g}: 최종 상태 불일치"
+
+def test_game_ending_at_bat_reports_batter_and_result():
+    # 9회 말 동점, 만루에서 끝내기 안타
+    ref = game_engine.init_state()
+    ref.update(inning=9, half="HOME", away=3, home=3, runners={"1B", "2B", "3B"}, home_lineup=["H1"])
+    fast = fast_engine.GameState.from_dict(ref)
+    a = game_engine.apply_ab(ref, "", "1B")
+    assert a["type"] == "END" and a["batter"] == "H1" and a["result"] == "1B"
+    assert dumps(a) == dumps(fast_engine.apply_ab(fast, "", "1B"))
+
+def test_engines_reproduce_baseline_log():
+    games = baseline_games()
+    assert sum(len(g) for g in games) == 54
+    for g, plays in enumerate(games):
+        ref = game_engine.init_state()
+        fast = fast_engine.GameState()
+        for i, (ack, state) in enumerate(plays):
+            expected = dumps(ack), dumps(state)
+            assert (dumps(game_engine.apply_ab(ref, ack["batter"], ack["result"])),
+                    dumps(game_engine.current_state(ref))) == expected, f"game_engine: 경기 {g} 타석 {i}"
+            assert (dumps(fast_engine.apply_ab(fast, ack["batter"], ack["result"])),
+                    dumps(fast_engine.current_state(fast))) == expected, f"fast_engine: 경기 {g} 타석 {i}"
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+이벤트 스트림 검사: 거절된 명령은 상태와 events.jsonl을 바꾸지 않고,
+--recover(스냅샷 + 꼬리 이벤트)는 같은 게임 상태를 다시 만든다.
+(복구 속도는 benchmarks/bench_recovery.py)
+"""
+
+import asyncio
+import json
+import random
+
+import websockets
+
+import server_websocket
+from event_store import STREAM_FILE, EventStore, publishes_state, read_snapshot, recover
+from fast_engine import RESULTS
+from game_room import RoomRegistry
+
+BAD_COMMANDS = [
+    {"type": "AB", "batter": "", "result": 5},
+    {"type": "AB", "batter": {"name": "x"}, "result": "1B"},
+    {"type": "AB", "batter": ["x"], "result": "HR"},
+    {"type": "BATCH", "events": [{"type": "AB", "result": "1B"}, {"type": "AB", "result": {"x": 1}}]},
+]
+
+def test_bad_at_bat_changes_neither_state_nor_stream(running_server, tmp_path):
+    async def run():
+        async with running_server(events=True) as uri:
+            async with websockets.connect(f"{uri}/bad") as ws:
+                before = json.loads(await ws.recv())
+                replies = []
+                for command in BAD_COMMANDS:
+                    await ws.send(json.dumps(command))
+                    replies.append(json.loads(await ws.recv()))
+                await ws.send('{"type": "SCORE"}')
+                after = json.loads(await ws.recv())
+                room = server_websocket.rooms.get("bad")
+                return before, replies, after, room.seq, room.stats.batters
+    before, replies, after, seq, batters = asyncio.run(run())
+    assert [r["msg"] for r in replies] == ["Bad result", "Bad batter", "Bad batter", "Bad result"]
+    assert after == before and seq == 0 and not batters
+    assert (tmp_path / "events" / STREAM_FILE).read_text(encoding="utf-8") == ""
+
+async def record(directory, events):
+    """서버처럼 명령을 반영하고 스트림에 기록 (snapshot_every마다 스냅샷). 마지막 스냅샷은 쓰지 않음"""
+    rooms = RoomRegistry()
+    store = await EventStore(directory, snapshot_every=7).start(rooms)
+    for game_id, event in events:
+        room = rooms.get(game_id)
+        room.apply(event)
+        if publishes_state(event):
+            room.publish_state()
+        await store.append(rooms, game_id, event)
+        await asyncio.sleep(0)
+    if store.snapshot_task is not None:
+        await store.snapshot_task
+    await store.writer.close()
+    return rooms
+
+def random_events(count, seed):
+    rng = random.Random(seed)
+    events = [(g, {"type": "SET_LINEUP", "away_lineup": [f"{g}-A{i}" for i in range(9)],
+                   "home_lineup": [f"{g}-H{i}" for i in range(9)]}) for g in ("g1", "g2")]
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.05:
+            event = {"type": "SET_RUNNERS", "runners": rng.sample(["1B", "2B", "3B"], 2)}
+        elif r < 0.07:
+            event = {"type": "RESET"}
+        else:
+            event = {"type": "AB", "batter": "", "result": rng.choice(RESULTS)}
+        events.append((rng.choice(("g1", "g2")), event))
+    return events
+
+def test_recover_from_snapshot_and_tail(tmp_path):
+    directory = str(tmp_path / "events")
+    live = asyncio.run(record(directory, random_events(200, 0)))
+    snap = read_snapshot(directory)
+    assert 0 < snap["n"] < 202, "스냅샷 뒤에 다시 적용할 꼬리가 있어야 함"
+    for use_snapshot in (True, False):
+        rooms = RoomRegistry()
+        assert recover(directory, rooms, use_snapshot) == 202
+        for room in live:
+            restored = rooms.get(room.game_id)
+            assert restored.dump() == room.dump(), (room.game_id, use_snapshot)
+            assert restored.seq == room.seq and restored.last_snapshot == room.last_snapshot
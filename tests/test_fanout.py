@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+팬아웃 송신 큐 검사: 느린 구독자 정책("latest"/"disconnect")과 전송 오류 처리.
+(처리량은 benchmarks/bench_fanout.py)
+"""
+
+import asyncio
+
+import fanout
+
+class SlowSocket:
+    """release()할 때까지 send()가 끝나지 않는 웹소켓"""
+
+    remote_address = ("test", 0)
+
+    def __init__(self, error=None):
+        self.sent = []
+        self.closed = None
+        self.error = error
+        self.gate = asyncio.Event()
+
+    async def send(self, data, text=None):
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        self.sent.append(data)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = code
+
+    def release(self):
+        self.gate.set()
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+async def fill(policy, frames, max_queue=4, socket=None):
+    """전송 태스크가 첫 프레임에서 멈춘 구독자에 frames((kind, bytes))를 넣음 -> (구독자, 웹소켓, push 결과)"""
+    ws = socket or SlowSocket()
+    sub = fanout.Subscriber(ws, max_queue, policy)
+    sub.push(b"first", "ACK")
+    await settle()  # 전송 태스크가 "first"를 꺼내 send()에서 기다림
+    results = [sub.push(frame, kind) for kind, frame in frames]
+    return sub, ws, results
+
+def test_latest_keeps_last_state_and_following_deltas():
+    async def run():
+        frames = [("STATE", b"s1"), ("ACK", b"a1"), ("STATE", b"s2"), ("DELTA", b"d3"), ("DELTA", b"d4")]
+        sub, ws, results = await fill("latest", frames)
+        assert all(results)
+        ws.release()
+        await settle()
+        return ws.sent, sub.dropped
+    sent, dropped = asyncio.run(run())
+    # 가득 찼을 때 s2 앞의 STATE(s1)만 버림, ACK와 마지막 STATE 뒤 DELTA는 순서대로 남음
+    assert sent == [b"first", b"a1", b"s2", b"d3", b"d4"]
+    assert dropped == 1
+
+def test_latest_keeps_newest_frame_when_deltas_fill_queue():
+    async def run():
+        frames = [("DELTA", b"d1"), ("DELTA", b"d2"), ("DELTA", b"d3"), ("DELTA", b"d4"), ("DELTA", b"d5")]
+        sub, ws, results = await fill("latest", frames)
+        ws.release()
+        await settle()
+        return ws.sent, results
+    sent, results = asyncio.run(run())
+    assert all(results)
+    # STATE가 없으면 마지막 DELTA만 남기고, 클라이언트는 순번 공백을 보고 RESYNC한다
+    assert sent == [b"first", b"d4", b"d5"]
+
+def test_latest_disconnects_when_nothing_can_be_dropped():
+    async def run():
+        frames = [("ACK", b"a1"), ("ACK", b"a2"), ("ACK", b"a3"), ("ACK", b"a4"), ("ACK", b"a5")]
+        sub, ws, results = await fill("latest", frames)
+        await settle()
+        return sub, ws, results
+    sub, ws, results = asyncio.run(run())
+    assert results == [True, True, True, True, False]
+    assert sub.closed and ws.closed == 1008
+
+def test_disconnect_policy_closes_when_full():
+    async def run():
+        frames = [("STATE", b"s1"), ("STATE", b"s2"), ("STATE", b"s3"), ("STATE", b"s4"), ("STATE", b"s5")]
+        sub, ws, results = await fill("disconnect", frames)
+        await settle()
+        return sub, ws, results
+    sub, ws, results = asyncio.run(run())
+    assert results[-1] is False and sub.closed and ws.closed == 1008
+    assert sub.dropped == 0
+
+def test_send_error_closes_once(capsys):
+    async def run():
+        ws = SlowSocket(error=RuntimeError("boom"))
+        sub, ws, _ = await fill("latest", [("STATE", b"s1")], socket=ws)
+        ws.release()
+        await settle()
+        return sub, ws
+    sub, ws = asyncio.run(run())
+    assert sub.closed and ws.closed == 1011 and ws.sent == []
+    assert capsys.readouterr().out.count("전송 오류") == 1
+
+def test_broadcast_encodes_once_per_codec():
+    async def run():
+        subs = [fanout.Subscriber(SlowSocket()) for _ in range(3)]
+        frames = fanout.broadcast(subs, {"type": "STATE", "outs": 1})
+        queued = [sub.queue[-1][1] for sub in subs]
+        for sub in subs:
+            sub.close()
+        return frames, queued
+    frames, queued = asyncio.run(run())
+    assert len(frames) == 1 and all(frame is queued[0] for frame in queued)
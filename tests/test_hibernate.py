@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+게임 휴면: 내렸다 되살린 방은 상태/순번/누적 기록이 같고, sweep()은 쉬는 방만, trim()은 오래 쓰지 않은 방부터 내린다.
+(메모리/지연은 benchmarks/bench_hibernate.py)
+"""
+
+import asyncio
+import json
+
+import pytest
+import websockets
+
+import hibernate
+import server_websocket
+from game_room import RoomRegistry
+
+EVENTS = [
+    {"type": "SET_LINEUP", "away_lineup": ["원정1", "원정2"], "home_lineup": ["홈1", "홈2"]},
+    {"type": "AB", "batter": "", "result": "1B"},
+    {"type": "AB", "batter": "", "result": "BALL"},
+    {"type": "AB", "batter": "", "result": "HR"},
+    {"type": "AB", "batter": "", "result": "OUT"},
+]
+
+def play(room):
+    for event in EVENTS:
+        room.apply(event)
+        room.publish_state()
+    return room
+
+@pytest.fixture
+def cold(tmp_path):
+    store = hibernate.ColdStore(str(tmp_path / hibernate.COLD_FILE))
+    yield store
+    store.close()
+
+def test_evict_and_thaw_round_trip(cold):
+    rooms = RoomRegistry()
+    rooms.hibernate(cold)
+    room = play(rooms.get("g1"))
+    before = room.dump(), room.seq, room.snapshot(), room.stats_message()
+    restored = hibernate.stats["restored"]
+    rooms.evict(room)
+    assert "g1" not in rooms.rooms and "g1" in cold
+    assert rooms.find("g1") is not None and "g1" not in cold
+    thawed = rooms.get("g1")
+    assert thawed is not room
+    assert (thawed.dump(), thawed.seq, thawed.snapshot(), thawed.stats_message()) == before
+    assert hibernate.stats["restored"] == restored + 1
+
+def test_find_does_not_create(cold):
+    rooms = RoomRegistry()
+    rooms.hibernate(cold)
+    assert rooms.find("nope") is None and len(rooms) == 0
+
+def test_sweep_evicts_only_idle_rooms(cold):
+    rooms = RoomRegistry()
+    rooms.hibernate(cold, idle_seconds=10)
+    idle, watched, busy = rooms.get("idle"), rooms.get("watched"), rooms.get("busy")
+    replay = rooms.get("replay0-g")
+    watched.clients.add(object())
+    busy.pending = 1
+    now = idle.touched
+    assert rooms.sweep(now + 5) == 0
+    assert rooms.sweep(now + 10) == 1
+    assert sorted(rooms.rooms) == ["busy", "replay0-g", "watched"] and "idle" in cold
+    assert "replay0-g" not in cold and replay.read_only   # 재방송 방은 휴면 파일에 쓰지 않음
+
+def test_sweep_needs_hibernation():
+    rooms = RoomRegistry()
+    room = rooms.get("g1")
+    assert rooms.sweep(room.touched + 1e9) == 0 and len(rooms) == 1
+
+def test_trim_to_max_resident(cold):
+    rooms = RoomRegistry()
+    for game_id in ("a", "b", "c", "d"):
+        rooms.get(game_id)
+    rooms.get("a").clients.add(object())
+    rooms.get("b")                                  # 최근 사용: 순서 c, d, a, b
+    rooms.hibernate(cold, max_resident=2)
+    assert list(rooms.rooms) == ["a", "b"] and sorted(cold.index) == ["c", "d"]
+    rooms.get("e")                                  # a는 관중이 있어 남고 b가 내려감
+    assert list(rooms.rooms) == ["a", "e"] and "b" in cold
+
+def test_compaction_keeps_live_records(cold, monkeypatch):
+    monkeypatch.setattr(hibernate, "COMPACT_MIN", 0)
+    rooms = RoomRegistry()
+    rooms.hibernate(cold)
+    for game_id in ("a", "b", "c"):
+        rooms.evict(play(rooms.get(game_id)))
+    expected = cold.read("c")
+    compactions = hibernate.stats["compactions"]
+    rooms.get("a")
+    rooms.get("b")
+    assert hibernate.stats["compactions"] > compactions
+    assert list(cold.index) == ["c"] and cold.dead == 0
+    assert cold.read("c") == expected
+
+async def join_hibernated(running_server, cold):
+    async with running_server() as uri:
+        rooms = server_websocket.rooms
+        rooms.hibernate(cold)
+        room = play(rooms.get("g1"))
+        expected = room.snapshot()
+        rooms.evict(room)
+        async with websockets.connect(f"{uri}/g1") as ws:
+            state = json.loads(await ws.recv())
+            await ws.send(json.dumps({"type": "AB", "batter": "", "result": "2B", "id": "n"}))
+            while "id" not in (reply := json.loads(await ws.recv())):
+                pass
+            return expected, state, reply, rooms.get("g1").seq
+
+def test_server_thaws_on_join(running_server, cold):
+    expected, state, reply, seq = asyncio.run(join_hibernated(running_server, cold))
+    assert state == expected
+    assert reply["type"] == "ACK"
+    assert seq == len(EVENTS) + 1
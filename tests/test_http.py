@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 점수판: ETag/304, 그리고 휴면으로 방이 바뀌면 (발행이 없어도) 요약 ETag가 바뀐다.
+(처리량은 benchmarks/bench_http.py)
+"""
+
+import asyncio
+import json
+
+import hibernate
+import http_api
+from game_room import RoomRegistry
+from scoreboard_http import Scoreboard
+
+def get(scoreboard, path, etag=None):
+    """경로 하나 요청 -> (상태 코드, ETag, 본문)"""
+    route, rest = http_api.find_route(scoreboard.routes(), path)
+    headers = {"if-none-match": etag} if etag else {}
+    raw = route(http_api.Request(path, rest, {}, headers))
+    if not isinstance(raw, bytes):
+        raw = http_api.response(*raw)
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("ascii").split("\r\n")
+    fields = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), fields.get("ETag"), body
+
+def test_game_etag_and_304():
+    rooms = RoomRegistry()
+    room = rooms.get("g1")
+    scoreboard = Scoreboard(rooms)
+    status, etag, body = get(scoreboard, "/games/g1")
+    assert status == 200 and body == room.snapshot_frame()
+    assert get(scoreboard, "/games/g1", etag)[:2] == (304, etag)
+    assert get(scoreboard, "/games/g1", f"W/{etag}, \"other\"")[0] == 304
+    room.publish_snapshot(dict(room.last_snapshot, away=1))
+    status, changed, body = get(scoreboard, "/games/g1", etag)
+    assert status == 200 and changed != etag and json.loads(body)["away"] == 1
+    assert get(scoreboard, "/games/nope")[0] == 404
+    assert "nope" not in [room.game_id for room in rooms]   # 읽기 요청으로는 방을 만들지 않음
+
+def test_summary_etag_changes_on_publish_and_new_room():
+    rooms = RoomRegistry()
+    rooms.get("g1")
+    scoreboard = Scoreboard(rooms)
+    status, etag, _ = get(scoreboard, "/games")
+    assert status == 200 and get(scoreboard, "/games", etag)[0] == 304
+    rooms.get("g2")
+    status, etag2, body = get(scoreboard, "/games", etag)
+    assert status == 200 and [g["game"] for g in json.loads(body)["games"]] == ["g1", "g2"]
+    rooms.get("g1").publish_snapshot(dict(rooms.get("g1").last_snapshot, home=2))
+    assert get(scoreboard, "/games", etag2)[0] == 200
+
+def test_summary_etag_changes_when_hibernation_swaps_rooms(tmp_path):
+    rooms = RoomRegistry()
+    cold = hibernate.ColdStore(str(tmp_path / hibernate.COLD_FILE))
+    rooms.hibernate(cold, max_resident=1)
+    try:
+        rooms.get("b")
+        rooms.get("a")                  # b를 내림
+        scoreboard = Scoreboard(rooms)
+        status, etag, body = get(scoreboard, "/games")
+        assert [g["game"] for g in json.loads(body)["games"]] == ["a"]
+        rooms.get("b")                  # b를 되살리고 a를 내림: 발행 횟수도, 방 수도 그대로
+        status, changed, body = get(scoreboard, "/games", etag)
+        assert status == 200 and changed != etag
+        assert [g["game"] for g in json.loads(body)["games"]] == ["b"]
+    finally:
+        cold.close()
+
+async def fetch_twice(scoreboard):
+    """실제 HTTP 연결 하나(keep-alive)로 두 번 요청: 두 번째는 If-None-Match"""
+    server = await http_api.serve("127.0.0.1", 0, scoreboard.routes())
+    port = next(iter(server.sockets)).getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(b"GET /games/g1 HTTP/1.1\r\nHost: x\r\n\r\n")
+        head = await reader.readuntil(b"\r\n\r\n")
+        fields = dict(line.split(": ", 1) for line in head.decode("ascii").split("\r\n")[1:-2])
+        await reader.readexactly(int(fields["Content-Length"]))
+        writer.write(f"GET /games/g1 HTTP/1.1\r\nIf-None-Match: {fields['ETag']}\r\n\r\n".encode("ascii"))
+        second = await reader.readuntil(b"\r\n\r\n")
+        return head.split(b"\r\n", 1)[0], second.split(b"\r\n", 1)[0]
+    finally:
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+def test_not_modified_over_http():
+    rooms = RoomRegistry()
+    rooms.get("g1")
+    first, second = asyncio.run(fetch_twice(Scoreboard(rooms)))
+    assert first == b"HTTP/1.1 200 OK"
+    assert second == b"HTTP/1.1 304 Not Modified"
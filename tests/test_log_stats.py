@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+로그 통계 검사: 파일을 바이트 구간으로 나눠 여러 워커가 읽어도, 열 단위로 변환해 query해도
+한 번에 읽은 결과와 같다. RESET 없이 서버를 다시 띄운 경기도 나눠 세고 득점은 음수가 되지 않는다.
+(처리량은 benchmarks/bench_stats.py)
+"""
+
+import random
+
+import log_stats
+from fast_engine import RESULTS
+from game_room import GameRoom
+from log_writer import LogWriter
+
+WEIGHTS = [20, 25, 20, 10, 8, 3, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+
+def write_log(path, abs_count, seed):
+    """게임 3개를 섞어 진행 (가끔 RESET, 가끔 RESET 없이 새 방 = 서버 재시작)"""
+    rng = random.Random(seed)
+    rooms = {g: GameRoom(g) for g in ("g0", "g1", "g2")}
+    with open(path, "w", encoding="utf-8") as out:
+        def log(room, data):
+            out.write(LogWriter.encode(None, data, game=room.game_id))
+        for room in rooms.values():
+            log(room, room.apply({"type": "SET_LINEUP", "away_lineup": [f"{room.game_id}-A{i}" for i in range(9)],
+                                  "home_lineup": [f"{room.game_id}-H{i}" for i in range(9)]}))
+        for _ in range(abs_count):
+            game_id = rng.choice(list(rooms))
+            room = rooms[game_id]
+            log(room, room.apply({"type": "AB", "batter": "", "result": rng.choices(RESULTS, WEIGHTS)[0]}))
+            log(room, room.state_payload())
+            if room.state["game_over"] or room.state["inning"] > 12:
+                if rng.random() < 0.2:
+                    rooms[game_id] = GameRoom(game_id)
+                else:
+                    log(room, room.apply({"type": "RESET"}))
+
+def same(a, b):
+    return a.batters == b.batters and a.games == b.games
+
+def test_byte_ranges_match_whole_file(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    write_log(path, 3000, 0)
+    whole = log_stats.file_stats(path)
+    ranges = log_stats.line_ranges(path, 5000)
+    assert len(ranges) > 50 and ranges[0][0] == 0
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    for chunk in (5000, 64 << 10):
+        assert same(log_stats.stats([path], 2, chunk), whole), chunk
+    assert len(whole.games) > 10
+    assert all(runs >= 0 for box in whole.games.values() for line in box["line"] for runs in line.values())
+
+def test_columnar_query_matches_stats(tmp_path):
+    paths = []
+    for i in range(2):
+        paths.append(str(tmp_path / f"log{i}.jsonl"))
+        write_log(paths[-1], 1500, i)
+    expected = log_stats.stats(paths, 1)
+    log_stats.convert(paths, str(tmp_path / "whole"), 1)
+    assert same(log_stats.query(str(tmp_path / "whole")), expected)
+    log_stats.convert(paths, str(tmp_path / "split"), 2, 8000)
+    assert same(log_stats.query(str(tmp_path / "split")), expected)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+재방송 방: 재방송 시작 전에 관중이 먼저 만든 방도 읽기 전용이고,
+관중 없는 재방송 방/사본 방은 휴면을 꺼도 expire()로 지워진다.
+"""
+
+import asyncio
+import json
+
+import websockets
+
+import log_replay
+import server_websocket
+from game_room import RoomRegistry, is_replay_id
+
+class Relay:
+    """shard.Bus 대신 구독 해지만 기록"""
+
+    def __init__(self):
+        self.unwatched = []
+
+    def unwatch(self, game_id):
+        self.unwatched.append(game_id)
+
+def test_replay_ids():
+    assert is_replay_id("replay0-default")
+    assert is_replay_id("replay12-g1")
+    assert is_replay_id("replay-g1")     # log_replay.replay_log의 기본 접두사
+    assert not is_replay_id("default")
+    assert not is_replay_id("replays")
+    assert not is_replay_id("my-replay0-g")
+
+async def score_before_replay(running_server):
+    """재방송 전에 replay0-g에 들어가 AB를 보냄 -> (응답, 재방송 뒤 받은 STATE)"""
+    async with running_server() as uri:
+        async with websockets.connect(f"{uri}/replay0-g") as ws:
+            await ws.recv()  # 접속 시 STATE
+            await ws.send(json.dumps({"type": "AB", "batter": "", "result": "HR"}))
+            rejected = json.loads(await ws.recv())
+            state = dict(server_websocket.rooms.get("replay0-g").last_snapshot, away=3)
+            log_replay.publish(server_websocket.rooms, "replay0-", {"game": "g", "data": {"type": "STATE", **state}})
+            return rejected, json.loads(await ws.recv())
+
+def test_viewer_created_replay_room_is_read_only(running_server):
+    rejected, published = asyncio.run(score_before_replay(running_server))
+    assert rejected == {"type": "ERROR", "msg": "Replay game is read-only"}
+    assert published["type"] == "STATE" and published["away"] == 3
+
+def test_expire_without_hibernation():
+    relay = Relay()
+    rooms = RoomRegistry(relay=relay)
+    now = rooms.get("default").touched
+    rooms.get("replay0-done")
+    rooms.get("replay0-watched").clients.add(object())
+    rooms.get("mirror").owned = False
+    assert rooms.expire(now + 1, ttl=60) == 0
+    assert rooms.expire(now + 61, ttl=60) == 2
+    assert sorted(room.game_id for room in rooms) == ["default", "replay0-watched"]
+    assert relay.unwatched == ["mirror"]
+    assert rooms.get("replay0-done").read_only  # 다시 만들어도 읽기 전용
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+재접속 검사: ?since=<순번>은 놓친 DELTA만 REPLAY로 받고, 재생 버퍼보다 오래됐으면 순번이 붙은 STATE를 받는다.
+클라이언트는 순번 공백 하나에 RESYNC를 한 번만 보낸다.
+"""
+
+import asyncio
+import json
+
+import websockets
+
+import client_websocket
+import game_room
+from game_room import GameRoom
+
+async def play(ws, results):
+    for result in results:
+        await ws.send(json.dumps({"type": "AB", "batter": "", "result": result}))
+        while json.loads(await ws.recv())["type"] not in ("ACK", "END", "ERROR"):
+            pass
+
+async def reconnect(running_server, plays, since):
+    """plays만큼 진행한 뒤 ?since=since로 접속한 관중이 처음 받는 메시지"""
+    async with running_server() as uri:
+        async with websockets.connect(f"{uri}/resume") as scorer:
+            await scorer.recv()
+            await play(scorer, ["BALL", "STRIKE"] * (plays // 2))
+            async with websockets.connect(f"{uri}/resume?since={since}") as viewer:
+                return json.loads(await viewer.recv())
+
+def test_since_replays_missed_deltas(running_server):
+    msg = asyncio.run(reconnect(running_server, 6, 2))
+    assert msg["type"] == "REPLAY" and msg["seq"] == 6
+    assert [e["seq"] for e in msg["events"]] == [3, 4, 5, 6]
+
+def test_since_too_old_sends_full_state(running_server, monkeypatch):
+    monkeypatch.setattr(game_room, "REPLAY_SIZE", 2)
+    msg = asyncio.run(reconnect(running_server, 6, 1))
+    assert msg["type"] == "STATE" and msg["seq"] == 6
+
+def test_replay_since_bounds():
+    room = GameRoom("bounds")
+    for _ in range(3):
+        room.apply({"type": "AB", "batter": "", "result": "BALL"})
+        room.publish_state()
+    assert room.replay_since(3) == []
+    assert [d["seq"] for d in room.replay_since(1)] == [2, 3]
+    assert room.replay_since(4) is None     # 미래 순번
+    assert room.replay_since(-5) is None    # 버퍼보다 오래됨
+
+class GapSocket:
+    """순번 공백이 있는 DELTA를 돌려주고 보낸 메시지를 모음"""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.sent = []
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield json.dumps(message)
+
+    async def send(self, data):
+        self.sent.append(json.loads(data))
+
+class NullWriter:
+    async def write(self, data):
+        pass
+
+    async def write_json(self, data):
+        pass
+
+def test_client_sends_one_resync_per_gap(monkeypatch):
+    state = {"type": "STATE", "seq": 1, "inning": "1회 초", "outs": 0, "balls": 0, "strikes": 0,
+             "home": 0, "away": 0, "runners": []}
+    messages = [state,
+                {"type": "DELTA", "seq": 3, "changes": {"outs": 1}},    # 2번이 빠짐
+                {"type": "DELTA", "seq": 4, "changes": {"outs": 2}},
+                {"type": "DELTA", "seq": 5, "changes": {"balls": 1}},
+                {**state, "seq": 5, "outs": 2, "balls": 1},             # RESYNC 응답
+                {"type": "DELTA", "seq": 6, "changes": {"strikes": 1}}]
+    monkeypatch.setattr(client_websocket, "log_writer", NullWriter())
+    ws, board = GapSocket(messages), client_websocket.Scoreboard()
+    asyncio.run(client_websocket.receive_messages(ws, [False], board, client_websocket.Renderer(quiet=True)))
+    assert ws.sent == [{"type": "RESYNC"}]
+    assert not board.resync_pending
+    assert board.seq == 6 and board.state["outs"] == 2 and board.state["strikes"] == 1
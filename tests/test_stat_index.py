@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+타자별 누적 기록(StatIndex) 검사: 게임 방 여러 개에 무작위 AB/RESET/SET_LINEUP을 적용하며 서버 형식 로그를 쓰고,
+방마다 누적된 기록이 log_stats.py로 로그를 처음부터 다시 집계한 결과와 같은지 확인한다.
+(STATS 조회 지연은 benchmarks/bench_stat_index.py)
+"""
+
+import json
+import random
+
+import batting
+import log_stats
+from fast_engine import RESULTS
+from game_room import GameRoom
+from log_writer import LogWriter
+
+WEIGHTS = [20, 25, 20, 10, 8, 3, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+
+def lineup_event(rng):
+    away, home = rng.sample(range(10), 2)
+    return {"type": "SET_LINEUP",
+            "away_lineup": [f"T{away}-{i}" for i in range(1, 10)],
+            "home_lineup": [f"T{home}-{i}" for i in range(1, 10)]}
+
+def play(rooms, path, abs_count, seed):
+    """서버와 같은 순서로 로그를 쓰며 명령 적용"""
+    rng = random.Random(seed)
+    encode = LogWriter.encode
+    with open(path, "w", encoding="utf-8") as out:
+        def log(room, data):
+            out.write(encode(None, data, game=room.game_id))
+        for room in rooms:
+            log(room, room.apply(lineup_event(rng)))
+        for _ in range(abs_count):
+            room = rng.choice(rooms)
+            # 대타(라인업 밖 이름)도 가끔 섞음
+            batter = "대타" if rng.random() < 0.02 else ""
+            log(room, room.apply({"type": "AB", "batter": batter, "result": rng.choices(RESULTS, WEIGHTS)[0]}))
+            log(room, room.state_payload())
+            if room.state["game_over"] or room.state["inning"] > 15:
+                log(room, room.apply({"type": "RESET"}))
+                log(room, room.apply(lineup_event(rng)))
+
+def played_rooms(tmp_path, games=5, abs_count=4000):
+    rooms = [GameRoom(f"game{i}") for i in range(games)]
+    path = tmp_path / "log.jsonl"
+    play(rooms, path, abs_count, 0)
+    return rooms, path
+
+def test_stats_match_log_replay(tmp_path):
+    rooms, path = played_rooms(tmp_path)
+    actual = {}
+    for room in rooms:
+        batting.merge_lines(actual, room.stats.batters)
+    assert actual == log_stats.file_stats(str(path)).batters
+    assert any(room.stats.batters for room in rooms)
+
+def test_team_totals_are_sum_of_batters(tmp_path):
+    rooms, _ = played_rooms(tmp_path)
+    for room in rooms:
+        for team, line in room.stats.teams.items():
+            total = batting.new_line()
+            for (t, _), bl in room.stats.batters.items():
+                if t == team:
+                    for name in batting.STATS:
+                        total[name] += bl[name]
+            assert total == line, f"{room.game_id} {team}"
+
+def test_stats_survive_snapshot(tmp_path):
+    rooms, _ = played_rooms(tmp_path)
+    for room, data in zip(rooms, json.loads(json.dumps([room.dump() for room in rooms]))):
+        restored = GameRoom(room.game_id)
+        restored.restore(data)
+        assert restored.stats.batters == room.stats.batters
+        assert restored.stats.teams == room.stats.teams
+
+def test_game_ending_at_bat_is_credited(tmp_path):
+    room = GameRoom("walkoff")
+    path = tmp_path / "log.jsonl"
+    with open(path, "w", encoding="utf-8") as out:
+        def log(data):
+            out.write(LogWriter.encode(None, data, game=room.game_id))
+        log(room.apply({"type": "SET_LINEUP", "away_lineup": ["A1"], "home_lineup": ["H1"]}))
+        room.state.update(inning=9, half="HOME", away=3, home=3)
+        log(room.state_payload())
+        res = room.apply({"type": "AB", "batter": "", "result": "HR"})
+        log(res)
+        log(room.state_payload())
+    assert res["type"] == "END"
+    line = room.stats.batters[("HOME", "H1")]
+    assert line["PA"] == 1 and line["HR"] == 1
+    assert log_stats.file_stats(str(path)).batters == room.stats.batters
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+승리 확률(WP) / 기대 득점(RE) 표
+사용법: python wp_table.py build [--games 200000] [--workers 4] [--out wp_table.bin]
+설명: simulate.py로 만든 경기들의 투구 직전 상태를
+      (이닝, 초/말, 아웃, 루 마스크, 점수 차(홈-원정), 볼카운트) 셀로 모아
+      셀마다 홈 팀 승리 확률과 그 반 이닝 끝까지의 기대 득점을 float32 표로 저장한다.
+      서버는 시작할 때 이 파일을 mmap으로 열고 STATE마다 O(1)로 찾아 붙인다.
+      (조회 쪽은 표준 라이브러리만 쓰고, 만들 때만 NumPy가 필요하다)
+
+파일 형식: 헤더 "<4sHHI" (b"BBWP", 버전, 예약, 셀 수) + 셀마다 float32 [홈 승리 확률, 기대 득점]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+MAGIC = b"BBWP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+
+MAX_INNING = 12     # 12회 이상은 12회로 취급
+MAX_DIFF = 10       # 점수 차는 -10..10으로 자름
+DIFFS = 2 * MAX_DIFF + 1
+COUNTS = 12         # 볼 0-3 x 스트라이크 0-2
+N_CELLS = MAX_INNING * 2 * 3 * 8 * DIFFS * COUNTS
+BASE_BITS = {"1B": 1, "2B": 2, "3B": 4}
+
+def cell_index(inning, half, outs, bases, away, home, balls, strikes):
+    """상태 -> 셀 번호 (half: 0=초, 1=말). AB 경로에서 불리므로 min()/max() 호출 대신 비교만 쓴다"""
+    diff = home - away
+    if diff > MAX_DIFF:
+        diff = MAX_DIFF
+    elif diff < -MAX_DIFF:
+        diff = -MAX_DIFF
+    if inning > MAX_INNING:
+        inning = MAX_INNING
+    if outs > 2:
+        outs = 2
+    if balls > 3:
+        balls = 3
+    if strikes > 2:
+        strikes = 2
+    return (((((inning - 1) * 2 + half) * 3 + outs) * 8 + bases) * DIFFS + diff + MAX_DIFF) * COUNTS + balls * 3 + strikes
+
+def wp_cell(inning, half, outs, bases, away, home, balls, strikes):
+    """simulate.simulate_chunk용 NumPy 버전 cell_index"""
+    import numpy as np
+    inn = np.minimum(inning, MAX_INNING).astype(np.int64) - 1
+    diff = np.clip(home - away, -MAX_DIFF, MAX_DIFF) + MAX_DIFF
+    count = np.minimum(balls, 3) * 3 + np.minimum(strikes, 2)
+    return ((((inn * 2 + half) * 3 + np.minimum(outs, 2)) * 8 + bases) * DIFFS + diff) * COUNTS + count
+
+class WinProbTable:
+    """mmap으로 연 WP/RE 표"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, n_cells = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION or n_cells != N_CELLS:
+            raise ValueError(f"WP 표 형식이 맞지 않습니다: {path}")
+        values = memoryview(self.mm)[HEADER.size:HEADER.size + n_cells * 8].cast("f")
+        if sys.byteorder != "little":
+            values = list(struct.unpack(f"<{n_cells * 2}f", values.tobytes()))
+        self.values = values
+
+    def lookup(self, state):
+        """game_engine 상태 dict -> (홈 승리 확률, 기대 득점)"""
+        bases = 0
+        for r in state["runners"]:
+            bases |= BASE_BITS.get(r, 0)
+        i = 2 * cell_index(state["inning"], 1 if state["half"] == "HOME" else 0, state["outs"], bases,
+                           state["away"], state["home"], state["balls"], state["strikes"])
+        return self.values[i], self.values[i + 1]
+
+    def enrich(self, snapshot, state):
+        """current_state() 결과에 홈 팀 승리 확률(원정은 1 - 값)과 기대 득점 추가"""
+        if state.get("game_over"):
+            home_wp = 1.0 if state["home"] > state["away"] else 0.0
+            run_exp = 0.0
+        else:
+            home_wp, run_exp = self.lookup(state)
+        snapshot["home_win_prob"] = round(home_wp, 3)
+        snapshot["run_exp"] = round(run_exp, 2)
+        return snapshot
+
+def build(games, workers=1, seed=0, chunk=10000, probs=None):
+    """시뮬레이션으로 (홈 승리 확률, 기대 득점) float32 배열 (N_CELLS, 2) 생성"""
+    import numpy as np
+    import simulate
+
+    s = simulate.simulate(games, probs, seed, workers, chunk, cell_fn=wp_cell, n_cells=N_CELLS)
+    visits = s["cell_visits"].astype(float)
+    shape = (MAX_INNING, 2, 3, 8, DIFFS, COUNTS)
+    v = visits.reshape(shape)
+    wins = s["cell_home_wins"].reshape(shape).astype(float)
+    runs = s["cell_runs"].reshape(shape).astype(float)
+
+    # 방문하지 않은 셀은 이닝을 묶은 값으로, 그래도 없으면 점수 차 부호/아웃-루 평균으로 채움
+    coarse_v = v.sum(axis=0, keepdims=True)
+    wp = np.where(v > 0, wins / np.maximum(v, 1),
+                  np.where(coarse_v > 0, wins.sum(axis=0, keepdims=True) / np.maximum(coarse_v, 1), np.nan))
+    re = np.where(v > 0, runs / np.maximum(v, 1),
+                  np.where(coarse_v > 0, runs.sum(axis=0, keepdims=True) / np.maximum(coarse_v, 1), np.nan))
+    diff_sign = np.sign(np.arange(DIFFS) - MAX_DIFF).reshape(1, 1, 1, 1, DIFFS, 1)
+    wp = np.where(np.isnan(wp), 0.5 + 0.5 * diff_sign * np.ones(shape), wp)
+    re_base = runs.sum(axis=(0, 1, 4, 5)) / np.maximum(v.sum(axis=(0, 1, 4, 5)), 1)
+    re = np.where(np.isnan(re), re_base.reshape(1, 1, 3, 8, 1, 1) * np.ones(shape), re)
+    return np.stack([wp.ravel(), re.ravel()], axis=1).astype("<f4"), s
+
+def write(path, table):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, N_CELLS))
+        f.write(table.tobytes())
+    os.replace(tmp, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="승리 확률/기대 득점 표")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="시뮬레이션으로 표 만들기")
+    b.add_argument("--games", type=int, default=200000)
+    b.add_argument("--workers", type=int, default=os.cpu_count())
+    b.add_argument("--seed", type=int, default=0)
+    b.add_argument("--out", default="wp_table.bin")
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        start = time.perf_counter()
+        table, summary = build(args.games, args.workers, args.seed)
+        write(args.out, table)
+        visited = int((summary["cell_visits"] > 0).sum())
+        print(f"{args.out}: 경기 {args.games}개, 셀 {visited}/{N_CELLS}개 방문, {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()